@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Function call benchmark
+
+Measures the overhead of a call of a whispy lispy function: calling a
+`types.Function` with an interpreter that returns right away, so only the
+creation of the scope of the call gets timed. Then times a program making
+many calls, with every engine.
+
+Run with: `python benchmarks/bench_calls.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import timeit
+
+from whispy_lispy import scopes2, skip_steps, types
+
+PARAMETER_COUNTS = (0, 1, 3, 10)
+CALLS = 200000
+ENGINES = ('tree', 'closures', 'bytecode', 'python', 'stackless')
+PROGRAM = """
+(def (add3 a b c) (sum a b c))
+(def (loop n acc) (cond ((= n 0) acc) (#t (loop (sub n 1) (add3 acc n 1)))))
+(loop 300 0)
+"""
+
+
+def no_evaluation(code, scope):
+    return scope
+
+
+def make_function(param_count):
+    params = tuple(
+        types.Symbol(('p{}'.format(idx),)) for idx in range(param_count))
+    return types.Function(
+        (types.String(('f',)), params, None, scopes2.Scope()))
+
+
+def main():
+    print('{:>12} {:>14}'.format('parameters', 'ns per call'))
+    scope = scopes2.Scope()
+    for count in PARAMETER_COUNTS:
+        func = make_function(count)
+        args = tuple(types.Int((idx,)) for idx in range(count))
+        timing = min(timeit.repeat(
+            lambda: func(no_evaluation, scope, *args),
+            number=CALLS, repeat=5))
+        print('{:>12} {:14.1f}'.format(count, 1e9 * timing / CALLS))
+
+    print()
+    print('{:>12} {:>14}'.format('engine', 'loop 300 (ms)'))
+    for engine in ENGINES:
+        timing = min(timeit.repeat(
+            lambda: skip_steps.interpret_text2(
+                PROGRAM, scopes2.Scope(), engine=engine),
+            number=1, repeat=5))
+        print('{:>12} {:14.2f}'.format(engine, 1000 * timing))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Evaluator benchmark
+
+Compares the tree walking interpreter (`interpreter2`) with the closure
+compiler (`closure_compiler`), the bytecode VM (`compiler`), the python
+code backend (`pycompiler`) and the explicit stack evaluator (`stackless`) on
+a few recursive programs.
+
+Run with: `python benchmarks/bench_engines.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import sys
+import timeit
+
+from whispy_lispy import scopes2, skip_steps
+
+PROGRAMS = (
+    ('fib 15', """
+(def (fib n)
+    (cond
+        ((= n 0) 0)
+        ((= n 1) 1)
+        (#t (sum (fib (sub n 1)) (fib (sub n 2))))))
+(fib 15)
+"""),
+    ('ackermann 2 3', """
+(def (ack m n)
+    (cond
+        ((= m 0) (sum n 1))
+        ((= n 0) (ack (sub m 1) 1))
+        (#t (ack (sub m 1) (ack m (sub n 1))))))
+(ack 2 3)
+"""),
+    ('fact 100', """
+(def (fact n) (cond ((= n 1) 1) (#t (* n (fact (sub n 1))))))
+(fact 100)
+"""),
+    ('closures 300', """
+(def (adder a) (lambda (b) (lambda (c) (sum a b c))))
+(def (loop n acc)
+    (cond ((= n 0) acc) (#t (loop (sub n 1) (((adder acc) n) 1)))))
+(loop 300 0)
+"""),
+)
+ENGINES = ('tree', 'closures', 'bytecode', 'python', 'stackless')
+
+
+def run(text, engine):
+    return skip_steps.interpret_text2(text, scopes2.Scope(), engine=engine)
+
+
+def main():
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    print('{:>16} '.format('program') + ' '.join(
+        '{:>14}'.format(engine + ' (ms)') for engine in ENGINES))
+    for name, text in PROGRAMS:
+        results = set(repr(run(text, engine)) for engine in ENGINES)
+        assert len(results) == 1, results
+        timings = [
+            1000 * min(timeit.repeat(
+                lambda: run(text, engine), number=1, repeat=5))
+            for engine in ENGINES]
+        print('{:>16} '.format(name) + ' '.join(
+            '{:14.2f}'.format(timing) for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Tokenizer benchmark
+
+Tokenizes generated programs of growing sizes, with both the offset based
+tokenizer and the old slicing loop (copied here, since it's gone from the
+lexer). The time per KB should stay flat for the new tokenizer, and grow with
+the input size for the old one.
+
+Run with: `python benchmarks/bench_lexer.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import timeit
+
+from whispy_lispy import lexer
+from whispy_lispy.exceptions import WhispyLispySyntaxError
+
+LINE = '(def (f_{0} a b) (cond ((= a {0}) 1.5) (#t (sum a b "x y"))))\n'
+SIZES = (1000, 2000, 4000, 8000)
+LEGACY_MAX_SIZE = 4000
+
+
+def legacy_get_flat_token_list(text):
+    """The tokenizer as it was before the offset based scanning"""
+    tokens = []
+    remaining_text = text.lstrip()
+    last_iteration_text = remaining_text
+
+    while remaining_text:
+        for converter, pattern in lexer.SOURCE_PATTERNS:
+            result = pattern.match(remaining_text)
+            if result:
+                start, end = result.span()
+                tokens.append(converter(
+                    remaining_text[start:end], text, text.index(remaining_text)))  # noqa
+                remaining_text = remaining_text[end:].lstrip()
+                break
+        if remaining_text == last_iteration_text:
+            raise WhispyLispySyntaxError(
+                text, text.index(remaining_text),
+                "Character combination doesn't make sense")
+        last_iteration_text = remaining_text
+
+    return tokens
+
+
+def generate_program(lines):
+    return ''.join(LINE.format(idx) for idx in range(lines))
+
+
+def measure(func, text, repeat=3):
+    return min(timeit.repeat(lambda: func(text), number=1, repeat=repeat))
+
+
+def main():
+    print('{:>8} {:>10} {:>16} {:>16}'.format(
+        'lines', 'KB', 'new (ms/KB)', 'old (ms/KB)'))
+    for size in SIZES:
+        text = generate_program(size)
+        kilobytes = len(text) / 1024
+        new = measure(lexer.get_flat_token_list, text) * 1000 / kilobytes
+        if size <= LEGACY_MAX_SIZE:
+            old = '{:16.4f}'.format(
+                measure(legacy_get_flat_token_list, text, repeat=1) *
+                1000 / kilobytes)
+        else:
+            old = '{:>16}'.format('(too slow)')
+        print('{:8} {:10.1f} {:16.4f} {}'.format(size, kilobytes, new, old))
+
+
+if __name__ == '__main__':
+    main()
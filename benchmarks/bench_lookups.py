@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Symbol lookup benchmark
+
+Times loops calling global functions and builtins, and reading global
+constants, from function bodies, with the interpreters using the lookup
+caches. Reports the hit rates of the caches of the called functions and of
+the variables.
+
+Run with: `python benchmarks/bench_lookups.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import timeit
+
+from whispy_lispy import interpreter2, scopes2, skip_steps
+
+PROGRAMS = (
+    ('global calls', """
+(def (inc x) (+ x 1))
+(def (loop n acc) (cond ((= n 0) acc) (#t (loop (sub n 1) (inc acc)))))
+(loop 20000 0)
+"""),
+    ('builtin calls', """
+(def (loop n acc) (cond ((= n 0) acc) (#t (loop (sub n 1) (sum acc 1)))))
+(loop 20000 0)
+"""),
+    ('global constants', """
+(def limit 20000)
+(def step 1)
+(def scale 3)
+(def (loop n acc)
+    (cond ((= n limit) acc) (#t (loop (+ n step) (+ acc (* step scale))))))
+(loop 0 0)
+"""),
+    ('nested constants', """
+(def limit 20000)
+(def step 1)
+(def scale 3)
+(def (mk a) (lambda (b) (lambda (c) (+ step (* scale (+ a c))))))
+(def f ((mk 1) 2))
+(def (loop n acc) (cond ((= n limit) acc) (#t (loop (+ n step) (f acc)))))
+(loop 0 0)
+"""),
+)
+ENGINES = ('tree', 'stackless')
+
+
+def main():
+    print('{:>16} '.format('program') + ' '.join(
+        '{:>16}'.format(engine + ' (ms)') for engine in ENGINES) +
+        ' {:>10} {:>10}'.format('calls hit', 'vars hit'))
+    for name, text in PROGRAMS:
+        interpreter2.call_site_stats.reset()
+        interpreter2.variable_stats.reset()
+        timings = [
+            1000 * min(timeit.repeat(
+                lambda: skip_steps.interpret_text2(
+                    text, scopes2.Scope(), engine=engine),
+                number=1, repeat=5))
+            for engine in ENGINES]
+        print('{:>16} '.format(name) + ' '.join(
+            '{:16.2f}'.format(timing) for timing in timings) +
+            ' {:10.4f} {:10.4f}'.format(
+                interpreter2.call_site_stats.hit_rate,
+                interpreter2.variable_stats.hit_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Non lispy syntax benchmark
+
+Times `lexer.make_parentheses_lispy` on 10k to 1M tokens, to check that the
+conversion scales linearly.
+
+Run with: `python benchmarks/bench_non_lispy_syntax.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import timeit
+
+from whispy_lispy import lexer
+
+# sum(1 a) - 5 tokens
+TOKENS = lexer.get_flat_token_list('sum(1 a)')
+SIZES = (10000, 100000, 1000000)
+
+
+def main():
+    print('{:>10} {:>12} {:>16}'.format('tokens', 'time (ms)', 'ns per token'))
+    for size in SIZES:
+        tokens = TOKENS * (size // len(TOKENS))
+        duration = min(timeit.repeat(
+            lambda: lexer.make_parentheses_lispy(tokens), number=1, repeat=3))
+        print('{:10} {:12.2f} {:16.1f}'.format(
+            size, 1000 * duration, 1e9 * duration / size))
+
+
+if __name__ == '__main__':
+    main()
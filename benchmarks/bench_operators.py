@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Builtin operator benchmark
+
+Times the calls of `+`, `*`, `=` and `sum` with 2 to 1000 (evaluated)
+arguments, the way the interpreters call them. Then measures the throughput
+of every operator from `keywords.OPERATORS`, called with typical arguments.
+
+Run with: `python benchmarks/bench_operators.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import timeit
+
+from whispy_lispy import interpreter2, operations, scopes2, types, keywords
+
+OPERATORS = ('+', '*', '=', 'sum')
+ARGUMENT_COUNTS = (2, 10, 100, 1000)
+# Homogeneous ints and floats
+ARGUMENTS = (
+    ('int', types.Int((1,))),
+    ('float', types.Float((1.0,))),
+)
+
+# The arguments each operator gets for the throughput measurement
+BOOL_ARGUMENTS = (types.Bool((True,)), types.Bool((False,)))
+UNARY_ARGUMENTS = {
+    '~': (types.Int((5,)),),
+    'not': (types.Bool((True,)),),
+}
+BOOLEAN_OPERATORS = ('and', 'or', 'xor')
+INT_ARGUMENTS = (types.Int((12,)), types.Int((3,)), types.Int((2,)))
+THROUGHPUT_CALLS = 100000
+
+
+def get_builtin(operator, scope):
+    if operator in operations.OPERATIONS:
+        return operations.OPERATIONS[operator]
+    return scope[types.Symbol((operator,))]
+
+
+def main():
+    print('{:>8} {:>6} '.format('operator', 'type') + ' '.join(
+        '{:>12}'.format('{} args (us)'.format(count))
+        for count in ARGUMENT_COUNTS))
+    for operator in OPERATORS:
+        for type_name, argument in ARGUMENTS:
+            timings = []
+            scope = scopes2.Scope()
+            builtin = get_builtin(operator, scope)
+            for count in ARGUMENT_COUNTS:
+                values = [argument] * count
+                number = max(10, 100000 // count)
+                timing = min(timeit.repeat(
+                    lambda: builtin(interpreter2.interpret_ast, scope, *values),
+                    number=number, repeat=3))
+                timings.append(1000000 * timing / number)
+            print('{:>8} {:>6} '.format(operator, type_name) + ' '.join(
+                '{:12.2f}'.format(timing) for timing in timings))
+
+    print()
+    print('{:>8} {:>14}'.format('operator', 'calls/s'))
+    scope = scopes2.Scope()
+    for operator in keywords.OPERATORS:
+        builtin = operations.OPERATIONS[operator]
+        if operator in UNARY_ARGUMENTS:
+            values = UNARY_ARGUMENTS[operator]
+        elif operator in BOOLEAN_OPERATORS:
+            values = BOOL_ARGUMENTS
+        else:
+            values = INT_ARGUMENTS
+        timing = min(timeit.repeat(
+            lambda: builtin(interpreter2.interpret_ast, scope, *values),
+            number=THROUGHPUT_CALLS, repeat=3))
+        print('{:>8} {:14.0f}'.format(operator, THROUGHPUT_CALLS / timing))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Parser benchmark
+
+Compares the multi pass CST -> AST transformation with the single pass one:
+how many abstract syntax nodes each of them creates, and how long they take.
+
+Run with: `python benchmarks/bench_parser.py`
+"""
+from __future__ import unicode_literals, print_function, division
+import timeit
+
+from whispy_lispy import ast, lexer, parser2
+
+LINE = (
+    "(def (f_{0} a b) (cond ((= a {0}) 1.5) (#t (sum a b '(x y)))))\n"
+    "(def g_{0} (lambda (x) (f_{0} x 2)))\n")
+SIZES = (100, 1000, 5000)
+
+
+def count_created_nodes(func, *args):
+    """Call the function, and count the abstract syntax nodes it creates"""
+    created = [0]
+    original_init = ast.AbstractSyntaxNode.__init__
+
+    def counting_init(self, *init_args, **init_kwargs):
+        created[0] += 1
+        original_init(self, *init_args, **init_kwargs)
+
+    ast.AbstractSyntaxNode.__init__ = counting_init
+    try:
+        func(*args)
+    finally:
+        ast.AbstractSyntaxNode.__init__ = original_init
+    return created[0]
+
+
+def main():
+    print('{:>8} {:>14} {:>14} {:>12} {:>12}'.format(
+        'lines', 'multi (nodes)', 'single (nodes)', 'multi (ms)',
+        'single (ms)'))
+    for size in SIZES:
+        cstree = lexer.get_concrete_syntax_tree_from_text(
+            ''.join(LINE.format(idx) for idx in range(size)))
+        row = []
+        for transform in (parser2.get_ast_from_cst_multipass,
+                          parser2.transform_cst_to_ast):
+            row.append(count_created_nodes(transform, cstree))
+        for transform in (parser2.get_ast_from_cst_multipass,
+                          parser2.transform_cst_to_ast):
+            row.append(1000 * min(timeit.repeat(
+                lambda: transform(cstree), number=1, repeat=3)))
+        print('{:8} {:14} {:14} {:12.2f} {:12.2f}'.format(size, *row))
+
+
+if __name__ == '__main__':
+    main()
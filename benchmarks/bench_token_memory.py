@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Token memory benchmark
+
+Compares the memory taken by the list of `cst.Token` objects returned by
+`lexer.get_flat_token_list` with the `cst.CompactTokenStream` returned by
+`lexer.get_compact_token_stream`, for the same source.
+
+Run with: `python benchmarks/bench_token_memory.py` (needs tracemalloc)
+"""
+from __future__ import unicode_literals, print_function, division
+import gc
+import tracemalloc
+
+from whispy_lispy import lexer
+
+LINE = '(def (f_{0} a b) (cond ((= a {0}) 1.5) (#t (sum a b "x y"))))\n'
+SIZES = (1000, 10000, 50000)
+
+
+def allocated_by(func, *args):
+    """Return the result of the function and the bytes it keeps allocated"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    print('{:>8} {:>10} {:>16} {:>16} {:>8}'.format(
+        'lines', 'tokens', 'list (B/tok)', 'compact (B/tok)', 'ratio'))
+    for size in SIZES:
+        text = ''.join(LINE.format(idx) for idx in range(size))
+        tokens, list_bytes = allocated_by(lexer.get_flat_token_list, text)
+        del tokens
+        stream, stream_bytes = allocated_by(
+            lexer.get_compact_token_stream, text)
+        count = len(stream)
+        print('{:8} {:10} {:16.1f} {:16.1f} {:8.1f}'.format(
+            size, count, list_bytes / count, stream_bytes / count,
+            list_bytes / stream_bytes))
+
+
+if __name__ == '__main__':
+    main()
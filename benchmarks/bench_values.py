@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Runtime value benchmark
+
+Measures the memory taken by the runtime values (`types.Int`, `types.Float`,
+`types.Bool`, `types.String`), and the time the tree interpreter needs for
+a few arithmetic heavy programs.
+
+Run with: `python benchmarks/bench_values.py` (needs tracemalloc)
+"""
+from __future__ import unicode_literals, print_function, division
+import gc
+import sys
+import timeit
+import tracemalloc
+
+from whispy_lispy import scopes2, skip_steps, types
+
+VALUE_COUNT = 100000
+VALUES = (
+    ('Int', lambda idx: types.Int((idx,))),
+    ('Float', lambda idx: types.Float((idx + 0.5,))),
+    ('Bool', lambda idx: types.Bool((idx % 2 == 0,))),
+    ('String', lambda idx: types.String(('s',))),
+)
+
+PROGRAMS = (
+    ('sum of squares', """
+(def (loop n acc)
+    (cond ((= n 0) acc) (#t (loop (- n 1) (+ acc (* n n))))))
+(loop 20000 0)
+"""),
+    ('mean', """
+(def (loop n acc)
+    (cond ((= n 0) acc) (#t (loop (- n 1) (+ acc (/ n 2.5))))))
+(/ (loop 20000 0.0) 20000)
+"""),
+    ('fact 300', """
+(def (fact n) (cond ((<= n 1) 1) (#t (* n (fact (- n 1))))))
+(fact 300)
+"""),
+)
+
+
+def allocated_by(func, *args):
+    """Return the result of the function and the bytes it keeps allocated"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    print('{:>16} {:>14}'.format('value', 'bytes/value'))
+    for name, make_value in VALUES:
+        # The python objects are made first, only the wrappers are measured
+        indexes = list(range(VALUE_COUNT))
+        values, size = allocated_by(
+            lambda: [make_value(idx) for idx in indexes])
+        # Don't count the list holding them
+        size -= sys.getsizeof(values)
+        print('{:>16} {:14.1f}'.format(name, size / VALUE_COUNT))
+
+    print()
+    print('{:>16} {:>14}'.format('program', 'time (ms)'))
+    for name, text in PROGRAMS:
+        tree = skip_steps.get_ast_from_text2(text)
+        timing = min(timeit.repeat(
+            lambda: skip_steps.get_engine('tree')(tree, scopes2.Scope()),
+            number=1, repeat=5))
+        print('{:>16} {:14.2f}'.format(name, 1000 * timing))
+
+
+if __name__ == '__main__':
+    main()
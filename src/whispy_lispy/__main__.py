@@ -1,12 +1,13 @@
 # coding -*- utf-8 -*-
 from __future__ import unicode_literals
+import os
 import sys
 # Why does this file exist, and why __main__?
 # For more info, read:
 # - https://www.python.org/dev/peps/pep-0338/
 # - https://docs.python.org/2/using/cmdline.html#cmdoption-m
 # - https://docs.python.org/3/using/cmdline.html#cmdoption-m
-from whispy_lispy import skip_steps, repl
+from whispy_lispy import skip_steps, repl, cache
 
 
 def main(argv=()):
@@ -20,10 +21,26 @@ def main(argv=()):
     Does stuff.
     """
     non_lispy_syntax = '-n' in argv
+    if '-B' in argv:
+        # Like python's -B: don't use the cache files of the scripts
+        cache.disk_ast_cache.enabled = False
+    # --engine=<name> selects the evaluator (see skip_steps.ENGINES)
+    engine = skip_steps.DEFAULT_ENGINE
+    for arg in argv:
+        if arg.startswith('--engine='):
+            engine = arg[len('--engine='):]
     if '-r' in argv:
         repl.repl(non_lispy_syntax)
+        return 0
+
+    # The first argument that's not a flag: a script path, or source code
+    source = [arg for arg in argv[1:] if not arg.startswith('-')][0]
+    if os.path.isfile(source):
+        skip_steps.interpret_file2(
+            source, non_lispy_syntax=non_lispy_syntax, engine=engine)
     else:
-        skip_steps.interpret_text2(argv[1], non_lispy_syntax=non_lispy_syntax)
+        skip_steps.interpret_text2(
+            source, non_lispy_syntax=non_lispy_syntax, engine=engine)
     return 0
 
 if __name__ == "__main__":
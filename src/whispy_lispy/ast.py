@@ -6,7 +6,13 @@ from whispy_lispy import types
 
 
 class AbstractSyntaxNode(object):
-    """An abstract syntax node"""
+    """An abstract syntax node
+
+    `index` is where the node starts in the source code (None if unknown).
+    Like for the concrete nodes, it's not part of the state of the node.
+    """
+    index = None
+
     def __init__(self, values, evaluable=True):
         """
         :type values: tuple
@@ -55,6 +61,15 @@ class RootAbstractSyntaxNode(Container):
 
 class Lambda(Container):
     """Represents the expression that creates a lambda function"""
+    # Whether the addresses of the symbols in the body are set (see
+    # `resolver.resolve_function`)
+    resolved = False
+    # The types.CallDescriptor of the functions it creates, once known
+    descriptor = None
+    # The arguments of the enclosing functions its functions capture, None
+    # for the whole defining scope (see `resolver.get_captured_slots`)
+    captured_slots = None
+
     def __repr__(self):
         return '<Lambda at {}>'.format(id(self))
 
@@ -66,7 +81,24 @@ class QuoteShorthand(AbstractSyntaxNode):
 
 
 class Symbol(AbstractSyntaxNode):
-    """Represents a symbol (variable or function name)"""
+    """Represents a symbol (variable or function name)
+
+    `symbol` is the interned `types.Symbol` of the name, so the interpreters
+    can look it up without creating it every time.
+    `address` is where the referenced parameter is, if it's known (see
+    `resolver.resolve_function`).
+    `free` tells that the resolver found it's not a parameter.
+    `cache` is the inline cache of the lookups: (global scope, its version,
+    value), see `interpreter2.lookup_global`.
+    """
+    address = None
+    free = False
+    cache = None
+
+    def __init__(self, values, evaluable=True):
+        super(Symbol, self).__init__(values, evaluable)
+        self.symbol = types.Symbol(values)
+
     def __repr__(self):
         return '<Symb: {}>'.format(self.values[0])
 
@@ -84,7 +116,7 @@ class Int(Value):
 
     @classmethod
     def from_parsed_result(cls, *args, **kwargs):
-        return types.Int((int(args[2][0]),))
+        return types.make_int(int(args[2][0]))
 
 
 class Float(Value):
@@ -104,7 +136,7 @@ class Bool(Value):
 
     @classmethod
     def from_parsed_result(cls, *args, **kwargs):
-        return types.Bool((True if args[2][0] == '#t' else False,))
+        return types.make_bool(args[2][0] == '#t')
 
 
 class String(Value):
@@ -140,6 +172,15 @@ class Assign(Container):
 
     Will be evaluated in a certain scope
     """
+    # Whether the addresses of the symbols in the function body are set
+    # (see `resolver.resolve_function`)
+    resolved = False
+    # The types.CallDescriptor of the functions it creates, once known
+    descriptor = None
+    # The arguments of the enclosing functions its functions capture, None
+    # for the whole defining scope (see `resolver.get_captured_slots`)
+    captured_slots = None
+
     def __repr__(self):
         if len(self.values) != 2:
             return '<Invalid Assign>'
@@ -0,0 +1,426 @@
+# -*- coding utf-8 -*-
+"""Caches the abstract syntax trees, so the same source isn't parsed twice
+
+The trees are shared between everybody asking for the same source, so they
+must not be modified. The interpreter never modifies them.
+
+`AstCache` keeps them in memory, `DiskAstCache` keeps them in files (like
+python's .pyc files), for the scripts run from files.
+"""
+from __future__ import unicode_literals, absolute_import
+import errno
+import hashlib
+import marshal
+import os
+import stat
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+import six
+
+import whispy_lispy
+from whispy_lispy import ast, types
+
+CacheStats = namedtuple(
+    'CacheStats', ['hits', 'misses', 'evictions', 'entries', 'size'])
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def get_source_digest(text):
+    """:param str text: the source code"""
+    return get_binary_source_digest(text.encode('utf-8'))
+
+
+def get_binary_source_digest(data):
+    """:param bytes|mmap.mmap data: the (utf-8 encoded) source code"""
+    return hashlib.sha1(data).digest()
+
+
+class AstCache(object):
+    """Bounded LRU cache of abstract syntax trees
+
+    The entries are keyed by the digest of the source and the syntax flag.
+    The size of an entry is the length of its utf-8 encoded source: the tree
+    grows with it. When either limit is exceeded, the least recently used
+    entries are evicted.
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        """
+        :param int max_entries: how many trees to keep at most
+        :param int max_bytes: the maximum total size of the sources whose
+            trees are kept
+        :param bool enabled: when False, nothing is looked up nor stored
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (tree, size)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_ast(self, text, non_lispy_syntax, parse):
+        """Return the cached tree for the source, or the one returned by
+        `parse(text, non_lispy_syntax)`, which is then cached
+
+        :param str text: the source code
+        :param bool non_lispy_syntax: whether `text` uses `func(a b)` calls
+        :param parse: function creating the tree, on cache misses
+        """
+        if not self.enabled:
+            return parse(text, non_lispy_syntax)
+
+        data = text.encode('utf-8')
+        key = (get_binary_source_digest(data), bool(non_lispy_syntax))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._move_to_end(key)
+                return entry[0]
+            self.misses += 1
+
+        tree = parse(text, non_lispy_syntax)
+        self.add(key, tree, len(data))
+        return tree
+
+    def add(self, key, tree, size):
+        """Store a tree, evicting the least recently used ones if needed"""
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._size -= old_entry[1]
+            self._entries[key] = (tree, size)
+            self._size += size
+            self._evict()
+
+    def _evict(self):
+        while (len(self._entries) > self.max_entries or
+               self._size > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def _move_to_end(self, key):
+        # OrderedDict.move_to_end doesn't exist on python 2
+        self._entries[key] = self._entries.pop(key)
+
+    def configure(self, max_entries=None, max_bytes=None, enabled=None):
+        """Change the limits, or enable/disable the cache. Disabling it
+        also empties it."""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if enabled is not None:
+                self.enabled = enabled
+                if not enabled:
+                    self._entries.clear()
+                    self._size = 0
+            self._evict()
+
+    def clear(self, reset_stats=False):
+        """Remove all the trees. Optionally, reset the counters too"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            if reset_stats:
+                self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self):
+        """:rtype: CacheStats"""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self._entries), self._size)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+CACHE_DIRECTORY_NAME = '__whispycache__'
+CACHE_FILE_SUFFIX = '.wlc'
+CACHE_FILE_MAGIC = b'WLAC'
+# Increase when the tree classes change, to invalidate the existing files
+CACHE_FORMAT_VERSION = 3
+# Set to use a single directory for all the cache files, instead of a
+# __whispycache__ directory next to every script
+CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = 'WHISPY_LISPY_CACHE_DIR'
+
+
+def get_cache_tag():
+    """Identifies the interpreter that wrote a cache file. Files written by
+    other versions are ignored."""
+    return 'whispy_lispy-{}-{}-py{}{}'.format(
+        whispy_lispy.__version__, CACHE_FORMAT_VERSION,
+        sys.version_info[0], sys.version_info[1])
+
+
+class DiskAstCache(object):
+    """Keeps the abstract syntax trees of script files in cache files
+
+    A cache file starts with a header containing the cache tag (see
+    `get_cache_tag`) and the digest of the source it was created from, and
+    only gets used if both match. The tree follows, serialized with
+    `dump_tree`: plain data, so loading a file never runs any code.
+
+    Files in directories that other users can write to are neither loaded
+    nor written (see `is_private_directory`).
+
+    The files are written to a temporary file first, then renamed, so
+    processes running the same script at the same time never see partial
+    files. Problems with reading or writing the files are ignored, and the
+    script simply gets parsed.
+    """
+    def __init__(self, cache_dir=None, enabled=True):
+        """
+        :param str cache_dir: where to keep all the cache files. By default
+            (None), they're kept in a __whispycache__ directory next to each
+            script, unless the WHISPY_LISPY_CACHE_DIR environment variable
+            says otherwise.
+        :param bool enabled: when False, nothing is loaded nor stored
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get(CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+
+    def get_cache_path(self, script_path, non_lispy_syntax):
+        """The path of the cache file for the given script"""
+        script_path = os.path.abspath(script_path)
+        name = os.path.basename(script_path)
+        if self.cache_dir is None:
+            directory = os.path.join(
+                os.path.dirname(script_path), CACHE_DIRECTORY_NAME)
+        else:
+            # Scripts from different directories can have the same name
+            directory = self.cache_dir
+            name = '{}-{}'.format(name, hashlib.sha1(
+                script_path.encode('utf-8')).hexdigest()[:16])
+
+        return os.path.join(directory, '{}.{}{}{}'.format(
+            name, get_cache_tag(), '-n' if non_lispy_syntax else '',
+            CACHE_FILE_SUFFIX))
+
+    def get_header(self, digest):
+        return (CACHE_FILE_MAGIC + get_cache_tag().encode('ascii') + b'\n' +
+                digest)
+
+    def load(self, script_path, digest, non_lispy_syntax):
+        """Return the cached tree of the script, if there is one for this
+        source digest
+
+        :param str script_path: the path of the script
+        :param bytes digest: the `get_binary_source_digest` of the script
+        :param bool non_lispy_syntax: whether `func(a b)` calls are used
+        :rtype: ast.RootAbstractSyntaxNode | None
+        """
+        if not self.enabled:
+            return None
+
+        header = self.get_header(digest)
+        path = self.get_cache_path(script_path, non_lispy_syntax)
+        try:
+            if not is_private_directory(os.path.dirname(path)):
+                return None
+            with open(path, 'rb') as cache_file:
+                if not _is_owned_by_current_user(
+                        os.fstat(cache_file.fileno())):
+                    return None
+                if cache_file.read(len(header)) != header:
+                    return None
+                return load_tree(cache_file.read())
+        except Exception:
+            # Missing, unreadable or corrupted file: parse the script
+            return None
+
+    def store(self, script_path, digest, non_lispy_syntax, tree):
+        """Write the tree of the script to its cache file
+
+        :return: whether the tree was stored
+        :rtype: bool
+        """
+        if not self.enabled:
+            return False
+
+        path = self.get_cache_path(script_path, non_lispy_syntax)
+        directory = os.path.dirname(path)
+        temp_path = None
+        try:
+            data = dump_tree(tree)
+            _make_directories(directory)
+            if not is_private_directory(directory):
+                return False
+            handle, temp_path = tempfile.mkstemp(
+                dir=directory, prefix='.tmp-', suffix=CACHE_FILE_SUFFIX)
+            with os.fdopen(handle, 'wb') as temp_file:
+                temp_file.write(self.get_header(digest))
+                temp_file.write(data)
+            _replace_file(temp_path, path)
+            return True
+        except (OSError, IOError, ValueError):
+            # ValueError: the tree contains values that can't be stored
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+
+# The tags of the records of a serialized tree
+RECORD_NODE = 0
+RECORD_TYPE = 1
+RECORD_VALUE = 2
+# What the serialized trees can contain
+NODE_CLASSES = dict(
+    (cls.__name__, cls) for cls in vars(ast).values()
+    if isinstance(cls, type) and issubclass(cls, ast.AbstractSyntaxNode))
+TYPE_CLASSES = dict(
+    (cls.__name__, cls) for cls in vars(types).values()
+    if isinstance(cls, type) and issubclass(cls, types.Type) and
+    cls is not types.Function)
+# The types with cached values (see `types.make_int`)
+VALUE_FACTORIES = {'Bool': types.make_bool, 'Int': types.make_int}
+PRIMITIVE_TYPES = (
+    (type(None), bool, float, six.text_type, bytes) + six.integer_types)
+
+
+def dump_tree(tree):
+    """Serialize the abstract syntax tree into plain data (with `marshal`)
+
+    The tree is flattened into a list of records, children first, so any
+    depth can be stored:
+    - (RECORD_VALUE, value) for the python values (symbol names, etc)
+    - (RECORD_TYPE, class name, values) for the `types` values
+    - (RECORD_NODE, class name, index, evaluable, child count) for the nodes,
+      whose children are the records before them
+
+    :param ast.AbstractSyntaxNode tree:
+    :rtype: bytes
+    :raises ValueError: if the tree contains other objects
+    """
+    records = []
+    stack = [(tree, False)]
+    while stack:
+        obj, children_done = stack.pop()
+        if isinstance(obj, ast.AbstractSyntaxNode):
+            if obj.__class__.__name__ not in NODE_CLASSES:
+                raise ValueError("Can't store node {!r}".format(obj))
+            if children_done:
+                records.append((
+                    RECORD_NODE, obj.__class__.__name__, obj.index,
+                    obj.evaluable, len(obj.values)))
+            else:
+                stack.append((obj, True))
+                stack.extend((child, False) for child in reversed(obj.values))
+        elif isinstance(obj, types.Type):
+            if (obj.__class__.__name__ not in TYPE_CLASSES or
+                    not _are_primitives(obj.values)):
+                raise ValueError("Can't store value {!r}".format(obj))
+            records.append(
+                (RECORD_TYPE, obj.__class__.__name__, tuple(obj.values)))
+        elif isinstance(obj, PRIMITIVE_TYPES):
+            records.append((RECORD_VALUE, obj))
+        else:
+            raise ValueError("Can't store value {!r}".format(obj))
+    return marshal.dumps(tuple(records), 2)
+
+
+def _load_value(name, values):
+    if name in VALUE_FACTORIES and len(values) == 1:
+        return VALUE_FACTORIES[name](values[0])
+    return TYPE_CLASSES[name](values)
+
+
+def load_tree(data):
+    """Inverse of `dump_tree`
+
+    :param bytes data:
+    :rtype: ast.AbstractSyntaxNode
+    :raises ValueError: if the data is not a valid tree
+    """
+    records = marshal.loads(data)
+    stack = []
+    for record in records:
+        tag = record[0]
+        if tag == RECORD_VALUE and _are_primitives(record[1:]):
+            stack.append(record[1])
+        elif tag == RECORD_TYPE and _are_primitives(record[2]):
+            stack.append(_load_value(record[1], record[2]))
+        elif tag == RECORD_NODE:
+            _, name, index, evaluable, count = record
+            start = len(stack) - count
+            if start < 0:
+                raise ValueError('Invalid tree')
+            node = NODE_CLASSES[name](tuple(stack[start:]), evaluable)
+            del stack[start:]
+            if index is not None:
+                node.index = index
+            stack.append(node)
+        else:
+            raise ValueError('Invalid record {!r}'.format(record))
+
+    if len(stack) != 1 or not isinstance(stack[0], ast.AbstractSyntaxNode):
+        raise ValueError('Invalid tree')
+    return stack[0]
+
+
+def _are_primitives(values):
+    return isinstance(values, tuple) and all(
+        isinstance(value, PRIMITIVE_TYPES) for value in values)
+
+
+def is_private_directory(directory):
+    """Whether the directory belongs to the current user, and nobody else
+    can write to it. Cache files from anywhere else could have been planted
+    by somebody else.
+
+    Always True where there are no file owners (e.g. windows)
+    """
+    if not hasattr(os, 'getuid'):
+        return True
+    try:
+        status = os.stat(directory)
+    except OSError:
+        return False
+    return (_is_owned_by_current_user(status) and
+            not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _is_owned_by_current_user(status):
+    return not hasattr(os, 'getuid') or status.st_uid == os.getuid()
+
+
+def _make_directories(directory):
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError as err:
+        # Another process might have just created it
+        if err.errno != errno.EEXIST:
+            raise
+
+
+def _replace_file(source, destination):
+    """Atomically rename `source` to `destination`, replacing it"""
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+    else:
+        # Python 2. Atomic on POSIX. Fails on windows if the destination
+        # exists (another process just wrote it), which is fine too.
+        try:
+            os.rename(source, destination)
+        except OSError:
+            os.remove(source)
+
+
+# The cache used by `skip_steps.get_ast_from_text2`
+ast_cache = AstCache()
+
+# The cache used by `skip_steps.get_ast_from_file2`
+disk_ast_cache = DiskAstCache()
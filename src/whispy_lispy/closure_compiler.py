@@ -0,0 +1,256 @@
+# -*- coding utf-8 -*-
+"""An alternative to `interpreter2.interpret_ast`
+
+Instead of dispatching on the node types every time a node is evaluated,
+every node of the abstract syntax tree gets compiled once into a Python
+closure that takes the scope as its only argument. Evaluating the tree means
+calling the closure of the root node.
+
+The bodies of the functions get compiled when their definition is compiled,
+so calling a whispy lispy function just means calling its pre-resolved
+closure in a new scope.
+
+Main function: `interpret_ast` - same signature and semantics as
+`interpreter2.interpret_ast`
+"""
+from __future__ import unicode_literals, absolute_import
+
+from whispy_lispy import ast, types, scopes2, operations, resolver
+
+
+def interpret_ast(astree, scope=None):
+    """Compile the tree, and evaluate it in the given scope
+
+    :param ast.AbstractSyntaxNode astree:
+    :rtype: types.Type
+    """
+    if isinstance(astree, types.Type):
+        return astree
+
+    if scope is None:
+        scope = scopes2.Scope()
+
+    return compile_ast(astree)(scope)
+
+
+def compile_ast(astree):
+    """Compile the abstract syntax node into a callable
+
+    :param ast.AbstractSyntaxNode | types.Type astree:
+    :return: a callable that takes a scope and returns the value of the node
+    """
+    if isinstance(astree, types.Type):
+        return compile_constant(astree)
+
+    if astree.is_leaf() and not astree.is_root():
+        return compile_leaf(astree)
+
+    if isinstance(astree, ast.Apply):
+        return compile_list(astree)
+
+    if isinstance(astree, ast.Assign):
+        return compile_assign(astree)
+
+    if isinstance(astree, ast.Condition):
+        return compile_condition(astree)
+
+    if isinstance(astree, ast.Lambda):
+        return compile_lambda(astree)
+
+    return compile_sequence(astree)
+
+
+def compile_constant(value):
+    def constant(scope):
+        return value
+    return constant
+
+
+def compile_leaf(astree):
+    if isinstance(astree, ast.Symbol):
+        return compile_symbol(astree)
+
+    if not astree.values:
+        # Fail just like the interpreter would, but only when evaluated
+        def empty_leaf(scope):
+            return astree[0]
+        return empty_leaf
+
+    return compile_constant(astree[0])
+
+
+def compile_symbol(astree):
+    """Parameters get looked up by their address, the other symbols by name
+
+    :param ast.Symbol astree:
+    """
+    key = astree.symbol
+    address = astree.address
+
+    if address is None:
+        def dereference(scope):
+            return scope[key]
+        return dereference
+
+    def dereference_address(scope):
+        return scopes2.lookup_address(scope, address, key)
+    return dereference_address
+
+
+def compile_sequence(astree):
+    """The root node (or any other container): evaluate all the children,
+    and return the value of the last one
+    """
+    compiled = tuple(compile_ast(elem) for elem in astree.values)
+
+    if not compiled:
+        return compile_constant(None)
+
+    if len(compiled) == 1:
+        return compiled[0]
+
+    def sequence(scope):
+        result = None
+        for code in compiled:
+            result = code(scope)
+        return result
+    return sequence
+
+
+def compile_list(astree):
+    """Compile a function application"""
+    get_function = compile_function_reference(astree[0])
+    arguments = tuple(compile_ast(val) for val in astree.values[1:])
+
+    def apply(scope):
+        func = get_function(scope)
+        args = [argument(scope) for argument in arguments]
+        return call_function(func, scope, args)
+    return apply
+
+
+def call_function(func, scope, args):
+    """Call whispy lispy functions by running their compiled bodies,
+    and the builtin functions the way the interpreter would
+
+    :param types.Function | callable func:
+    :param scope: the scope from where the function is called
+    :param list args: the evaluated arguments
+    """
+    if isinstance(func, types.Function):
+        return get_compiled_body(func)(scope.call_frame(func, args))
+
+    return func(interpret_ast, scope, *args)
+
+
+def get_compiled_body(func):
+    """Return the compiled code of the function. Functions not created by
+    this module (e.g. by `interpreter2`) get their code compiled on the
+    first call.
+
+    :param types.Function func:
+    """
+    try:
+        return func.compiled_code
+    except AttributeError:
+        func.compiled_code = compile_ast(func.code)
+        return func.compiled_code
+
+
+def compile_function_reference(astree):
+    """
+    :param ast.AbstractSyntaxNode astree: a symbol, or expression evaluating to
+        a function
+    """
+    if isinstance(astree, ast.Operator):
+        return compile_constant(operations.OPERATIONS[astree[0]])
+    if isinstance(astree, ast.Symbol):
+        return compile_symbol(astree)
+    elif isinstance(astree, ast.Container):
+        return compile_ast(astree)
+
+    def unknown_function(scope):
+        raise Exception("Couldn't get the function you specified:")
+    return unknown_function
+
+
+def compile_assign(astree):
+    # Simple symbol assignment
+    if isinstance(astree[0], ast.Symbol):
+        key = astree[0].symbol
+        value = compile_ast(astree[1])
+
+        def assign(scope):
+            scope[key] = value(scope)
+        return assign
+
+    # Function assignment
+    elif isinstance(astree[0], ast.Apply):
+        key = types.Symbol(astree[0].values[0].values)
+        create_function = compile_function(astree)
+
+        def assign_function(scope):
+            scope[key] = create_function(scope)
+        return assign_function
+
+    return compile_constant(None)
+
+
+def compile_lambda(astree):
+    return compile_function(astree, is_lambda=True)
+
+
+def compile_function(astree, is_lambda=False):
+    """Compile the body of the function once. The returned callable creates
+    the function objects (which share the compiled body) in a given scope.
+    """
+    # For a normal definition, the first node in the list is the function name
+    # For a lambda, the list starts with the arguments straight away
+    start_idx = 0 if is_lambda else 1
+
+    params = tuple(
+        [types.Symbol(elem.values) for elem in astree[0].values[start_idx:]])
+    name = types.String(
+        astree[0][0].values if not is_lambda else ('lambda',))
+    code = astree[1]
+    if not astree.resolved:
+        # It may get compiled without the functions enclosing it (see
+        # `get_compiled_body`), so they're not known
+        resolver.resolve_function(astree, is_lambda, complete=False)
+    compiled_code = compile_ast(code)
+    descriptor = types.CallDescriptor(name.value, params, code)
+    captured_slots = astree.captured_slots
+
+    def create_function(scope):
+        if captured_slots is not None:
+            # Keep only what the function needs from the scope
+            scope = scopes2.capture(scope, captured_slots)
+        function = types.Function((name, params, code, scope), descriptor)
+        function.compiled_code = compiled_code
+        return function
+    return create_function
+
+
+def compile_condition(astree):
+    clauses = tuple(
+        (compile_clause_part(value, 0), compile_clause_part(value, 1))
+        for value in astree.values)
+
+    def condition(scope):
+        for predicate, result in clauses:
+            if types.is_true(predicate(scope)):
+                return result(scope)
+    return condition
+
+
+def compile_clause_part(clause, idx):
+    """Compile the predicate (idx 0) or the result (idx 1) of a condition
+    clause. Malformed clauses only fail when the missing part gets evaluated.
+    """
+    try:
+        part = clause[idx]
+    except IndexError:
+        def missing_part(scope):
+            return clause[idx]
+        return missing_part
+    return compile_ast(part)
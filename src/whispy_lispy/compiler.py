@@ -1,5 +1,439 @@
 # -*- coding utf-8 -*-
-"""This module marks the intention to someday convert the AST emitted by the
-parser into some intermediate representation (or assembler core?) to maybe
-run on some virtual machines, like the python interpreter, JVM, etc.
-"""
\ No newline at end of file
+"""Compiles the AST emitted by the parser into bytecode, and runs it on a
+small stack based virtual machine.
+
+The bytecode of a piece of code is a flat list of integers: every
+instruction is an opcode followed by its argument (0 if the instruction
+doesn't need one). The arguments point into the constant pool or the symbol
+table of the code object, or to other instructions (for the jumps).
+
+Calling a whispy lispy function doesn't recurse in Python: the VM saves the
+current frame on its own frame stack, and `RETURN_VALUE` restores it. The
+frame stack is limited to `MAX_CALL_DEPTH` frames, to stop infinite
+recursions before they use up the memory: exceeding it raises
+`exceptions.RecursionDepthExceeded`.
+
+Malformed trees (like a `cond` clause without a result) don't fail when
+they're compiled, but when the malformed node gets evaluated, like they do
+in `interpreter2`.
+
+Main function: `interpret_ast` - same signature and semantics as
+`interpreter2.interpret_ast`
+"""
+from __future__ import unicode_literals, absolute_import
+
+from whispy_lispy import ast, types, scopes2, operations, exceptions
+
+# The opcodes
+LOAD_CONST = 1
+LOAD_NAME = 2
+STORE_NAME = 3
+POP_TOP = 4
+JUMP_ABSOLUTE = 5
+POP_JUMP_IF_NOT_TRUE = 6
+MAKE_FUNCTION = 7
+CALL_FUNCTION = 8
+RETURN_VALUE = 9
+
+OPCODE_NAMES = {
+    LOAD_CONST: 'LOAD_CONST',
+    LOAD_NAME: 'LOAD_NAME',
+    STORE_NAME: 'STORE_NAME',
+    POP_TOP: 'POP_TOP',
+    JUMP_ABSOLUTE: 'JUMP_ABSOLUTE',
+    POP_JUMP_IF_NOT_TRUE: 'POP_JUMP_IF_NOT_TRUE',
+    MAKE_FUNCTION: 'MAKE_FUNCTION',
+    CALL_FUNCTION: 'CALL_FUNCTION',
+    RETURN_VALUE: 'RETURN_VALUE',
+}
+
+# How many whispy lispy function calls can be in progress at once
+MAX_CALL_DEPTH = 100000
+
+
+class CodeObject(object):
+    """The compiled code of the whole program, or of a function body
+
+    :ivar list instructions: opcode, argument, opcode, argument...
+    :ivar list constants: the constant pool
+    :ivar list symbols: the symbol table (`types.Symbol` instances)
+    :ivar types.String name: the function name
+    :ivar tuple params: the formal parameter names (for functions)
+    :ivar ast.AbstractSyntaxNode code: the AST this was compiled from
+    :ivar types.CallDescriptor descriptor: shared by the functions created
+        from this code
+    """
+    def __init__(self, name, params=(), code=None):
+        self.name = name
+        self.params = params
+        self.code = code
+        self.descriptor = types.CallDescriptor(name.value, params, code)
+        self.instructions = []
+        self.constants = []
+        self.symbols = []
+        self._constant_indexes = {}
+        self._symbol_indexes = {}
+
+    def __repr__(self):
+        return '<Code {} at {}>'.format(self.name.values[0], id(self))
+
+    def emit(self, opcode, arg=0):
+        """Append an instruction, and return its position"""
+        self.instructions.extend((opcode, arg))
+        return len(self.instructions) - 2
+
+    def patch(self, position, arg):
+        """Change the argument of the instruction at the given position"""
+        self.instructions[position + 1] = arg
+
+    @property
+    def position(self):
+        """The position of the next instruction to be emitted"""
+        return len(self.instructions)
+
+    def add_constant(self, value):
+        """Return the index of the value in the constant pool
+
+        Equal values of the same class share an entry
+        """
+        try:
+            key = (value.__class__, value)
+            if key in self._constant_indexes:
+                return self._constant_indexes[key]
+        except TypeError:  # unhashable
+            key = None
+
+        self.constants.append(value)
+        if key is not None:
+            self._constant_indexes[key] = len(self.constants) - 1
+        return len(self.constants) - 1
+
+    def add_symbol(self, symbol):
+        """Return the index of the `types.Symbol` in the symbol table"""
+        if symbol not in self._symbol_indexes:
+            self.symbols.append(symbol)
+            self._symbol_indexes[symbol] = len(self.symbols) - 1
+        return self._symbol_indexes[symbol]
+
+
+def compile_ast(astree):
+    """Compile the whole program
+
+    :param ast.AbstractSyntaxNode astree: usually the root node
+    :rtype: CodeObject
+    """
+    code = CodeObject(types.String(('<module>',)), code=astree)
+    compile_node(astree, code)
+    code.emit(RETURN_VALUE)
+    return code
+
+
+class DeferredError(object):
+    """A builtin-like function that raises the error met while compiling a
+    node. The node compiles to a call to it, so the error is raised only if
+    the node gets evaluated.
+    """
+    def __init__(self, error):
+        self.error_class = error.__class__
+        self.error_args = error.args
+
+    def __repr__(self):
+        return '<Deferred {}{!r}>'.format(
+            self.error_class.__name__, self.error_args)
+
+    def __call__(self, interpreter, scope, *args):
+        raise self.error_class(*self.error_args)
+
+
+def compile_node(astree, code):
+    """Emit the instructions that push the value of the node on the stack
+
+    If the node can't be compiled, it gets replaced by a call raising the
+    error, when evaluated.
+
+    :param ast.AbstractSyntaxNode | types.Type astree:
+    :param CodeObject code:
+    """
+    start = code.position
+    try:
+        _compile_node(astree, code)
+    except RuntimeError:
+        # Too deep. Not a problem of the node.
+        raise
+    except Exception as error:
+        del code.instructions[start:]
+        code.emit(LOAD_CONST, code.add_constant(DeferredError(error)))
+        code.emit(CALL_FUNCTION, 0)
+
+
+def _compile_node(astree, code):
+    if isinstance(astree, types.Type):
+        code.emit(LOAD_CONST, code.add_constant(astree))
+
+    elif astree.is_leaf() and not astree.is_root():
+        compile_leaf(astree, code)
+
+    elif isinstance(astree, ast.Apply):
+        compile_list(astree, code)
+
+    elif isinstance(astree, ast.Assign):
+        compile_assign(astree, code)
+
+    elif isinstance(astree, ast.Condition):
+        compile_condition(astree, code)
+
+    elif isinstance(astree, ast.Lambda):
+        compile_function(astree, code, is_lambda=True)
+
+    else:
+        compile_sequence(astree, code)
+
+
+def compile_leaf(astree, code):
+    if isinstance(astree, ast.Symbol):
+        code.emit(LOAD_NAME, code.add_symbol(astree.symbol))
+    else:
+        code.emit(LOAD_CONST, code.add_constant(astree[0]))
+
+
+def compile_sequence(astree, code):
+    """Evaluate all the children, keep the value of the last one"""
+    if not astree.values:
+        code.emit(LOAD_CONST, code.add_constant(None))
+        return
+
+    for idx, elem in enumerate(astree.values):
+        if idx:
+            code.emit(POP_TOP)
+        compile_node(elem, code)
+
+
+def compile_list(astree, code):
+    """Push the function, then the arguments, then call the function"""
+    compile_function_reference(astree[0], code)
+    for val in astree.values[1:]:
+        compile_node(val, code)
+    code.emit(CALL_FUNCTION, len(astree.values) - 1)
+
+
+def compile_function_reference(astree, code):
+    """
+    :param ast.AbstractSyntaxNode astree: a symbol, or expression evaluating to
+        a function
+    """
+    if isinstance(astree, ast.Operator):
+        code.emit(LOAD_CONST,
+                  code.add_constant(operations.OPERATIONS[astree[0]]))
+    elif isinstance(astree, ast.Symbol):
+        code.emit(LOAD_NAME, code.add_symbol(astree.symbol))
+    elif isinstance(astree, ast.Container):
+        compile_node(astree, code)
+    else:
+        raise Exception("Couldn't get the function you specified:")
+
+
+def compile_assign(astree, code):
+    # Simple symbol assignment
+    if isinstance(astree[0], ast.Symbol):
+        compile_node(astree[1], code)
+        code.emit(STORE_NAME, code.add_symbol(astree[0].symbol))
+
+    # Function assignment
+    elif isinstance(astree[0], ast.Apply):
+        compile_function(astree, code)
+        code.emit(STORE_NAME,
+                  code.add_symbol(types.Symbol(astree[0].values[0].values)))
+
+    # Assignments evaluate to nothing
+    code.emit(LOAD_CONST, code.add_constant(None))
+
+
+def compile_function(astree, code, is_lambda=False):
+    """Compile the function body into its own code object, stored in the
+    constant pool. `MAKE_FUNCTION` will create the function from it.
+    """
+    # For a normal definition, the first node in the list is the function name
+    # For a lambda, the list starts with the arguments straight away
+    start_idx = 0 if is_lambda else 1
+
+    params = tuple(
+        [types.Symbol(elem.values) for elem in astree[0].values[start_idx:]])
+    name = types.String(
+        astree[0][0].values if not is_lambda else ('lambda',))
+
+    code.emit(MAKE_FUNCTION,
+              code.add_constant(compile_function_body(name, params, astree[1])))
+
+
+def compile_function_body(name, params, body):
+    """
+    :param types.String name: the function name
+    :param tuple params: the formal parameter names
+    :param ast.AbstractSyntaxNode body: the AST of the function body
+    :rtype: CodeObject
+    """
+    function_code = CodeObject(name, params, body)
+    compile_node(body, function_code)
+    function_code.emit(RETURN_VALUE)
+    return function_code
+
+
+def compile_condition(astree, code):
+    """Every clause tests its predicate, and jumps to the next clause if it's
+    not true. If none of them is true, the condition evaluates to nothing.
+    """
+    jumps_to_end = []
+    for clause in astree.values:
+        compile_node(clause[0], code)
+        jump_to_next_clause = code.emit(POP_JUMP_IF_NOT_TRUE)
+        compile_node(clause[1], code)
+        jumps_to_end.append(code.emit(JUMP_ABSOLUTE))
+        code.patch(jump_to_next_clause, code.position)
+
+    code.emit(LOAD_CONST, code.add_constant(None))
+    for jump in jumps_to_end:
+        code.patch(jump, code.position)
+
+
+def get_function_code(func):
+    """Return the code object of the function. Functions not created by the
+    VM (e.g. by `interpreter2`) get compiled on their first call.
+
+    :param types.Function func:
+    :rtype: CodeObject
+    """
+    try:
+        return func.bytecode
+    except AttributeError:
+        func.bytecode = compile_function_body(
+            types.String((func.name,)), func.params, func.code)
+        return func.bytecode
+
+
+def run(code, scope):
+    """The virtual machine: execute the code object in the scope
+
+    :param CodeObject code:
+    :param scope: the scope to run the code in
+    :rtype: types.Type
+    """
+    stack = []
+    frames = []
+    instructions, constants, symbols = (
+        code.instructions, code.constants, code.symbols)
+    is_true = types.is_true
+    pc = 0
+
+    while True:
+        opcode = instructions[pc]
+        arg = instructions[pc + 1]
+        pc += 2
+
+        if opcode == LOAD_NAME:
+            stack.append(scope[symbols[arg]])
+
+        elif opcode == LOAD_CONST:
+            stack.append(constants[arg])
+
+        elif opcode == CALL_FUNCTION:
+            if arg:
+                args = stack[-arg:]
+                del stack[-arg:]
+            else:
+                args = []
+            func = stack.pop()
+
+            if not isinstance(func, types.Function):
+                stack.append(func(interpret_ast, scope, *args))
+                continue
+
+            if len(frames) >= MAX_CALL_DEPTH:
+                raise exceptions.RecursionDepthExceeded(
+                    'More than {} nested function calls'.format(
+                        MAX_CALL_DEPTH))
+            frames.append((code, pc, scope))
+            scope = scope.call_frame(func, args)
+            code = get_function_code(func)
+            instructions, constants, symbols = (
+                code.instructions, code.constants, code.symbols)
+            pc = 0
+
+        elif opcode == RETURN_VALUE:
+            # The return value stays on the stack, for the caller
+            if not frames:
+                return stack.pop()
+            code, pc, scope = frames.pop()
+            instructions, constants, symbols = (
+                code.instructions, code.constants, code.symbols)
+
+        elif opcode == POP_JUMP_IF_NOT_TRUE:
+            if not is_true(stack.pop()):
+                pc = arg
+
+        elif opcode == JUMP_ABSOLUTE:
+            pc = arg
+
+        elif opcode == POP_TOP:
+            stack.pop()
+
+        elif opcode == STORE_NAME:
+            scope[symbols[arg]] = stack.pop()
+
+        elif opcode == MAKE_FUNCTION:
+            function_code = constants[arg]
+            func = types.Function((
+                function_code.name, function_code.params,
+                function_code.code, scope), function_code.descriptor)
+            func.bytecode = function_code
+            stack.append(func)
+
+        else:
+            raise Exception('Unknown opcode {} at {}'.format(opcode, pc - 2))
+
+
+def interpret_ast(astree, scope=None):
+    """Compile the tree, and run it in the given scope
+
+    :param ast.AbstractSyntaxNode astree:
+    :rtype: types.Type
+    """
+    if isinstance(astree, types.Type):
+        return astree
+
+    if scope is None:
+        scope = scopes2.Scope()
+
+    return run(compile_ast(astree), scope)
+
+
+def disassemble(code):
+    """Return a human readable listing of the code object, and of the
+    functions defined in it
+
+    :param CodeObject code:
+    :rtype: str|unicode
+    """
+    lines = []
+    nested = []
+    lines.append('Disassembly of {!r}:'.format(code))
+    for pc in range(0, len(code.instructions), 2):
+        opcode, arg = code.instructions[pc], code.instructions[pc + 1]
+        name = OPCODE_NAMES.get(opcode, '<{}>'.format(opcode))
+        if opcode in (LOAD_CONST, MAKE_FUNCTION):
+            detail = '{} ({!r})'.format(arg, code.constants[arg])
+        elif opcode in (LOAD_NAME, STORE_NAME):
+            detail = '{} ({})'.format(arg, code.symbols[arg].values[0])
+        elif opcode in (JUMP_ABSOLUTE, POP_JUMP_IF_NOT_TRUE):
+            detail = 'to {}'.format(arg)
+        elif opcode == CALL_FUNCTION:
+            detail = '{}'.format(arg)
+        else:
+            detail = ''
+        lines.append('{:>6} {:<22}{}'.format(pc, name, detail).rstrip())
+        if opcode == MAKE_FUNCTION:
+            nested.append(code.constants[arg])
+
+    for function_code in nested:
+        lines.append('')
+        lines.append(disassemble(function_code))
+    return '\n'.join(lines)
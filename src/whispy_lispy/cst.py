@@ -5,6 +5,7 @@ Concrete syntax tree stuff
 Lexer should return tokens that are instances of classes found here
 """
 from __future__ import unicode_literals
+from array import array
 import six
 
 
@@ -44,18 +45,85 @@ class Token(object):
         return self.value == other.value
 
 
+# The kinds of concrete syntax nodes. Computed once, when the node is created
+KIND_LIST = 1
+KIND_STRING = 2
+KIND_BOOL = 3
+KIND_INT = 4
+KIND_FLOAT = 5
+KIND_OPERATOR = 6
+KIND_SYMBOL = 7
+KIND_QUOTE = 8
+KIND_DEFINITION = 9
+KIND_CONDITION = 10
+KIND_LAMBDA = 11
+
+# The kinds of the leaves holding special words
+KEYWORD_KINDS = dict(
+    [(operator, KIND_OPERATOR) for operator in keywords.OPERATORS] +
+    [(keywords.OPERATOR_QUOTE, KIND_QUOTE)] +
+    [(alias, KIND_DEFINITION) for alias in keywords.DEFINITION_ALIASES] +
+    [(alias, KIND_CONDITION) for alias in keywords.CONDITION_ALIASES] +
+    [(keywords.LAMBDA, KIND_LAMBDA)]
+)
+
+# Kinds of the leaves that hold strings
+SYMBOL_KINDS = frozenset(
+    [KIND_STRING, KIND_SYMBOL, KIND_OPERATOR, KIND_QUOTE, KIND_DEFINITION,
+     KIND_CONDITION, KIND_LAMBDA])
+
+
+def get_value_kind(value):
+    """Return the kind of a leaf node holding this single value
+
+    Strings with quotes at both ends are string literals, anything else is a
+    symbol, unless it's a keyword or an operator.
+
+    :param value: a python value, as found by the lexer
+    :rtype: int | None
+    """
+    if isinstance(value, bool):
+        return KIND_BOOL
+    if isinstance(value, six.integer_types):
+        return KIND_INT
+    if isinstance(value, float):
+        return KIND_FLOAT
+    if isinstance(value, six.string_types):
+        if value[:1] == '"' and value[-1:] == '"':
+            return KIND_STRING
+        return KEYWORD_KINDS.get(value, KIND_SYMBOL)
+    return None
+
+
 class ConcreteSyntaxNode(object):
     """A node in the concrete syntax tree.
 
-    The state of this node is kept as a tuple
+    The state of this node is kept as a tuple. Its kind (one of the KIND_*
+    constants, or None if it can't be determined) makes classifying it a
+    simple lookup.
+
+    The index of the node (where it starts in the source code) is not part of
+    its state: nodes with different indexes are still equal.
     """
-    __slots__ = ['values']
+    __slots__ = ['values', 'kind', 'index']
 
-    def __init__(self, values):
+    def __init__(self, values, kind=None, index=None):
         """
         The tuple either contains other nodes, or values. Not both!
         :type values: tuple
+        :param int kind: the kind of the node. If the creator already knows
+            it (like the lexer), the values are not validated.
+        :param int index: the index of the node in the source code
         """
+        if kind is None:
+            kind = self.get_kind(values)
+        self.values = values
+        self.kind = kind
+        self.index = index
+
+    @staticmethod
+    def get_kind(values):
+        """Validate the values of a node, and return its kind"""
         types = set(type(elem) for elem in values)
         if len(types) > 1:
             raise CSTError(
@@ -63,7 +131,11 @@ class ConcreteSyntaxNode(object):
                 "simple values, not both. This node contains {} value(s): {}"
                 .format(len(types), values)
             )
-        self.values = values
+        if values and isinstance(values[0], ConcreteSyntaxNode):
+            return KIND_LIST
+        if len(values) == 1:
+            return get_value_kind(values[0])
+        return None
 
     def __eq__(self, other):
         if other is None:
@@ -76,49 +148,29 @@ class ConcreteSyntaxNode(object):
         return '<cN {}>'.format(self.values)
 
     def is_operator(self):
-        return (
-            len(self.values) == 1 and
-            self.values[0] in keywords.OPERATORS
-        )
+        return self.kind == KIND_OPERATOR
 
     def is_root(self):
         return isinstance(self, RootConcreteSyntaxnode)
 
     def is_leaf(self):
-        return all(
-            not isinstance(elem, ConcreteSyntaxNode) for elem in self.values)
+        return self.kind != KIND_LIST
 
     def is_symbol(self):
-        return (
-            len(self.values) == 1 and
-            isinstance(self.values[0], six.string_types)
-        )
+        return self.kind in SYMBOL_KINDS
 
     def is_int(self):
-        return (
-            len(self.values) == 1 and
-            isinstance(self.values[0], int)
-        )
+        # bools are ints too
+        return self.kind == KIND_INT or self.kind == KIND_BOOL
 
     def is_float(self):
-        return (
-            len(self.values) == 1 and
-            isinstance(self.values[0], float)
-        )
+        return self.kind == KIND_FLOAT
 
     def is_bool(self):
-        return (
-            len(self.values) == 1 and
-            isinstance(self.values[0], bool)
-        )
+        return self.kind == KIND_BOOL
 
     def is_string(self):
-        return (
-            len(self.values) == 1 and
-            isinstance(self.values[0], six.string_types) and
-            self.values[0][0] == '"' and
-            self.values[0][-1] == '"'
-        )
+        return self.kind == KIND_STRING
 
     def symbol_equals(self, param):
         if not self.is_symbol():
@@ -157,3 +209,57 @@ class IncrementNesting(NestingCommand):
 class DecrementNesting(NestingCommand):
     def __init__(self, _=None, source=None, index=None):
         super(DecrementNesting, self).__init__(['<DEC>'], source, index)
+
+
+class CompactTokenStream(object):
+    """A flat token list, stored as parallel arrays of token kinds, start
+    offsets and lengths
+
+    Takes a few bytes per token, instead of a `Token` object each. The token
+    values are only decoded from the source when they're needed. Indexing
+    or iterating it still gives `Token` instances, so it can be used in place
+    of a token list.
+    """
+    __slots__ = ['source', 'converters', 'kinds', 'starts', 'lengths']
+
+    def __init__(self, source, converters):
+        """
+        :param str source: the source code
+        :param converters: sequence of token creators (see
+            `lexer.make_token`). The kind of a token is its converter's index
+        """
+        self.source = source
+        self.converters = converters
+        self.kinds = array(str('B'))
+        self.starts = array(str('l'))
+        self.lengths = array(str('l'))
+
+    def append(self, kind, start, length):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, idx):
+        start = self.starts[idx]
+        return self.converters[self.kinds[idx]](
+            self.text(idx), self.source, start)
+
+    def __iter__(self):
+        for idx in six.moves.range(len(self.kinds)):
+            yield self[idx]
+
+    def text(self, idx):
+        """The source text of the token at `idx`"""
+        start = self.starts[idx]
+        return self.source[start:start + self.lengths[idx]]
+
+    def value(self, idx):
+        """The python value of the token at `idx`, without creating a Token
+        """
+        return self.converters[self.kinds[idx]].convert(self.text(idx))
+
+    def __repr__(self):
+        return '<CompactTokenStream of {} tokens>'.format(len(self))
@@ -13,6 +13,9 @@ class WhispyLispySyntaxError(BaseWhispyLispyError):
         :param str source: the source code that contains the error
         :param int index: the source index where the error begins
         """
+        self.source = source
+        self.index = index
+        self.extra_info = extra_info
         line, row, indication = self.get_all_template_params(source, index)
         msg = (
             "\nSyntax error at line {line}, row {row}:\n{extra}\n"
@@ -70,3 +73,15 @@ class UnboundSymbol(BaseWhispyLispyError):
 
 class EvaluationError(BaseWhispyLispyError):
     pass
+
+
+class ArityError(EvaluationError):
+    """A function called with the wrong number of arguments"""
+
+
+class RecursionDepthExceeded(BaseWhispyLispyError, RuntimeError):
+    """Too many nested function calls
+
+    Also a RuntimeError, like the error python raises when its own recursion
+    limit is exceeded.
+    """
@@ -5,41 +5,88 @@ function `get_ast_from_cst`
 """
 from __future__ import unicode_literals, absolute_import
 
-from whispy_lispy import ast, types, scopes2, operations
+from whispy_lispy import ast, types, scopes2, operations, resolver
+
+
+# The hits and misses of the inline caches of the called functions, and of
+# the other symbols
+call_site_stats = scopes2.CacheStats()
+variable_stats = scopes2.CacheStats()
 
 
 def interpret_ast(astree, scope=None):
     """Main interpreter activity
 
+    Works as a trampoline: the expressions in tail position (the last
+    expression of a container, the chosen branch of a condition, the body of
+    a called function) are evaluated by the same loop, instead of a recursive
+    call. So tail recursive functions run in constant python stack.
+
     :param ast.AbstractSyntaxNode astree:
     :rtype: types.Type
     """
-    result = None  # need some type for this
-    if isinstance(astree, types.Type):
-        return astree
-
     if scope is None:
         scope = scopes2.Scope()
 
-    if astree.is_leaf() and not astree.is_root():
-        return interpret_leaf(astree, scope)
+    # Whether `scope` was created by this loop, for a function call
+    in_function_frame = False
+
+    while True:
+        if isinstance(astree, types.Type):
+            return astree
+
+        if astree.is_leaf() and not astree.is_root():
+            return interpret_leaf(astree, scope)
+
+        if isinstance(astree, ast.Apply):
+            func, args = evaluate_list(astree, scope)
+            if not isinstance(func, types.Function):
+                return func(interpret_ast, scope, *args)
+
+            # Tail call: continue with the body of the function
+            scope = scopes2.FunctionScope(
+                parent=get_tail_call_parent(scope, func, in_function_frame),
+                arguments=args, closure_scope=func.scope,
+                descriptor=func.descriptor)
+            in_function_frame = True
+            astree = func.code
+            continue
+
+        if isinstance(astree, ast.Assign):
+            return interpret_assign(astree, scope)
 
-    if isinstance(astree, ast.Apply):
-        return interpret_list(astree, scope)
+        if isinstance(astree, ast.Condition):
+            astree = select_condition_branch(astree, scope)
+            if astree is None:
+                return None
+            continue
 
-    if isinstance(astree, ast.Assign):
-        return interpret_assign(astree, scope)
+        if isinstance(astree, ast.Lambda):
+            return interpret_lambda(astree, scope)
 
-    if isinstance(astree, ast.Condition):
-        return interpret_condition(astree, scope)
+        if not astree.values:
+            return None
 
-    if isinstance(astree, ast.Lambda):
-        return interpret_lambda(astree, scope)
+        for elem in astree.values[:-1]:
+            interpret_ast(elem, scope)
+        astree = astree.values[-1]
 
-    for elem in astree.values:
-        result = interpret_ast(elem, scope)
 
-    return result
+def get_tail_call_parent(scope, func, in_function_frame):
+    """Return the parent scope for calling `func` from `scope`
+
+    The frame making a tail call is done, so it's left out of the chain of
+    the new frame when none of its symbols could be looked up through it
+    anymore. Otherwise the chain would grow with every iteration of a loop.
+
+    :param scopes2.Scope scope: the scope making the call
+    :param types.Function func: the called function
+    :param bool in_function_frame: whether `scope` belongs to a function
+        call which has nothing left to evaluate after this one
+    """
+    if in_function_frame and scope.is_shadowed_by(func.params, func.scope):
+        return scope.parent
+    return scope
 
 
 def interpret_operator(astree):
@@ -50,17 +97,58 @@ def interpret_lambda(astree, scope):
     return create_function(astree, scope, is_lambda=True)
 
 
-def interpret_condition(astree, scope):
+def select_condition_branch(astree, scope):
+    """Return the expression of the first clause whose condition is true,
+    or None if there's no such clause"""
     for value in astree.values:
         condition = value[0]
-        if interpret_ast(condition, scope) == types.Bool((True,)):
-            return interpret_ast(value[1], scope)
+        if types.is_true(interpret_ast(condition, scope)):
+            return value[1]
+
+
+def lookup_global(astree, scope, stats):
+    """Look up a symbol that's not a parameter
+
+    If it's found in the global scope, the value is cached on the node,
+    until the global scope changes (any assignment in it invalidates the
+    cache).
+
+    :param ast.Symbol astree:
+    :param scopes2.CacheStats stats: counts the hits and misses
+    """
+    cache = astree.cache
+    if cache is not None:
+        global_scope = cache[0]
+        # The usual cases: the lookup is made in the global scope, or in
+        # the scope of a function defined there
+        if cache[1] == global_scope.version and (
+                scope is global_scope or
+                astree.free and isinstance(scope, scopes2.FunctionScope) and
+                scope.closure_scope is global_scope):
+            stats.hits += 1
+            return cache[2]
+
+    global_scope = scopes2.get_global_scope(scope, astree.free)
+    if global_scope is None:
+        return scope[astree.symbol]
+    if (cache is not None and cache[0] is global_scope and
+            cache[1] == global_scope.version):
+        stats.hits += 1
+        return cache[2]
+
+    stats.misses += 1
+    if astree.symbol not in global_scope:
+        # Found (if at all) in the callers
+        return scope[astree.symbol]
+    value = global_scope[astree.symbol]
+    astree.cache = (global_scope, global_scope.version, value)
+    return value
 
 
 def interpret_assign(astree, scope):
     # Simple symbol assignment
     if isinstance(astree[0], ast.Symbol):
-        scope[types.Symbol(astree[0].values)] = interpret_ast(astree[1], scope)
+        scope[astree[0].symbol] = interpret_ast(astree[1], scope)
 
     # Function assignment
     elif isinstance(astree[0], ast.Apply):
@@ -71,6 +159,43 @@ def interpret_assign(astree, scope):
 
 
 def create_function(astree, scope, is_lambda=False):
+    descriptor = astree.descriptor
+    if descriptor is None:
+        # A function defined in a function scope should have been resolved
+        # along with the enclosing one. If not, that one is unknown.
+        descriptor = astree.descriptor = get_descriptor(
+            astree, is_lambda,
+            complete=not isinstance(scope, scopes2.FunctionScope))
+
+    return types.Function((
+        # the function name
+        types.String((descriptor.name,)),
+        # the formal parameter names
+        descriptor.params,
+        descriptor.code,  # The AST that should be interpreted
+        get_closure_scope(astree, scope)
+    ), descriptor)
+
+
+def get_closure_scope(astree, scope):
+    """The part of the scope the function needs to keep
+
+    :param ast.AbstractSyntaxNode astree: the resolved definition
+    :param scope: the scope creating the function
+    """
+    if astree.captured_slots is None:
+        return scope
+    return scopes2.capture(scope, astree.captured_slots)
+
+
+def get_descriptor(astree, is_lambda=False, complete=True):
+    """The call descriptor of the functions created by the definition (or
+    lambda). The symbols of the body get resolved.
+
+    :param bool complete: whether all the functions enclosing the definition
+        are known (see `resolver.resolve_function`)
+    :rtype: types.CallDescriptor
+    """
     # For a normal definition, the first node in the list is the function name
     # For a lambda, the list starts with the arguments straight away
     start_idx = 0 if is_lambda else 1
@@ -78,37 +203,32 @@ def create_function(astree, scope, is_lambda=False):
     params = tuple(
         [types.Symbol(elem.values) for elem in astree[0].values[start_idx:]])
 
-    return types.Function((
-        # the function name
-        types.String(astree[0][0].values if not is_lambda else ('lambda',)),
-        # the formal parameter names
-        params,
-        astree[1],  # The AST that should be interpreted
-        scope
-    ))
+    if not astree.resolved:
+        resolver.resolve_function(astree, is_lambda, complete=complete)
+
+    name = astree[0][0].values[0] if not is_lambda else 'lambda'
+    return types.CallDescriptor(name, params, astree[1])
 
 
 def interpret_leaf(astree, scope):
     if isinstance(astree, ast.Symbol):
-        return scope[types.Symbol(astree.values)]  # Dereference symbol
+        if astree.address is not None:
+            return scopes2.lookup_address(scope, astree.address, astree.symbol)
+        # Dereference symbol
+        return lookup_global(astree, scope, variable_stats)
     else:
         return astree[0]  # return the value
 
 
-def interpret_list(astree, scope):
-    """Evaluate the list - if that should be done
+def evaluate_list(astree, scope):
+    """Return the function to be called, and its evaluated arguments
 
     :param ast.AbstractSyntaxNode astree:
     :param scope:
-    :return:
+    :rtype: (types.Function, list)
     """
     func = obtain_function(astree[0], scope)
-    try:
-        result = func(interpret_ast, scope,
-                      *[interpret_ast(val, scope) for val in astree.values[1:]])
-    except:
-        raise
-    return result
+    return func, [interpret_ast(val, scope) for val in astree.values[1:]]
 
 
 def obtain_function(astree, scope):
@@ -120,7 +240,9 @@ def obtain_function(astree, scope):
     if isinstance(astree, ast.Operator):
         return operations.OPERATIONS[astree[0]]
     if isinstance(astree, ast.Symbol):
-        return scope[types.Symbol((astree[0],))]
+        if astree.address is not None:
+            return scopes2.lookup_address(scope, astree.address, astree.symbol)
+        return lookup_global(astree, scope, call_site_stats)
     elif isinstance(astree, ast.Container):
         return interpret_ast(astree, scope)
 
@@ -6,6 +6,7 @@ Call `get_concrete_syntax_tree` with the output of `get_token_list`
 Call `get_token_list` with simple text (string, unicode, whatever)
 """
 from __future__ import unicode_literals, absolute_import, print_function
+import mmap
 import re
 import six
 from collections import deque
@@ -33,6 +34,10 @@ def make_token(func, node_type=cst.Token):
         """
         return node_type(func(value), source, index)
 
+    # Allow converting values without creating tokens (see
+    # `cst.CompactTokenStream`)
+    wrapper.convert = func
+    wrapper.node_type = node_type
     return wrapper
 
 
@@ -49,32 +54,186 @@ SOURCE_PATTERNS = (
     (make_token(lambda x: None, cst.DecrementNesting), re.compile('\)')),
     # The operators
     (make_token(str), re.compile(
-        r'[\+\-\|&^~%]|[\*\\/=]{1,2}|[<>]=?|<<|>>|!='))
+        r'<<|>>|[\+\-\|&^~%]|[\*\\/=]{1,2}|[<>]=?|!='))
 )
 
 
-def get_flat_token_list(text):
-    """From the source file, create a flat list of tokens"""
-    tokens = []
-    remaining_text = text.lstrip()
-    last_iteration_text = remaining_text
-
-    while remaining_text:
-        for converter, pattern in SOURCE_PATTERNS:
-            result = pattern.match(remaining_text)
-            if result:
-                start, end = result.span()
-                tokens.append(converter(
-                    remaining_text[start:end], text, text.index(remaining_text)))  # noqa
-                remaining_text = remaining_text[end:].lstrip()
-                break
-        if remaining_text == last_iteration_text:
+# All the patterns from above, joined in a single alternation. Every pattern
+# gets its own group, so `match.lastindex` tells which converter applies.
+# Alternatives are tried from left to right, in the same order the
+# SOURCE_PATTERNS are declared. Only the string pattern contains a `.`, so
+# the DOTALL flag is safe for all the others.
+MASTER_PATTERN = re.compile(
+    '|'.join('({})'.format(pattern.pattern)
+             for _, pattern in SOURCE_PATTERNS),
+    re.DOTALL)
+
+# Group indexes start at 1, so pad the converters to match `lastindex`
+TOKEN_CONVERTERS = (None,) + tuple(
+    converter for converter, _ in SOURCE_PATTERNS)
+
+WHITESPACE_PATTERN = re.compile(r'\s*')
+
+# The token kinds (indexes in TOKEN_CONVERTERS) of the parentheses
+INCREMENT_NESTING_KIND, DECREMENT_NESTING_KIND = (
+    [idx for idx, converter in enumerate(TOKEN_CONVERTERS)
+     if converter is not None and
+     issubclass(converter.node_type, cst.NestingCommand)])
+
+# The same patterns, for scanning binary sources (memory mapped files, or
+# files opened in binary mode). All the pattern characters are ASCII.
+BINARY_MASTER_PATTERN = re.compile(
+    MASTER_PATTERN.pattern.encode('ascii'), re.DOTALL)
+# In binary patterns `\s` is only the ASCII whitespace. Match the utf-8
+# encoding of every character that's whitespace in text sources (the last
+# one is U+3000, the ideographic space).
+UNICODE_WHITESPACE = [
+    char for char in (six.unichr(code) for code in range(0x3001))
+    if WHITESPACE_PATTERN.match(char).end()]
+BINARY_WHITESPACE_PATTERN = re.compile(
+    b'(?:[' +
+    b''.join(re.escape(char.encode('utf-8'))
+             for char in UNICODE_WHITESPACE if ord(char) < 0x80) +
+    b']|' +
+    b'|'.join(re.escape(char.encode('utf-8'))
+              for char in UNICODE_WHITESPACE if ord(char) >= 0x80) +
+    b')*')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# How many characters must follow a match, so we can be sure that reading
+# more of the stream won't change it. `12.` followed by a digit is a float,
+# so we need to see 2 characters past the end of the int `12`
+STREAM_LOOKAHEAD = 2
+
+
+def iter_matches(text):
+    """Yield the pattern match object of every token in the text
+
+    The text is scanned only once, by matching the patterns at increasing
+    offsets, so this runs in linear time. The kind of the token is the
+    `lastindex` of the match.
+
+    :param str text: the source code
+    """
+    match_token = MASTER_PATTERN.match
+    skip_whitespace = WHITESPACE_PATTERN.match
+    end = len(text)
+    pos = skip_whitespace(text).end()
+
+    while pos < end:
+        result = match_token(text, pos)
+        if result is None:
+            raise WhispyLispySyntaxError(
+                text, pos, "Character combination doesn't make sense")
+        yield result
+        pos = skip_whitespace(text, result.end()).end()
+
+
+def iter_tokens(text):
+    """Yield the tokens from the source text, one at a time
+
+    :param str text: the source code
+    :rtype: collections.Iterable[cst.Token]
+    """
+    for result in iter_matches(text):
+        yield TOKEN_CONVERTERS[result.lastindex](
+            result.group(), text, result.start())
+
+
+def get_compact_token_stream(text):
+    """Like `get_flat_token_list`, but returns the memory efficient
+    `cst.CompactTokenStream`
+
+    :param str text: the source code
+    :rtype: cst.CompactTokenStream
+    """
+    stream = cst.CompactTokenStream(text, TOKEN_CONVERTERS)
+    append = stream.append
+    for result in iter_matches(text):
+        start, end = result.span()
+        append(result.lastindex, start, end - start)
+    return stream
+
+
+def stream_tokens(source, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8'):
+    """Lazily yield the tokens from a file object or a memory mapped file
+
+    Only the portion of the source around the current token is kept in
+    memory (memory mapped files are scanned in place).
+    The tokens don't reference the source. Their index is the absolute
+    offset in the source: in characters for text files, and in bytes
+    for binary files and memory maps. For the same reason, the syntax errors
+    raised from here contain just the absolute offset, and no source.
+
+    :param source: a file object (text or binary), or an mmap.mmap
+    :param int chunk_size: how much to read from the file object at once
+    :param str encoding: used for decoding binary sources
+    :rtype: collections.Iterable[cst.Token]
+    """
+    if isinstance(source, mmap.mmap):
+        return _iter_buffer_tokens(source, lambda size: b'', encoding)
+    return _iter_buffer_tokens(source.read(chunk_size), source.read, encoding,
+                               chunk_size)
+
+
+def _iter_buffer_tokens(buf, read, encoding, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Tokenize `buf`, calling `read` for more text when reaching its end
+
+    :param buf: the beginning of the source (str, bytes or mmap)
+    :param read: function returning the next part of the source, or an
+        empty value if there's nothing more to read
+    """
+    if isinstance(buf, six.text_type):
+        match_token = MASTER_PATTERN.match
+        skip_whitespace = WHITESPACE_PATTERN.match
+
+        def decode(value):
+            return value
+    else:
+        match_token = BINARY_MASTER_PATTERN.match
+        skip_whitespace = BINARY_WHITESPACE_PATTERN.match
+
+        def decode(value):
+            return value.decode(encoding)
+
+    base = 0  # the absolute offset of the start of the buffer
+    pos = 0
+    at_eof = not buf
+
+    while True:
+        pos = skip_whitespace(buf, pos).end()
+        result = match_token(buf, pos) if pos < len(buf) else None
+        if not at_eof and (
+                result is None or
+                result.end() + STREAM_LOOKAHEAD > len(buf)):
+            # Keep reading bigger chunks while a single token fills the
+            # buffer, so that huge tokens don't cause quadratic copying
+            chunk = read(max(chunk_size, len(buf) - pos))
+            if chunk:
+                buf = buf[pos:] + chunk
+                base += pos
+                pos = 0
+            else:
+                at_eof = True
+            continue
+
+        if pos == len(buf):
+            return
+        if result is None:
             raise WhispyLispySyntaxError(
-                text, text.index(remaining_text),
+                None, base + pos,
                 "Character combination doesn't make sense")
-        last_iteration_text = remaining_text
 
-    return tokens
+        token_end = result.end()
+        yield TOKEN_CONVERTERS[result.lastindex](
+            decode(buf[pos:token_end]), None, base + pos)
+        pos = token_end
+
+
+def get_flat_token_list(text):
+    """From the source file, create a flat list of tokens"""
+    return list(iter_tokens(text))
 
 
 def make_parentheses_lispy(token_list):
@@ -85,19 +244,39 @@ def make_parentheses_lispy(token_list):
     :param list[cst.Token] token_list:
     :rtype: list[cst.Token]
     """
-    # a(b((c d(((e f f(g h))))))) -> (a (b (c (d ( (e f (f g h)))))))
-    new_tokens = []
-    for i, token in enumerate(token_list[:-1]):
-        if not isinstance(token, cst.NestingCommand):
-            next_token = token_list[i + 1]
-            if isinstance(next_token, cst.IncrementNesting):
-                new_tokens.extend([next_token, token])
+    return list(iter_parentheses_lispy(token_list))
+
+
+def iter_parentheses_lispy(tokens):
+    """Generator version of `make_parentheses_lispy`
+
+    Moves every opening parenthesis in front of the token it follows:
+    a(b((c d(((e f f(g h))))))) -> (a (b (c (d ( (e f (f g h)))))))
+
+    Looks ahead only one token, so it runs in linear time and can be chained
+    between the tokenizer and `get_concrete_syntax_tree`.
+
+    :param collections.Iterable[cst.Token] tokens:
+    :rtype: collections.Iterable[cst.Token]
+    """
+    previous = None
+    for token in tokens:
+        if previous is not None:
+            if isinstance(token, cst.IncrementNesting):
+                yield token
+                yield previous
+                previous = None
+                continue
+            yield previous
+            previous = None
 
-        if token not in new_tokens:
-            new_tokens.append(token)
-    new_tokens.append(token_list[-1])
+        if isinstance(token, cst.NestingCommand):
+            yield token
+        else:
+            previous = token
 
-    return new_tokens
+    if previous is not None:
+        yield previous
 
 
 def get_concrete_syntax_tree(token_list):
@@ -105,23 +284,31 @@ def get_concrete_syntax_tree(token_list):
 
     Raises syntax error if braces are mismatched
     Collapses all the inc/dec tokens
+
+    :param list[cst.Token] | cst.CompactTokenStream token_list:
     """
+    if isinstance(token_list, cst.CompactTokenStream):
+        return _get_concrete_syntax_tree_from_stream(token_list)
+
     q = deque([[]])
+    # The indexes of the opening parentheses of the unfinished lists
+    starts = []
 
     for token in token_list:
         if isinstance(token, cst.IncrementNesting):
             q.append([])
+            starts.append(token.index)
             continue
         if isinstance(token, cst.DecrementNesting):
             wrap_up = q.pop()
             try:
-                q[-1].append(cst.ConcreteSyntaxNode(tuple(wrap_up)))
+                q[-1].append(_make_list_node(wrap_up, starts.pop()))
             except IndexError:
                 raise WhispyLispySyntaxError(
                     source=token.source, index=token.index,
                     extra_info='Too many closing parentheses')
             continue
-        q[-1].append(cst.ConcreteSyntaxNode((token.value,)))
+        q[-1].append(_make_leaf_node(token.value, token.index))
 
     if len(q) > 1:
         raise WhispyLispySyntaxError(
@@ -129,3 +316,112 @@ def get_concrete_syntax_tree(token_list):
             extra_info='Too many opening parentheses. Close some.')
 
     return cst.RootConcreteSyntaxnode(tuple(q[-1]))
+
+
+def get_concrete_syntax_tree_from_text(text):
+    """Return the concrete syntax tree of the source text
+
+    Same result as `get_concrete_syntax_tree(get_flat_token_list(text))`,
+    but the tree is built while scanning the text, without any intermediate
+    tokens.
+
+    Raises syntax error if braces are mismatched, pointing at the
+    parenthesis with no match.
+
+    :param str text: the source code
+    :rtype: cst.RootConcreteSyntaxnode
+    """
+    match_token = MASTER_PATTERN.match
+    skip_whitespace = WHITESPACE_PATTERN.match
+    converters = [converter and converter.convert
+                  for converter in TOKEN_CONVERTERS]
+    make_list_node = _make_list_node
+    make_leaf_node = _make_leaf_node
+    # The unfinished enclosing nodes: their children so far, and the index of
+    # their opening parenthesis
+    enclosing = []
+    children = []
+    end = len(text)
+    pos = skip_whitespace(text).end()
+
+    while pos < end:
+        result = match_token(text, pos)
+        if result is None:
+            raise WhispyLispySyntaxError(
+                text, pos, "Character combination doesn't make sense")
+        kind = result.lastindex
+
+        if kind == INCREMENT_NESTING_KIND:
+            enclosing.append((children, pos))
+            children = []
+        elif kind == DECREMENT_NESTING_KIND:
+            if not enclosing:
+                raise WhispyLispySyntaxError(
+                    source=text, index=pos,
+                    extra_info='Too many closing parentheses')
+            parent_children, start = enclosing.pop()
+            parent_children.append(make_list_node(children, start))
+            children = parent_children
+        else:
+            children.append(
+                make_leaf_node(converters[kind](result.group()), pos))
+
+        pos = skip_whitespace(text, result.end()).end()
+
+    if enclosing:
+        raise WhispyLispySyntaxError(
+            source=text, index=enclosing[-1][1],
+            extra_info='Too many opening parentheses. Close some.')
+
+    return cst.RootConcreteSyntaxnode(tuple(children))
+
+
+def _make_leaf_node(value, index=None):
+    """Create the node of a token with the given value, with its kind"""
+    return cst.ConcreteSyntaxNode((value,), cst.get_value_kind(value), index)
+
+
+def _make_list_node(children, index=None):
+    """Create the node for a list, with its kind. Empty lists have no kind.
+
+    :param list children: the nodes inside the list
+    :param int index: the index of the opening parenthesis
+    """
+    return cst.ConcreteSyntaxNode(
+        tuple(children), cst.KIND_LIST if children else None, index)
+
+
+def _get_concrete_syntax_tree_from_stream(stream):
+    """Same as `get_concrete_syntax_tree`, but reads the token columns
+    directly, so no Token objects are created
+
+    :param cst.CompactTokenStream stream:
+    """
+    q = deque([[]])
+    value = stream.value
+    token_starts = stream.starts
+    # The indexes of the opening parentheses of the unfinished lists
+    starts = []
+
+    for idx, kind in enumerate(stream.kinds):
+        if kind == INCREMENT_NESTING_KIND:
+            q.append([])
+            starts.append(token_starts[idx])
+            continue
+        if kind == DECREMENT_NESTING_KIND:
+            wrap_up = q.pop()
+            try:
+                q[-1].append(_make_list_node(wrap_up, starts.pop()))
+            except IndexError:
+                raise WhispyLispySyntaxError(
+                    source=stream.source, index=token_starts[idx],
+                    extra_info='Too many closing parentheses')
+            continue
+        q[-1].append(_make_leaf_node(value(idx), token_starts[idx]))
+
+    if len(q) > 1:
+        raise WhispyLispySyntaxError(
+            source=stream.source, index=-1,
+            extra_info='Too many opening parentheses. Close some.')
+
+    return cst.RootConcreteSyntaxnode(tuple(q[-1]))
@@ -2,26 +2,45 @@
 """All the builtin operations (operators) are defined here
 
 Also, for the moment, some builtin functions will also be defined here
+
+The builtins are called as `builtin(interpreter, scope, *values)`. The values
+are already evaluated by the interpreter (exactly once), so the builtins use
+them as they are.
 """
 from __future__ import unicode_literals, print_function
 import six
 import sys
 import operator
-import itertools
 
-from whispy_lispy import keywords, types, exceptions
+from whispy_lispy import types, exceptions
 
 
 if six.PY3:
     unicode = str
+    raw_input = input
+    from functools import reduce
+
+# The whispy lispy types of the python types (the booleans, the integers and
+# the subclasses are handled by `to_internal`)
+INTERNAL_TYPES = dict(
+    [(float, types.Float)] +
+    [(str_type, types.String) for str_type in six.string_types])
 
 
 def to_internal(value):
     """Convert Python types to Whispy Lispy types """
+    value_type = type(value)
+    if value_type is bool:
+        return types.make_bool(value)
+    if value_type in INTEGER_TYPES:
+        return types.make_int(value)
+    internal_type = INTERNAL_TYPES.get(value_type)
+    if internal_type is not None:
+        return internal_type((value,))
     if isinstance(value, bool):
-        return types.Bool((value,))
-    if isinstance(value, int):
-        return types.Int((value,))
+        return types.make_bool(value)
+    if isinstance(value, six.integer_types):
+        return types.make_int(value)
     if isinstance(value, float):
         return types.Float((value,))
     if isinstance(value, six.string_types):
@@ -30,7 +49,13 @@ def to_internal(value):
 
 def to_python(value):
     """Converts Whispy Lispy types to Python types """
-    return value.values[0]
+    return value.value
+
+# The python types of the numbers. Operations on these don't need the type
+# compatibility checks.
+NUMBER_TYPES = frozenset(six.integer_types + (float,))
+INTEGER_TYPES = frozenset(six.integer_types)
+BOOL_TYPES = frozenset([bool])
 
 # Many operators can be unary, so (<operator> single_value) will succeed
 # This value means that the unary operator will compare the object to itself
@@ -60,7 +85,9 @@ class Operator(object):
     def __init__(self, operator_,
                  default_value=VALUE_SELF_REFERENCE,
                  type_fallbacks={},
-                 incompatible_types=lambda *args: False):
+                 incompatible_types=lambda *args: False,
+                 allowed_types=None,
+                 unary_operator=None):
         """
         :param operator_: a python operator from module operator.*
         :param dict default_value: a value to be used as the default for this
@@ -70,19 +97,36 @@ class Operator(object):
         :param incompatible_types: lambda that takes a set of python types
             and returns True if they can't be considered compatible in the
             context of this operator
+        :param frozenset allowed_types: the python types the operator works
+            on (None if it works on all of them)
+        :param unary_operator: a python operator for when there's a single
+            value, like `operator.neg` for `-`. The default value is used if
+            this is None.
         """
         self.type_fallbacks = dict(type_fallbacks)
         self.operator = operator_
         self.defaults_dict = default_value
         self.incompatible_types_check = incompatible_types
+        self.allowed_types = allowed_types
+        self.unary_operator = unary_operator
 
     def __call__(self, interpreter, scope, *values):
+        if len(values) == 1 and self.unary_operator is not None:
+            return apply_unary_operator(
+                self.unary_operator, values[0], self.allowed_types)
+
         processable_values = self.get_values_with_defaults(values)
+        python_values = [val.value for val in processable_values]
+        types_ = set(map(type, python_values))
 
-        iter_for_type_check, iter_for_reduce = itertools.tee(
-            to_python(interpreter(val, scope)) for val in processable_values)
+        if (self.allowed_types is not None and
+                not types_.issubset(self.allowed_types)):
+            raise_unsupported_types(processable_values)
 
-        types_ = set(type(item) for item in iter_for_type_check)
+        # Fast path: ints and floats are always compatible
+        if types_.issubset(NUMBER_TYPES):
+            return to_internal(
+                call_operator(reduce, self.operator, python_values))
 
         if self.incompatible_types_check(types_):
             raise exceptions.EvaluationError(
@@ -95,7 +139,7 @@ class Operator(object):
                                                                 scope, *values)
 
         return to_internal(
-            reduce(self.operator, iter_for_reduce))
+            call_operator(reduce, self.operator, python_values))
 
     def get_values_with_defaults(self, values):
         if self.defaults_dict is VALUE_SELF_REFERENCE:
@@ -113,30 +157,114 @@ class Operator(object):
         return processable_values
 
 
+class UnaryOperator(object):
+    """An operator that works on a single value, like `not`"""
+    def __init__(self, operator_, allowed_types):
+        """
+        :param operator_: a python operator from module operator.*
+        :param frozenset allowed_types: the python types it works on
+        """
+        self.operator = operator_
+        self.allowed_types = allowed_types
+
+    def __call__(self, interpreter, scope, *values):
+        if len(values) != 1:
+            raise exceptions.EvaluationError(
+                'Expected a single value, got: {}'.format(values))
+        return apply_unary_operator(
+            self.operator, values[0], self.allowed_types)
+
+
+class Comparison(object):
+    """A chained comparison: (< a b c) means a < b and b < c
+
+    The comparison stops at the first pair that doesn't match. A single value
+    is compared to itself, so (< a) is false and (<= a) is true.
+    """
+    def __init__(self, operator_,
+                 incompatible_types=lambda *args: False):
+        """
+        :param operator_: a function comparing two python values
+        :param incompatible_types: like for `Operator`, but also checked
+            for each pair of values
+        """
+        self.operator = operator_
+        self.incompatible_types_check = incompatible_types
+
+    def __call__(self, interpreter, scope, *values):
+        python_values = [val.value for val in values]
+        if len(python_values) == 1:
+            python_values.append(python_values[0])
+
+        compare = self.operator
+        incompatible = self.incompatible_types_check
+        for left, right in zip(python_values, python_values[1:]):
+            if incompatible(set([type(left), type(right)])):
+                raise_unsupported_types(values)
+            if not compare(left, right):
+                return types.FALSE
+        return types.TRUE
+
+
+def apply_unary_operator(operator_, value, allowed_types):
+    """
+    :param operator_: a python operator taking a single python value
+    :param types.Type value:
+    :param frozenset allowed_types: the python types the operator works on
+    """
+    python_value = value.value
+    if type(python_value) not in allowed_types:
+        raise_unsupported_types((value,))
+    return to_internal(call_operator(operator_, python_value))
+
+
+def call_operator(operator_, *args):
+    """Call the python operator, turning its failures into whispy errors"""
+    try:
+        return operator_(*args)
+    except (ArithmeticError, ValueError, TypeError) as err:
+        raise exceptions.EvaluationError(
+            '{}: {}'.format(err.__class__.__name__, err))
+
+
+def raise_unsupported_types(values):
+    raise exceptions.EvaluationError(
+        'Incompatible types: {}'.format(values))
+
+
+def equals(left, right):
+    """Numbers are equal to the numbers with the same value, but booleans are
+    only equal to booleans"""
+    return left == right and (type(left) is bool) == (type(right) is bool)
+
+
+def not_equals(left, right):
+    return not equals(left, right)
+
+
+def equivalent(left, right):
+    """Like `equals`, but the values must also have the same type"""
+    return type(left) is type(right) and left == right
+
+
+def logical_xor(left, right):
+    return left != right
+
+
 def internal_sum(interpreter, scope, *nums):
     """
-    :param interpreter: the interpreter2.interpret_ast function or
-        something that interprets the *nums list
+    :param interpreter: the interpreter2.interpret_ast function (unused, the
+        numbers are already evaluated)
     :param scope: a scope (usually dict)
     :param nums: internal numbers to add
     :return:
     """
-    try:
-        return to_internal(
-            sum(
-                to_python(interpreter(num, scope))
-                for num in nums)
-        )
-    except:
-        raise
+    return to_internal(sum([num.value for num in nums]))
 
 
 def internal_sub(interpreter, scope, *nums):
     return to_internal(
-        reduce(operator.sub,
-               [to_python(interpreter(val, scope))
-                for val in nums])
-    )
+        reduce(operator.sub, [num.value for num in nums]))
 
 
 def get_input(interpreter, scope, *values):
@@ -154,7 +282,7 @@ def get_input(interpreter, scope, *values):
             pass
     # int?
     try:
-        return types.Int((int(user_input),))
+        return types.make_int(int(user_input))
     except ValueError:
         pass
 
@@ -185,27 +313,81 @@ def operation_quit(interpreter, scope, *args):
 def _incompatible_all_except_int_with_float(types_):
     return types_ != {float, int} and len(types_) > 1
 
-OPERATIONS = dict(zip(
-    keywords.OPERATORS,
-    [
-        Operator(  # Operator +
-                   operator_=operator.add,
-                   default_value=ADDITION_NEUTRAL_VALUES,
-                   type_fallbacks={bool: 'or'},
-                   incompatible_types=_incompatible_all_except_int_with_float
-        )
-    ] +
-    [None]+
-    [
-        Operator(
-            operator_=operator.mul,
-            default_value=MULTIPLICATION_NEUTRAL_VALUES,
-            type_fallbacks={bool: 'and'},
-            incompatible_types=_incompatible_all_except_int_with_float
-        )
-    ] +
-    [None] * 8 +
-    [Operator(operator.eq)] +
-    [None] * 9 +
-    [Operator(operator.or_)] +
-    [None] * 13))
+
+def _incompatible_unless_numbers_or_same_type(types_):
+    return not types_.issubset(NUMBER_TYPES) and len(types_) > 1
+
+
+def _arithmetic_operator(operator_, unary_operator=None):
+    """The arithmetic operators besides + and * only work with numbers"""
+    return Operator(
+        operator_=operator_,
+        default_value=NO_DEFAULT_VALUE,
+        allowed_types=NUMBER_TYPES,
+        unary_operator=unary_operator)
+
+
+def _bitwise_operator(operator_, allowed_types):
+    """The bitwise operators work with integers, and (except for the shifts)
+    with booleans, but not with both at once"""
+    return Operator(
+        operator_=operator_,
+        default_value=NO_DEFAULT_VALUE,
+        incompatible_types=lambda types_: len(types_) > 1,
+        allowed_types=allowed_types)
+
+
+def _logical_operator(operator_):
+    return Operator(
+        operator_=operator_,
+        default_value=NO_DEFAULT_VALUE,
+        allowed_types=BOOL_TYPES)
+
+
+def _ordering(operator_):
+    """Numbers can be compared with numbers, other values only with values
+    of the same type"""
+    return Comparison(operator_, _incompatible_unless_numbers_or_same_type)
+
+
+def _reciprocal(value):
+    return 1 / float(value)
+
+
+OPERATIONS = {
+    '+': Operator(
+        operator_=operator.add,
+        default_value=ADDITION_NEUTRAL_VALUES,
+        type_fallbacks={bool: 'or'},
+        incompatible_types=_incompatible_all_except_int_with_float
+    ),
+    '-': _arithmetic_operator(operator.sub, unary_operator=operator.neg),
+    '*': Operator(
+        operator_=operator.mul,
+        default_value=MULTIPLICATION_NEUTRAL_VALUES,
+        type_fallbacks={bool: 'and'},
+        incompatible_types=_incompatible_all_except_int_with_float
+    ),
+    '**': _arithmetic_operator(operator.pow),
+    '%': _arithmetic_operator(operator.mod),
+    '/': _arithmetic_operator(operator.truediv, unary_operator=_reciprocal),
+    '//': _arithmetic_operator(operator.floordiv),
+    '>': _ordering(operator.gt),
+    '>=': _ordering(operator.ge),
+    '<': _ordering(operator.lt),
+    '<=': _ordering(operator.le),
+    '=': Comparison(equals),
+    '==': Comparison(equals),
+    '<<': _bitwise_operator(operator.lshift, INTEGER_TYPES),
+    '>>': _bitwise_operator(operator.rshift, INTEGER_TYPES),
+    '!=': Comparison(not_equals),
+    '&': _bitwise_operator(operator.and_, INTEGER_TYPES | BOOL_TYPES),
+    '|': _bitwise_operator(operator.or_, INTEGER_TYPES | BOOL_TYPES),
+    '^': _bitwise_operator(operator.xor, INTEGER_TYPES | BOOL_TYPES),
+    '~': UnaryOperator(operator.invert, INTEGER_TYPES),
+    'and': _logical_operator(operator.and_),
+    'or': _logical_operator(operator.or_),
+    'xor': _logical_operator(logical_xor),
+    'not': UnaryOperator(operator.not_, BOOL_TYPES),
+    'eqv': Comparison(equivalent),
+}
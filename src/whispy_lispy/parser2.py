@@ -5,7 +5,7 @@ function `get_concrete_syntax_tree`
 """
 
 from __future__ import unicode_literals, absolute_import
-from whispy_lispy import ast, keywords, types
+from whispy_lispy import ast, cst, keywords, types
 
 
 def internal_value_creator(internal_type):
@@ -19,6 +19,24 @@ def internal_value_creator(internal_type):
     return wrapper
 
 
+# The abstract node creators, for every kind of concrete node
+NODE_TYPES_BY_KIND = {
+    cst.KIND_LIST: ast.Apply,
+    cst.KIND_STRING: internal_value_creator(types.String.from_quoted_values),
+    cst.KIND_BOOL: internal_value_creator(
+        lambda values: types.make_bool(values[0])),
+    cst.KIND_INT: internal_value_creator(
+        lambda values: types.make_int(values[0])),
+    cst.KIND_FLOAT: internal_value_creator(types.Float),
+    cst.KIND_OPERATOR: ast.Operator,
+    cst.KIND_QUOTE: ast.QuoteShorthand,
+    cst.KIND_DEFINITION: ast.Assign,
+    cst.KIND_CONDITION: ast.Condition,
+    cst.KIND_LAMBDA: ast.Lambda,
+    cst.KIND_SYMBOL: ast.Symbol,
+}
+
+
 def determine_operation_type(cstree):
     """Determine the type of the new node
 
@@ -27,31 +45,11 @@ def determine_operation_type(cstree):
     if cstree.is_root():
         return ast.RootAbstractSyntaxNode
 
-    if not cstree.is_leaf():
-        return ast.Apply
-    else:
-        if cstree.is_string():
-            return internal_value_creator(types.String.from_quoted_values)
-        if cstree.is_bool():
-            return internal_value_creator(types.Bool)
-        if cstree.is_int():
-            return internal_value_creator(types.Int)
-        if cstree.is_float():
-            return internal_value_creator(types.Float)
-        if cstree.is_operator():
-            return ast.Operator
-        if cstree.is_symbol():
-            if cstree.symbol_equals(keywords.OPERATOR_QUOTE):
-                return ast.QuoteShorthand
-            if cstree.symbol_in_iterable(keywords.DEFINITION_ALIASES):
-                return ast.Assign
-            if cstree.symbol_in_iterable(keywords.CONDITION_ALIASES):
-                return ast.Condition
-            if cstree.symbol_equals(keywords.LAMBDA):
-                return ast.Lambda
-            return ast.Symbol
-
-    raise Exception("Couldn't determine the operation type... failing now.")
+    try:
+        return NODE_TYPES_BY_KIND[cstree.kind]
+    except KeyError:
+        raise Exception(
+            "Couldn't determine the operation type... failing now.")
 
 
 def transform_quote_operator_into_function(tree, container_cls=ast.Apply):
@@ -147,8 +145,127 @@ def pull_operations_up_inside_containers(astree, astype):
     return astree.alike(tuple(values))
 
 
+# The containers that `pull_operations_up_inside_containers` creates, by the
+# kind of the concrete node which marks them, in the order of the passes
+PULLED_UP_TYPES = (
+    (cst.KIND_DEFINITION, ast.Assign),
+    (cst.KIND_CONDITION, ast.Condition),
+    (cst.KIND_LAMBDA, ast.Lambda),
+)
+
+
+def transform_cst_to_ast(cstree, expand_quotes=True):
+    """Transform a concrete syntax tree into an abstract one, in a single
+    traversal
+
+    Produces the same tree as `get_ast_from_cst_multipass`: every node is
+    created once, already in its final form.
+    Uses an explicit stack instead of recursion, so the depth of the tree is
+    not limited by the python stack.
+
+    :param cst.ConcreteSyntaxNode cstree: the concrete syntax tree
+    :param bool expand_quotes: whether to transform `' a` into `(quote a)`.
+        The multi pass transformation doesn't look inside quoted nodes
+    :rtype: ast.AbstractSyntaxNode
+    """
+    if cstree.is_leaf():
+        return _make_leaf(cstree)
+
+    stack = [_TransformFrame(cstree, expand_quotes, quoted=False)]
+    while True:
+        frame = stack[-1]
+        cst_children = frame.cstree.values
+
+        if frame.idx < len(cst_children):
+            child = cst_children[frame.idx]
+            quoted = frame.expand_quotes and child.kind == cst.KIND_QUOTE
+            if quoted:
+                # Might be the case that the quote is the last element
+                # The multi pass transformation fails with IndexError too
+                child = cst_children[frame.idx + 1]
+                frame.idx += 2
+            else:
+                frame.idx += 1
+
+            if child.is_leaf():
+                frame.add_child(_make_leaf(child), child.kind, quoted)
+            else:
+                stack.append(_TransformFrame(
+                    child, frame.expand_quotes and not quoted, quoted))
+            continue
+
+        result = frame.finish()
+        stack.pop()
+        if not stack:
+            return result
+        stack[-1].add_child(result, frame.cstree.kind, frame.quoted)
+
+
+def _make_leaf(cstree):
+    """Create the abstract node of a concrete leaf node"""
+    node = determine_operation_type(cstree)(tuple(cstree.values))
+    node.index = cstree.index
+    return node
+
+
+class _TransformFrame(object):
+    """The state of the transformation of a concrete node, whose children
+    are being transformed"""
+    __slots__ = ['cstree', 'expand_quotes', 'quoted', 'idx', 'children',
+                 'kinds']
+
+    def __init__(self, cstree, expand_quotes, quoted):
+        """
+        :param cst.ConcreteSyntaxNode cstree: the node being transformed
+        :param bool expand_quotes: see `transform_cst_to_ast`
+        :param bool quoted: whether the node followed a quote, and should be
+            wrapped in a `(quote ...)` list
+        """
+        self.cstree = cstree
+        self.expand_quotes = expand_quotes
+        self.quoted = quoted
+        self.idx = 0  # the next concrete child to transform
+        self.children = []
+        # The kinds of the concrete nodes of the children. The quote
+        # transformation creates lists, that have no concrete node
+        self.kinds = []
+
+    def add_child(self, node, kind, quoted):
+        if quoted:
+            index = node.index
+            node = ast.Apply((
+                ast.Symbol((keywords.BUILTIN_QUOTE_FUNC,)), node))
+            node.index = index
+            kind = None
+        self.children.append(node)
+        self.kinds.append(kind)
+
+    def finish(self):
+        """Create the abstract node, from the transformed children"""
+        children, kinds = self.children, self.kinds
+        node_class = determine_operation_type(self.cstree)
+        for kind, node_type in PULLED_UP_TYPES:
+            if kinds and kinds[0] == kind:
+                node_class = node_type
+                del children[0]
+                del kinds[0]
+        node = node_class(tuple(children))
+        node.index = self.cstree.index
+        return node
+
+
 def get_ast_from_cst(cstree):
     """
+    :param cst.ConcreteSyntaxNode cstree: the concrete syntax tree
+    :rtype: ast.AbstractSyntaxNode
+    """
+    return transform_cst_to_ast(cstree)
+
+
+def get_ast_from_cst_multipass(cstree):
+    """Transform the tree one step at a time, using a new traversal for each
+    step. Kept as the reference for `transform_cst_to_ast`
+
     :param cst.ConcreteSyntaxNode cstree: the concrete syntax tree
     :rtype: ast.AbstractSyntaxNode
     """
@@ -0,0 +1,458 @@
+# -*- coding utf-8 -*-
+"""Lowers the abstract syntax tree to a python module (see the `ast` module
+of the standard library), and compiles it with `compile()`.
+
+Every whispy lispy expression becomes a python expression, and every
+function body becomes a python function taking the scope as its only
+argument, so the python interpreter does all the dispatching. The values
+the code needs (constants, symbols, builtins) are globals of the compiled
+module.
+
+Malformed trees (like a `cond` clause without a result) don't fail when
+they're compiled: the malformed node becomes a call raising the error, so
+it's raised only when the node gets evaluated, like in `interpreter2`.
+
+The python nodes get the line numbers of the whispy lispy nodes they were
+created from, so the tracebacks point at the whispy lispy source, and the
+whispy lispy errors raised while running the code get the line they
+occurred at.
+
+Main function: `interpret_ast` - same semantics as
+`interpreter2.interpret_ast`
+"""
+from __future__ import unicode_literals, absolute_import
+import ast as pyast
+import bisect
+import re
+import sys
+
+import six
+
+from whispy_lispy import ast, types, scopes2, operations, exceptions
+
+DEFAULT_FILENAME = '<whispy>'
+# The name of the parameter of every generated function
+SCOPE_NAME = 'scope'
+MODULE_FUNCTION_NAME = '_whispy_module'
+
+
+def interpret_ast(astree, scope=None, source=None, filename=DEFAULT_FILENAME):
+    """Compile the tree to python code, and run it in the given scope
+
+    :param ast.AbstractSyntaxNode astree:
+    :param source: the source code the tree was parsed from (text, bytes or
+        mmap).
+        Used to find the line numbers of the nodes.
+    :param filename: the name of the source, shown in the tracebacks
+    :rtype: types.Type
+    """
+    if isinstance(astree, types.Type):
+        return astree
+
+    if scope is None:
+        scope = scopes2.Scope()
+
+    return run(compile_ast(astree, source, filename), scope, filename)
+
+
+def compile_ast(astree, source=None, filename=DEFAULT_FILENAME):
+    """Return a python function that evaluates the tree in a given scope
+
+    :param ast.AbstractSyntaxNode astree: usually the root node
+    """
+    generator = PythonCodeGenerator(source, filename)
+    return generator.compile(generator.module_function(astree))
+
+
+def get_python_module(astree, source=None, filename=DEFAULT_FILENAME):
+    """Return the python syntax tree generated for the whispy lispy tree.
+    Use `ast.dump` on it to see what the tree was lowered to.
+
+    :param ast.AbstractSyntaxNode astree:
+    :rtype: _ast.Module
+    """
+    generator = PythonCodeGenerator(source, filename)
+    generator.module_function(astree)
+    return generator.get_module()
+
+
+def run(function, scope, filename=DEFAULT_FILENAME):
+    """Run the compiled code. The whispy lispy errors get the location in the
+    source where they occurred.
+    """
+    try:
+        return function(scope)
+    except exceptions.BaseWhispyLispyError as err:
+        add_error_location(err, sys.exc_info()[2], filename)
+        raise
+
+
+def add_error_location(err, traceback, filename):
+    """Find the innermost frame of the generated code, and add its line to
+    the error (unless the error already knows where it occurred)
+
+    :param exceptions.BaseWhispyLispyError err:
+    """
+    if getattr(err, 'lineno', None) is not None:
+        return
+
+    lineno = None
+    while traceback is not None:
+        if traceback.tb_frame.f_code.co_filename == filename:
+            lineno = traceback.tb_lineno
+        traceback = traceback.tb_next
+
+    if lineno is None:
+        return
+
+    err.filename = filename
+    err.lineno = lineno
+    if err.args:
+        err.args = ('{} (file "{}", line {})'.format(
+            err.args[0], filename, lineno),) + err.args[1:]
+
+
+def call_function(func, scope, *args):
+    """Call whispy lispy functions by running their compiled bodies,
+    and the builtin functions the way the interpreter would
+
+    :param types.Function | callable func:
+    :param scope: the scope from where the function is called
+    :param args: the evaluated arguments
+    """
+    if isinstance(func, types.Function):
+        return get_python_function(func)(scope.call_frame(func, args))
+
+    return func(interpret_ast, scope, *args)
+
+
+def make_function(scope, name, descriptor, python_function):
+    """Create a whispy lispy function, whose body is already compiled"""
+    func = types.Function(
+        (name, descriptor.params, descriptor.code, scope), descriptor)
+    func.python_function = python_function
+    return func
+
+
+def assign(scope, key, value):
+    """Assignment used as an expression. Evaluates to nothing."""
+    scope[key] = value
+
+
+def raise_error(error_class, args):
+    """Raise the error met while compiling a node"""
+    raise error_class(*args)
+
+
+def get_python_function(func):
+    """Return the python function of the whispy lispy function's body.
+    Functions not created by this module (e.g. by `interpreter2`) get
+    compiled on their first call.
+
+    :param types.Function func:
+    """
+    try:
+        return func.python_function
+    except AttributeError:
+        generator = PythonCodeGenerator()
+        func.python_function = generator.compile(
+            generator.function_body(func.name, func.code))
+        return func.python_function
+
+
+class PythonCodeGenerator(object):
+    """Creates the python syntax tree of a module, from whispy lispy trees"""
+    def __init__(self, source=None, filename=DEFAULT_FILENAME):
+        self.filename = filename
+        self.newlines = get_newline_indexes(source) if source else None
+        # The globals of the generated module
+        self.namespace = {
+            '_call': call_function,
+            '_make_function': make_function,
+            '_assign': assign,
+            '_raise': raise_error,
+            '_is_true': types.is_true,
+            '_interpret': interpret_ast,
+        }
+        self._constant_names = {}
+        self.functions = []
+
+    def compile(self, function_name):
+        """Compile the generated module, and return one of its functions"""
+        code = compile(self.get_module(), self.filename, 'exec')
+        exec(code, self.namespace)
+        return self.namespace[function_name]
+
+    def get_module(self):
+        module = pyast.Module(body=list(self.functions))
+        # Added in python 3.8
+        module.type_ignores = []
+        return pyast.fix_missing_locations(module)
+
+    def get_location(self, astree, default=(1, 0)):
+        """Return the line and the column of the node in the source"""
+        index = getattr(astree, 'index', None)
+        if index is None or self.newlines is None:
+            return default
+        line = bisect.bisect_left(self.newlines, index)
+        line_start = self.newlines[line - 1] + 1 if line else 0
+        return line + 1, index - line_start
+
+    def constant(self, value):
+        """Return a name for the value, in the globals of the module
+
+        Equal values of the same class share the name
+        """
+        try:
+            key = (value.__class__, value)
+            name = self._constant_names.get(key)
+        except TypeError:  # unhashable
+            key, name = None, None
+
+        if name is None:
+            name = '_c{}'.format(len(self.namespace))
+            self.namespace[name] = value
+            if key is not None:
+                self._constant_names[key] = name
+        return load(name)
+
+    def module_function(self, astree):
+        """Add the function that runs the whole tree, and return its name"""
+        location = self.get_location(astree)
+        if not isinstance(astree, ast.RootAbstractSyntaxNode):
+            return self.add_function(
+                MODULE_FUNCTION_NAME,
+                [self.return_statement(astree, location)], location)
+
+        statements = []
+        for idx, elem in enumerate(astree.values):
+            last = idx == len(astree.values) - 1
+            elem_location = self.get_location(elem, location)
+            if isinstance(elem, ast.Assign):
+                statements.append(self.assign_statement(elem, elem_location))
+                if last:
+                    statements.append(set_location(
+                        pyast.Return(value=self.constant(None)),
+                        elem_location))
+            elif last:
+                statements.append(self.return_statement(elem, elem_location))
+            else:
+                statements.append(set_location(
+                    pyast.Expr(value=self.expression(elem, elem_location)),
+                    elem_location))
+
+        if not statements:
+            statements.append(pyast.Return(value=self.constant(None)))
+
+        return self.add_function(MODULE_FUNCTION_NAME, statements, location)
+
+    def function_body(self, name, astree, location=(1, 0)):
+        """Add the function running a whispy lispy function's body, and
+        return its name
+
+        :param str name: the name of the whispy lispy function
+        """
+        location = self.get_location(astree, location)
+        # The body may add functions too, so name this one only afterwards
+        statements = [self.return_statement(astree, location)]
+        function_name = '_{}_{}'.format(
+            re.sub(r'\W', '_', name), len(self.functions))
+        return self.add_function(function_name, statements, location)
+
+    def add_function(self, name, statements, location):
+        definition = pyast.parse(
+            str('def {}({}): pass'.format(name, SCOPE_NAME))).body[0]
+        definition.body = statements
+        self.functions.append(set_location(definition, location))
+        return name
+
+    def return_statement(self, astree, location):
+        return set_location(
+            pyast.Return(value=self.expression(astree, location)), location)
+
+    def assign_statement(self, astree, location):
+        """Statement version of the assignment: `scope[key] = value`"""
+        try:
+            target, value = self.assignment_parts(astree, location)
+        except RuntimeError:
+            raise
+        except Exception as error:
+            return set_location(
+                pyast.Expr(value=self.deferred_error(error)), location)
+        if target is None:
+            return set_location(pyast.Pass(), location)
+        return set_location(
+            pyast.Assign(targets=[subscript(load(SCOPE_NAME), target,
+                                            pyast.Store())],
+                         value=value),
+            location)
+
+    def assignment_parts(self, astree, location):
+        """Return the key and the value of the assignment"""
+        # Simple symbol assignment
+        if isinstance(astree[0], ast.Symbol):
+            return (self.constant(astree[0].symbol),
+                    self.expression(astree[1], location))
+
+        # Function assignment
+        elif isinstance(astree[0], ast.Apply):
+            return (self.constant(types.Symbol(astree[0].values[0].values)),
+                    self.function(astree, location))
+
+        return None, None
+
+    def expression(self, astree, location):
+        """Return the python expression of the node
+
+        If the node can't be compiled, the expression raises the error.
+
+        :param ast.AbstractSyntaxNode | types.Type astree:
+        :param tuple location: the location of the enclosing node
+        """
+        try:
+            return self._expression(astree, location)
+        except RuntimeError:
+            # Too deep. Not a problem of the node.
+            raise
+        except Exception as error:
+            return set_location(
+                self.deferred_error(error),
+                self.get_location(astree, location))
+
+    def deferred_error(self, error):
+        """The expression raising the error"""
+        return call(load('_raise'), self.constant(error.__class__),
+                    self.constant(error.args))
+
+    def _expression(self, astree, location):
+        if isinstance(astree, types.Type):
+            return set_location(self.constant(astree), location)
+
+        location = self.get_location(astree, location)
+
+        if astree.is_leaf() and not astree.is_root():
+            result = self.leaf(astree)
+
+        elif isinstance(astree, ast.Apply):
+            result = self.application(astree, location)
+
+        elif isinstance(astree, ast.Assign):
+            target, value = self.assignment_parts(astree, location)
+            if target is None:
+                result = self.constant(None)
+            else:
+                result = call(load('_assign'), load(SCOPE_NAME), target, value)
+
+        elif isinstance(astree, ast.Condition):
+            result = self.condition(astree, location)
+
+        elif isinstance(astree, ast.Lambda):
+            result = self.function(astree, location, is_lambda=True)
+
+        else:
+            result = self.sequence(astree, location)
+
+        return set_location(result, location)
+
+    def leaf(self, astree):
+        if isinstance(astree, ast.Symbol):
+            return subscript(load(SCOPE_NAME),
+                             self.constant(astree.symbol))
+        return self.constant(astree[0])
+
+    def sequence(self, astree, location):
+        """Evaluate all the children, and keep the value of the last one:
+        `(a, b, c)[-1]`
+        """
+        if not astree.values:
+            return self.constant(None)
+
+        expressions = [self.expression(elem, location)
+                       for elem in astree.values]
+        if len(expressions) == 1:
+            return expressions[0]
+        return subscript(pyast.Tuple(elts=expressions, ctx=pyast.Load()),
+                         self.constant(-1))
+
+    def application(self, astree, location):
+        arguments = [self.expression(val, location)
+                     for val in astree.values[1:]]
+        head = astree[0]
+
+        # The operators are builtins, call them directly
+        if isinstance(head, ast.Operator):
+            return call(self.constant(operations.OPERATIONS[head[0]]),
+                        load('_interpret'), load(SCOPE_NAME), *arguments)
+
+        if isinstance(head, ast.Symbol):
+            func = subscript(load(SCOPE_NAME),
+                             self.constant(head.symbol))
+        elif isinstance(head, ast.Container):
+            func = self.expression(head, location)
+        else:
+            raise Exception("Couldn't get the function you specified:")
+
+        return call(load('_call'), func, load(SCOPE_NAME), *arguments)
+
+    def function(self, astree, location, is_lambda=False):
+        """The expression creating the function"""
+        # For a normal definition, the first node in the list is the
+        # function name. For a lambda, the list starts with the arguments
+        start_idx = 0 if is_lambda else 1
+
+        params = tuple([types.Symbol(elem.values)
+                        for elem in astree[0].values[start_idx:]])
+        name = types.String(
+            astree[0][0].values if not is_lambda else ('lambda',))
+        body_name = self.function_body(name.values[0], astree[1], location)
+        descriptor = types.CallDescriptor(name.value, params, astree[1])
+
+        return call(load('_make_function'), load(SCOPE_NAME),
+                    self.constant(name), self.constant(descriptor),
+                    load(body_name))
+
+    def condition(self, astree, location):
+        """Nested conditional expressions:
+        `result1 if _is_true(predicate1) else (result2 if ... else None)`
+        """
+        result = self.constant(None)
+        for clause in reversed(astree.values):
+            clause_location = self.get_location(clause, location)
+            result = set_location(pyast.IfExp(
+                test=call(load('_is_true'),
+                          self.expression(clause[0], clause_location)),
+                body=self.expression(clause[1], clause_location),
+                orelse=result), clause_location)
+        return result
+
+
+def get_newline_indexes(source):
+    """The indexes of all the newlines in the source (text, bytes or mmap)"""
+    newline = '\n' if isinstance(source, six.text_type) else b'\n'
+    indexes = []
+    idx = source.find(newline)
+    while idx != -1:
+        indexes.append(idx)
+        idx = source.find(newline, idx + 1)
+    return indexes
+
+
+def set_location(node, location):
+    node.lineno, node.col_offset = location
+    # Added in python 3.8
+    node.end_lineno, node.end_col_offset = location
+    return node
+
+
+def load(name):
+    return pyast.Name(id=str(name), ctx=pyast.Load())
+
+
+def call(func, *args):
+    return pyast.Call(func=func, args=list(args), keywords=[])
+
+
+def subscript(value, key, ctx=None):
+    if sys.version_info < (3, 9):
+        key = pyast.Index(value=key)
+    return pyast.Subscript(value=value, slice=key, ctx=ctx or pyast.Load())
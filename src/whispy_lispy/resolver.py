@@ -0,0 +1,140 @@
+# -*- coding utf-8 -*-
+"""Gives the symbols in the function bodies their lexical addresses
+
+A function's parameters live in the `slots` of the `scopes2.FunctionScope`
+created for each call. A reference to a parameter of the function itself,
+or of a function it's nested in, always finds that parameter first (the
+scopes check the parameters, then the closure scope, and only then the
+other values and the caller). So the parameter can be addressed statically:
+`(depth, slot)` means "follow `closure_scope` `depth` times, then take the
+value at `slot`".
+
+`resolve_function` runs when a function is defined: it sets the `address`
+of every `ast.Symbol` in the body (and in the bodies of the nested
+functions) that refers to a parameter. The other symbols keep `address`
+None, and are looked up by name, like before.
+
+It also sets the `captured_slots` of the functions that don't need their
+whole defining scope: those whose bodies only use parameters, and only
+call operators and lambdas written in place. Only parameters can get looked
+up through their closure scope (scoping is dynamic, so the functions they
+call matter too), so they only need to capture the arguments they use,
+from the enclosing functions (see `scopes2.capture`).
+"""
+from __future__ import unicode_literals, absolute_import
+
+from whispy_lispy import ast, types
+
+
+def resolve_function(astree, is_lambda=False, enclosing=(), complete=True):
+    """Set the addresses of the symbols in the body of the function, and the
+    captured slots of the function and of the nested ones
+
+    :param ast.AbstractSyntaxNode astree: the Assign node defining a
+        function, or the Lambda node
+    :param bool is_lambda:
+    :param tuple enclosing: the parameter names of the functions this one is
+        nested in, the innermost first
+    :param bool complete: whether all the enclosing functions are known.
+        Only then are the symbols without an address surely not parameters
+        (and marked `free`).
+    """
+    functions = []
+    stack = [(astree, is_lambda, enclosing)]
+    while stack:
+        function, is_lambda, enclosing = stack.pop()
+        function.resolved = True
+        functions.append(function)
+
+        scopes = (get_param_names(function, is_lambda),) + enclosing
+        nodes = list(function.values[1:2])
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast.Symbol):
+                node.address = get_address(node.symbol, scopes)
+                node.free = complete and node.address is None
+            elif is_function_definition(node):
+                stack.append((node, isinstance(node, ast.Lambda), scopes))
+            elif isinstance(node, ast.Assign):
+                # The assigned symbol is not a reference
+                nodes.extend(node.values[1:])
+            elif isinstance(node, ast.AbstractSyntaxNode):
+                nodes.extend(node.values)
+
+    # The nested functions are resolved too by now
+    for function in functions:
+        function.captured_slots = get_captured_slots(function)
+
+
+def is_function_definition(node):
+    """Whether the node is a Lambda, or an Assign defining a function"""
+    return isinstance(node, ast.Lambda) or (
+        isinstance(node, ast.Assign) and bool(node.values) and
+        isinstance(node[0], ast.Apply))
+
+
+def get_captured_slots(astree):
+    """The arguments of the enclosing functions that the function uses
+
+    :param ast.AbstractSyntaxNode astree: the resolved Assign or Lambda node
+    :return: the used slots (a frozenset) of every enclosing function, the
+        innermost first, up to the outermost one used. None if the function
+        needs its whole defining scope: it uses a symbol that is not a
+        parameter, or calls a function that's not known in advance.
+    """
+    captured = []
+    # (node, how many functions it's nested in, inside this one)
+    nodes = [(node, 0) for node in astree.values[1:2]]
+    while nodes:
+        node, level = nodes.pop()
+        if isinstance(node, ast.Symbol):
+            if node.address is None:
+                return None
+            depth, slot = node.address
+            if depth > level:
+                # A parameter of a function enclosing this one
+                captured.extend(
+                    set() for _ in range(depth - level - len(captured)))
+                captured[depth - level - 1].add(slot)
+        elif is_function_definition(node):
+            nodes.extend((elem, level + 1) for elem in node.values[1:2])
+        elif isinstance(node, ast.Assign):
+            nodes.extend((elem, level) for elem in node.values[1:])
+        elif isinstance(node, ast.Apply):
+            if not node.values or not isinstance(
+                    node[0], (ast.Operator, ast.Lambda)):
+                return None
+            nodes.extend((elem, level) for elem in node.values)
+        elif isinstance(node, ast.AbstractSyntaxNode):
+            nodes.extend((elem, level) for elem in node.values)
+    return tuple(frozenset(slots) for slots in captured)
+
+
+def get_param_names(astree, is_lambda=False):
+    """The parameter names of a function definition (like `Function.params`)
+
+    :param ast.AbstractSyntaxNode astree: the Assign or Lambda node
+    :rtype: tuple
+    """
+    # For a normal definition, the first node in the list is the function name
+    # For a lambda, the list starts with the arguments straight away
+    start_idx = 0 if is_lambda else 1
+    if not astree.values or not isinstance(astree[0], ast.Container):
+        return ()
+    return tuple(
+        [types.Symbol(elem.values) for elem in astree[0].values[start_idx:]])
+
+
+def get_address(symbol, scopes):
+    """
+    :param types.Symbol symbol:
+    :param tuple scopes: the parameter names of the functions, starting from
+        the innermost one
+    :return: (depth, slot) or None
+    """
+    for depth, param_names in enumerate(scopes):
+        if symbol in param_names:
+            # Like in the scopes, the last parameter with a name wins
+            slot = len(param_names) - 1 - param_names[::-1].index(symbol)
+            return depth, slot
+    return None
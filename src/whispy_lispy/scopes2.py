@@ -41,6 +41,10 @@ omni_scope = OmniPresentScope()
 
 
 class Scope(object):
+    # Increases with every assignment, so the cached lookups know when
+    # they're out of date
+    version = 0
+
     def __init__(self, parent=None, omni=omni_scope):
         """
         :param dict | Scope parent: the parent scope
@@ -72,31 +76,186 @@ class Scope(object):
 
     def __setitem__(self, key, value):
         self.vals[key] = value
+        self.version += 1
+
+    def call_frame(self, func, arguments):
+        """The scope of a call of the function, made from this scope
+
+        :param types.Function func:
+        :param arguments: the evaluated arguments
+        """
+        return FunctionScope(
+            parent=self, arguments=arguments, closure_scope=func.scope,
+            descriptor=func.descriptor)
 
 
 class FunctionScope(Scope):
     """Scope that looks for symbols among the formal parameters and in
     the closure scope
+
+    The arguments are kept in `slots`, in the order of the parameters. The
+    `types.CallDescriptor` of the function says where each parameter is.
     """
     def __init__(self, param_names=None, arguments=None,
-                 parent=None, closure_scope=None, omni=omni_scope):
+                 parent=None, closure_scope=None, omni=omni_scope,
+                 descriptor=None):
+        """
+        :param tuple param_names: the formal parameters. Not needed if
+            there's a descriptor.
+        :param arguments: the values of the parameters
+        :param types.CallDescriptor descriptor: the descriptor of the
+            called function
+        :raises exceptions.ArityError: if the number of the arguments and of
+            the parameters differ
+        """
+        if descriptor is None:
+            descriptor = types.CallDescriptor(
+                'lambda', tuple(param_names or ()))
+        if arguments is None:
+            arguments = ()
+        descriptor.check_arity(arguments)
 
+        self.layout = descriptor.layout
+        self.slots = arguments
         self.closure_scope = closure_scope or {}
-        if param_names:
-            self.local_scope = dict(zip(param_names, arguments))
-        else:
-            self.local_scope = {}
-        super(FunctionScope, self).__init__(parent, omni)
+        self.vals = {}
+        self.parent = parent if parent is not None else {}
+        self.omni = omni
 
     def __getitem__(self, item):
-        if item in self.local_scope:
-            return self.local_scope[item]
+        slot = self.layout.get(item)
+        if slot is not None:
+            return self.slots[slot]
         if item in self.closure_scope:
             return self.closure_scope[item]
         return super(FunctionScope, self).__getitem__(item)
 
     def __contains__(self, item):
-        if item in self.closure_scope or item in self.local_scope:
+        if item in self.closure_scope or item in self.layout:
             return True
 
         return super(FunctionScope, self).__contains__(item)
+
+    def is_shadowed_by(self, param_names, closure_scope):
+        """Whether a function scope with these parameters and closure scope,
+        having this scope as its parent, would find every symbol this scope
+        holds before getting to it
+
+        :param tuple param_names: the formal parameters of the new scope
+        :param closure_scope: the closure scope of the new scope
+        """
+        return (not self.vals and
+                closure_scope is self.closure_scope and
+                set(self.layout).issubset(param_names))
+
+
+class CapturedScope(object):
+    """The part of a function scope that a closure needs: the arguments,
+    and what the enclosing function had captured itself (see `capture`)
+    """
+    def __init__(self, layout, slots, closure_scope):
+        self.layout = layout
+        self.slots = slots
+        self.closure_scope = closure_scope
+
+    def __getitem__(self, item):
+        slot = self.layout.get(item)
+        if slot is not None:
+            return self.slots[slot]
+        return self.closure_scope[item]
+
+    def __contains__(self, item):
+        return item in self.layout or item in self.closure_scope
+
+
+# The closure scope of the functions that don't need any enclosing scope
+empty_capture = CapturedScope({}, (), {})
+
+
+def capture(scope, captured_slots):
+    """The closure scope of a function created in the scope, that only needs
+    some arguments of the enclosing functions (see `resolver`)
+
+    Unlike the function scopes, it doesn't keep the callers, their values
+    and the unused arguments alive. The other scopes (like the global one)
+    are kept whole.
+
+    :param scope: the scope creating the function
+    :param tuple captured_slots: the slots (a frozenset) used from every
+        enclosing function, the innermost first
+    """
+    if not isinstance(scope, FunctionScope):
+        return scope
+    if not captured_slots:
+        return empty_capture
+
+    used = captured_slots[0]
+    slots = scope.slots
+    if len(used) < len(slots):
+        slots = tuple(
+            value if slot in used else None
+            for slot, value in enumerate(slots))
+    return CapturedScope(
+        scope.layout, slots,
+        capture(scope.closure_scope, captured_slots[1:]))
+
+
+def lookup_address(scope, address, symbol):
+    """Return the parameter at the lexical address, without going through the
+    scope chain (see `resolver`)
+
+    :param FunctionScope scope: the scope of the function that contains the
+        reference
+    :param tuple address: (depth, slot)
+    :param types.Symbol symbol: the name of the parameter. It's looked up by
+        name if a scope on the way isn't a function scope.
+    """
+    depth, slot = address
+    frame = scope
+    try:
+        while depth:
+            frame = frame.closure_scope
+            depth -= 1
+        return frame.slots[slot]
+    except AttributeError:
+        return scope[symbol]
+
+
+def get_global_scope(scope, through_closures=False):
+    """The global scope (a scope without parent) that answers the lookups
+    made in the scope, or None
+
+    :param scope:
+    :param bool through_closures: whether the lookup is of a symbol that's
+        not a parameter of the functions (see `resolver`). From a function
+        scope, these are looked up in the closure scopes first, so the
+        lookup ends up in the global scope where the outermost function was
+        defined, if the symbol is there.
+    """
+    if through_closures:
+        while isinstance(scope, (FunctionScope, CapturedScope)):
+            scope = scope.closure_scope
+    if (not isinstance(scope, Scope) or isinstance(scope, FunctionScope) or
+            scope.parent):
+        return None
+    return scope
+
+
+class CacheStats(object):
+    """Hit and miss counters of a lookup cache, for diagnostics"""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return '<CacheStats hits={} misses={}>'.format(self.hits, self.misses)
+
+    @property
+    def hit_rate(self):
+        """The ratio of the lookups answered by the cache"""
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
@@ -4,28 +4,160 @@ analysis of the text, building the abstract syntax tree and interpreting this
 tree
 """
 from __future__ import unicode_literals
+import io
+import mmap
 
 from whispy_lispy import (
-    parser2, lexer, scopes2, interpreter2)
+    parser2, lexer, scopes2, interpreter2, closure_compiler, compiler,
+    pycompiler, stackless, exceptions, cache)
+
+# The available evaluators of abstract syntax trees
+ENGINES = {
+    'tree': interpreter2.interpret_ast,
+    'closures': closure_compiler.interpret_ast,
+    'bytecode': compiler.interpret_ast,
+    'python': pycompiler.interpret_ast,
+    'stackless': stackless.interpret_ast,
+}
+# These engines map the errors to the source lines, so they need the source
+SOURCE_MAPPED_ENGINES = frozenset(['python'])
+DEFAULT_ENGINE = 'tree'
 
 
 def get_ast_from_text2(text, non_lispy_syntax=False):
     """Return the abstract syntax tree for this source text
 
+    The trees are cached (see `cache.ast_cache`), so don't modify them.
+
     :param str|unicode text: a text to be parsed into an Abstract syntax tree
     :param bool non_lispy_syntax: whether to use `func(a b)` style calls
         instead of the regular lisp-like `(func a b)` style
     """
-    token_list = lexer.get_flat_token_list(text)
+    return cache.ast_cache.get_ast(text, non_lispy_syntax, parse_text2)
+
+
+def parse_text2(text, non_lispy_syntax=False):
+    """Like `get_ast_from_text2`, but always parses the text"""
     if non_lispy_syntax:
-        token_list = lexer.make_parentheses_lispy(token_list)
+        tokens = lexer.iter_parentheses_lispy(lexer.iter_tokens(text))
+        cstree = lexer.get_concrete_syntax_tree(tokens)
+    else:
+        cstree = lexer.get_concrete_syntax_tree_from_text(text)
+
+    return parser2.get_ast_from_cst(cstree)
+
+
+def get_ast_from_file2(path, non_lispy_syntax=False):
+    """Return the abstract syntax tree for the source file at `path`
+
+    The file is memory mapped and the tokens are streamed into the concrete
+    syntax tree, so neither the whole text nor a full token list are ever in
+    memory.
+    If the file didn't change since it was last parsed, the tree is loaded
+    from its cache file instead (see `cache.disk_ast_cache`).
+
+    :param str|unicode path: the path to a (utf-8 encoded) source file
+    :param bool non_lispy_syntax: see `get_ast_from_text2`
+    """
+    with io.open(path, 'rb') as source_file:
+        try:
+            source = mmap.mmap(
+                source_file.fileno(), 0, access=mmap.ACCESS_READ)
+            digest = cache.get_binary_source_digest(source)
+        except ValueError:
+            # Empty files can't be mapped
+            source = source_file
+            digest = cache.get_binary_source_digest(b'')
+        try:
+            tree = cache.disk_ast_cache.load(path, digest, non_lispy_syntax)
+            if tree is not None:
+                return tree
+            cstree = _get_concrete_syntax_tree_from_file(
+                source, source_file, non_lispy_syntax)
+        finally:
+            if source is not source_file:
+                source.close()
+
+    tree = parser2.get_ast_from_cst(cstree)
+    cache.disk_ast_cache.store(path, digest, non_lispy_syntax, tree)
+    return tree
+
+
+def _get_concrete_syntax_tree_from_file(source, source_file,
+                                        non_lispy_syntax):
+    """
+    :param source: the mmap of the file, or the file itself
+    :param source_file: the file, opened in binary mode
+    """
+    try:
+        tokens = lexer.stream_tokens(source)
+        if non_lispy_syntax:
+            tokens = lexer.iter_parentheses_lispy(tokens)
+        return lexer.get_concrete_syntax_tree(tokens)
+    except exceptions.WhispyLispySyntaxError as err:
+        if err.source is not None:
+            raise
+        raise _add_source_to_syntax_error(err, source_file)
+
+
+def _add_source_to_syntax_error(err, source_file):
+    """Streamed tokens don't know their source. Read it all (it's the error
+    path anyway) so the error can point to the right line.
+    """
+    source_file.seek(0)
+    data = source_file.read()
+    index = err.index
+    if index is not None and index >= 0:
+        # Convert the byte offset to a character offset
+        index = len(data[:index].decode('utf-8', 'replace'))
+    return exceptions.WhispyLispySyntaxError(
+        data.decode('utf-8', 'replace'), index, err.extra_info)
+
+
+def get_engine(engine):
+    """Return the function that evaluates abstract syntax trees
+
+    :param str|unicode engine: one of the `ENGINES` keys
+    """
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError('Unknown engine "{}". Choose one of: {}'.format(
+            engine, ', '.join(sorted(ENGINES))))
+
+
+def interpret_text2(text, scope=None, non_lispy_syntax=False,
+                    engine=DEFAULT_ENGINE):
+    interpret_ast = get_engine(engine)
+    if scope is None:
+        scope = scopes2.Scope()
 
-    return parser2.get_ast_from_cst(lexer.get_concrete_syntax_tree(token_list))
+    tree = get_ast_from_text2(text, non_lispy_syntax)
+    if engine in SOURCE_MAPPED_ENGINES:
+        return interpret_ast(tree, scope, source=text)
+    return interpret_ast(tree, scope)
 
 
-def interpret_text2(text, scope=None, non_lispy_syntax=False):
+def interpret_file2(path, scope=None, non_lispy_syntax=False,
+                    engine=DEFAULT_ENGINE):
+    interpret_ast = get_engine(engine)
     if scope is None:
         scope = scopes2.Scope()
 
-    return interpreter2.interpret_ast(
-        get_ast_from_text2(text, non_lispy_syntax), scope)
+    tree = get_ast_from_file2(path, non_lispy_syntax)
+    if engine in SOURCE_MAPPED_ENGINES:
+        # The nodes of script files know their byte offsets. Map the file
+        # instead of reading it, only the newlines are needed.
+        with io.open(path, 'rb') as source_file:
+            try:
+                source = mmap.mmap(
+                    source_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                return interpret_ast(tree, scope, filename=path)
+            try:
+                return interpret_ast(
+                    tree, scope, source=source, filename=path)
+            finally:
+                source.close()
+    return interpret_ast(tree, scope)
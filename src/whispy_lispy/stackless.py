@@ -0,0 +1,175 @@
+# -*- coding utf-8 -*-
+"""An alternative to `interpreter2.interpret_ast` that never recurses in
+Python
+
+The evaluation works like a CEK machine: the node being evaluated (the
+control), its scope (the environment), and a stack of the pending work (the
+continuation). Evaluating a sub-expression pushes a frame describing what to
+do with its value; when the value is known, the topmost frame is popped and
+continued. The stack is a plain python list, so deep (non tail) recursion in
+a whispy lispy program is bounded by the memory, not by python's recursion
+limit.
+
+Calls in tail position don't push any frame, so they run in constant space,
+just like in `interpreter2`.
+
+To stop infinite recursions before they use up the memory, the stack is
+limited to `MAX_DEPTH` frames (or to the `max_depth` passed to
+`interpret_ast`): exceeding it raises `exceptions.RecursionDepthExceeded`.
+
+Main function: `interpret_ast` - same signature and semantics as
+`interpreter2.interpret_ast`
+"""
+from __future__ import unicode_literals, absolute_import
+
+from whispy_lispy import ast, types, scopes2, exceptions, interpreter2
+
+# How many frames the continuation stack can hold by default
+MAX_DEPTH = 100000
+
+# The kinds of frames on the continuation stack. The scope is always the
+# second item of a frame.
+# (SEQUENCE, scope, container node, index of the next child)
+SEQUENCE = 0
+# (FUNCTION, scope, apply node): waits for the function of the list
+FUNCTION = 1
+# (ARGUMENTS, scope, apply node, function, the evaluated arguments)
+ARGUMENTS = 2
+# (PREDICATE, scope, condition node, index of the clause)
+PREDICATE = 3
+# (ASSIGN, scope, symbol)
+ASSIGN = 4
+
+
+def interpret_ast(astree, scope=None, max_depth=None):
+    """Evaluate the tree in the given scope
+
+    :param ast.AbstractSyntaxNode astree:
+    :param int max_depth: how many frames the continuation stack can hold
+        (`MAX_DEPTH` if None)
+    :rtype: types.Type
+    """
+    if scope is None:
+        scope = scopes2.Scope()
+    if max_depth is None:
+        max_depth = MAX_DEPTH
+
+    root_scope = scope
+    stack = []
+
+    while True:
+        # Evaluate `astree` in `scope`. Nodes with sub-expressions push a
+        # frame and continue with the sub-expression; the others set `value`
+        if isinstance(astree, types.Type):
+            value = astree
+
+        elif astree.is_leaf() and not astree.is_root():
+            value = interpreter2.interpret_leaf(astree, scope)
+
+        elif isinstance(astree, ast.Apply):
+            push(stack, max_depth, (FUNCTION, scope, astree))
+            head = astree[0]
+            # Like `interpreter2.obtain_function` (operators are containers)
+            if (isinstance(head, ast.Container) and
+                    not isinstance(head, (ast.Operator, ast.Symbol))):
+                astree = head
+                continue
+            value = interpreter2.obtain_function(head, scope)
+
+        elif isinstance(astree, ast.Assign):
+            if isinstance(astree[0], ast.Symbol):
+                push(stack, max_depth, (
+                    ASSIGN, scope, astree[0].symbol))
+                astree = astree[1]
+                continue
+            value = interpreter2.interpret_assign(astree, scope)
+
+        elif isinstance(astree, ast.Condition):
+            if astree.values:
+                push(stack, max_depth, (PREDICATE, scope, astree, 0))
+                astree = astree[0][0]
+                continue
+            value = None
+
+        elif isinstance(astree, ast.Lambda):
+            value = interpreter2.interpret_lambda(astree, scope)
+
+        elif astree.values:
+            if len(astree.values) > 1:
+                push(stack, max_depth, (SEQUENCE, scope, astree, 1))
+            astree = astree[0]
+            continue
+
+        else:
+            value = None
+
+        # Pass the value to the pending frames, until one of them has
+        # another node to evaluate
+        while True:
+            if not stack:
+                return value
+            frame = stack.pop()
+            kind = frame[0]
+
+            if kind == SEQUENCE:
+                _, scope, node, idx = frame
+                if idx + 1 < len(node.values):
+                    stack.append((SEQUENCE, scope, node, idx + 1))
+                astree = node[idx]
+                break
+
+            if kind == PREDICATE:
+                _, scope, node, idx = frame
+                if types.is_true(value):
+                    astree = node[idx][1]
+                    break
+                if idx + 1 < len(node.values):
+                    stack.append((PREDICATE, scope, node, idx + 1))
+                    astree = node[idx + 1][0]
+                    break
+                value = None
+                continue
+
+            if kind == ASSIGN:
+                _, scope, key = frame
+                scope[key] = value
+                value = None
+                continue
+
+            if kind == FUNCTION:
+                _, scope, node = frame
+                frame = (ARGUMENTS, scope, node, value, [])
+            else:
+                frame[4].append(value)
+
+            _, scope, node, func, args = frame
+            if len(args) < len(node.values) - 1:
+                stack.append(frame)
+                astree = node[len(args) + 1]
+                break
+
+            if not isinstance(func, types.Function):
+                value = func(interpret_ast, scope, *args)
+                continue
+
+            # The body is in tail position, so it needs no frame. The scope
+            # making the call is done if it was created for a function call,
+            # and no pending frame uses it.
+            in_function_frame = (
+                scope is not root_scope and
+                (not stack or stack[-1][1] is not scope))
+            scope = scopes2.FunctionScope(
+                parent=interpreter2.get_tail_call_parent(
+                    scope, func, in_function_frame),
+                arguments=args, closure_scope=func.scope,
+                descriptor=func.descriptor)
+            astree = func.code
+            break
+
+
+def push(stack, max_depth, frame):
+    """Push the frame on the continuation stack, if it's not full"""
+    if len(stack) >= max_depth:
+        raise exceptions.RecursionDepthExceeded(
+            'More than {} nested evaluations'.format(max_depth))
+    stack.append(frame)
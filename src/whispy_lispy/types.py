@@ -5,9 +5,13 @@ From now on, all the functions will operate on these
 """
 from __future__ import unicode_literals, absolute_import
 
+from whispy_lispy import exceptions
+
 
 class Type(object):
     """Abstract base type"""
+    __slots__ = ()
+
     def __init__(self, values):
         """
         :param tuple values: a tuple of values
@@ -22,8 +26,43 @@ class Type(object):
     def __hash__(self):
         return hash(self.values)
 
+    @property
+    def value(self):
+        """The first of the values"""
+        return self.values[0]
+
+
+class Scalar(Type):
+    """Base type for the values holding a single python object (strings,
+    numbers and booleans)
+
+    The object is stored directly in `value`, there's no tuple around it.
+    `values` still works, for the code that treats all the types alike.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, values):
+        """
+        :param tuple values: a tuple holding the python object
+        """
+        self.value = values[0]
+
+    @property
+    def values(self):
+        return (self.value,)
+
+    def __eq__(self, other):
+        if self.__class__ is not other.__class__:
+            return False
+        return self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class String(Scalar):
+    __slots__ = ()
 
-class String(Type):
     @classmethod
     def from_quoted_values(cls, values):
         """The concrete syntax nodes didn't know much difference
@@ -35,27 +74,71 @@ class String(Type):
         return cls((values[0][1:-1],))
 
     def __repr__(self):
-        return '$String {}'.format(self.values[0])
+        return '$String {}'.format(self.value)
 
-    def __eq__(self, other):
-        if self.__class__ != other.__class__:
-            return False
-        return self.values == other.values
 
+class Int(Scalar):
+    __slots__ = ()
 
-class Int(Type):
     def __repr__(self):
-        return '$Int {}'.format(self.values[0])
+        return '$Int {}'.format(self.value)
 
 
-class Bool(Type):
+class Bool(Scalar):
+    __slots__ = ()
+
     def __repr__(self):
-        return '$Bool {}'.format(self.values[0])
+        return '$Bool {}'.format(self.value)
+
 
+class Float(Scalar):
+    __slots__ = ()
 
-class Float(Type):
     def __repr__(self):
-        return '$Float {}'.format(self.values[0])
+        return '$Float {}'.format(self.value)
+
+
+# The booleans are singletons
+TRUE = Bool((True,))
+FALSE = Bool((False,))
+
+# The integers in this range are preallocated
+SMALL_INT_MIN = -128
+SMALL_INT_MAX = 1024
+SMALL_INTS = dict(
+    (value, Int((value,))) for value in range(SMALL_INT_MIN, SMALL_INT_MAX + 1))
+
+
+def make_bool(value):
+    """Return TRUE or FALSE
+
+    :param bool value:
+    """
+    return TRUE if value else FALSE
+
+
+def make_int(value):
+    """Return the Int of the python integer. The small ones are cached.
+
+    :param int value:
+    """
+    cached = SMALL_INTS.get(value)
+    if cached is not None:
+        return cached
+    return Int((value,))
+
+
+def is_true(value):
+    """Whether the value is the whispy lispy true (what `cond` checks)
+
+    The booleans made with `make_bool` are checked by identity. Others are
+    compared, like they used to be.
+    """
+    if value is TRUE:
+        return True
+    if value is FALSE:
+        return False
+    return value == TRUE
 
 
 class List(Type):
@@ -64,10 +147,43 @@ class List(Type):
 
 
 class Symbol(Type):
+    """A name, as the key of the scopes
+
+    The symbols are interned: creating a symbol with the name of an existing
+    one returns the existing one. So two symbols are equal only if they're
+    the same object, and their hash is the (cheap) identity hash.
+    """
+    __slots__ = ('values',)
+
+    def __new__(cls, values):
+        """
+        :param tuple values: a tuple holding the name
+        """
+        values = tuple(values)
+        try:
+            return SYMBOL_TABLE[values]
+        except KeyError:
+            symbol = super(Symbol, cls).__new__(cls)
+            symbol.values = values
+            SYMBOL_TABLE[values] = symbol
+            return symbol
+
+    def __init__(self, values):
+        """The values are set by `__new__`"""
+
+    def __eq__(self, other):
+        return self is other
+
+    __hash__ = object.__hash__
+
     def __repr__(self):
         return '$Symbol {}'.format((self.values[0]))
 
 
+# The interned symbols, by their values
+SYMBOL_TABLE = {}
+
+
 class Function(Type):
     """The Function object.
 
@@ -78,9 +194,16 @@ class Function(Type):
     3: A Scope
 
     ...Stuff will get added here (like the closure scope)
+
+    `descriptor` is the `CallDescriptor` of the function. The functions
+    created from the same definition can share it.
     """
-    def __init__(self, *args, **kwrgs):
-        super(Function, self).__init__(*args, **kwrgs)
+    def __init__(self, values, descriptor=None):
+        super(Function, self).__init__(values)
+        if descriptor is None:
+            descriptor = CallDescriptor(
+                values[0].values[0], values[1], values[2])
+        self.descriptor = descriptor
 
     def __repr__(self):
         params = '(' + ', '.join(str(val.values[0]) for val in self.values[1]) + ')'
@@ -107,11 +230,32 @@ class Function(Type):
         """
         :param args: instances of the whispy_lispy.types classes
         """
-        from whispy_lispy import scopes2
-        local_scope = scopes2.FunctionScope(
-            parent=scope, param_names=self.params,
-            arguments=args, closure_scope=self.scope)
+        return interpreter(self.code, scope.call_frame(self, args))
+
 
-        result = interpreter(self.code, local_scope)
+class CallDescriptor(object):
+    """What a call needs to know about a function, computed once per
+    function definition
 
-        return result
+    name: the name of the function, for the error messages
+    params: the formal parameter names (a tuple)
+    arity: how many arguments the function takes
+    layout: the index of each parameter in the arguments, by name (the last
+        one wins, if names repeat)
+    code: the AST of the body
+    """
+    __slots__ = ('name', 'params', 'arity', 'layout', 'code')
+
+    def __init__(self, name, params, code=None):
+        self.name = name
+        self.params = params
+        self.arity = len(params)
+        self.layout = dict((param, slot) for slot, param in enumerate(params))
+        self.code = code
+
+    def check_arity(self, arguments):
+        """Raise ArityError if the function can't take the arguments"""
+        if len(arguments) != self.arity:
+            raise exceptions.ArityError(
+                'Function "{}" takes {} arguments ({} given)'.format(
+                    self.name, self.arity, len(arguments)))
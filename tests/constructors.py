@@ -84,9 +84,7 @@ def t_str(*values):
 
 def c_n(*values):
     """Return a Concrete Syntax node"""
-    is_operator = values[0] in keywords.OPERATORS
-
-    return cst.ConcreteSyntaxNode(values, is_operator)
+    return cst.ConcreteSyntaxNode(values)
 
 
 def c_r(*values):
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import marshal
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+from whispy_lispy import cache, skip_steps, exceptions, types, lexer, ast
+
+
+class CountingParser(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, non_lispy_syntax):
+        self.calls += 1
+        return skip_steps.parse_text2(text, non_lispy_syntax)
+
+
+class AstCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.parse = CountingParser()
+
+    def test_same_source_is_parsed_once(self):
+        ast_cache = cache.AstCache()
+        first = ast_cache.get_ast('(sum 1 2)', False, self.parse)
+        second = ast_cache.get_ast('(sum 1 2)', False, self.parse)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.parse.calls, 1)
+        self.assertEqual(ast_cache.stats, cache.CacheStats(
+            hits=1, misses=1, evictions=0, entries=1, size=9))
+
+    def test_syntax_flag_is_part_of_the_key(self):
+        ast_cache = cache.AstCache()
+        lispy = ast_cache.get_ast('(f 1)', False, self.parse)
+        non_lispy = ast_cache.get_ast('(f 1)', True, self.parse)
+
+        self.assertIsNot(lispy, non_lispy)
+        self.assertEqual(self.parse.calls, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        ast_cache = cache.AstCache(max_entries=2)
+        ast_cache.get_ast('1', False, self.parse)
+        ast_cache.get_ast('2', False, self.parse)
+        ast_cache.get_ast('1', False, self.parse)
+        ast_cache.get_ast('3', False, self.parse)  # evicts '2'
+        self.assertEqual(self.parse.calls, 3)
+
+        ast_cache.get_ast('1', False, self.parse)
+        self.assertEqual(self.parse.calls, 3)
+        ast_cache.get_ast('2', False, self.parse)
+        self.assertEqual(self.parse.calls, 4)
+        self.assertEqual(ast_cache.stats.evictions, 2)
+
+    def test_byte_limit(self):
+        ast_cache = cache.AstCache(max_bytes=10)
+        ast_cache.get_ast('(f 1 2)', False, self.parse)
+        ast_cache.get_ast('(g 3 4)', False, self.parse)
+        self.assertEqual(len(ast_cache), 1)
+        self.assertEqual(ast_cache.stats.size, 7)
+
+        # Too big to be cached at all
+        ast_cache.get_ast('(h 1 2 3 4)', False, self.parse)
+        ast_cache.get_ast('(h 1 2 3 4)', False, self.parse)
+        self.assertEqual(self.parse.calls, 4)
+        self.assertEqual(len(ast_cache), 1)
+
+    def test_size_is_the_encoded_length(self):
+        ast_cache = cache.AstCache(max_bytes=10)
+        # 7 characters, 12 bytes
+        ast_cache.get_ast('"\u0103\u0103\u0103\u0103\u0103"', False, self.parse)
+        self.assertEqual(len(ast_cache), 0)
+        ast_cache.get_ast('"\u0103\u0103"', False, self.parse)
+        self.assertEqual(ast_cache.stats.size, 6)
+
+    def test_disable_and_clear(self):
+        ast_cache = cache.AstCache()
+        ast_cache.get_ast('1', False, self.parse)
+        ast_cache.configure(enabled=False)
+        self.assertEqual(len(ast_cache), 0)
+        ast_cache.get_ast('1', False, self.parse)
+        ast_cache.get_ast('1', False, self.parse)
+        self.assertEqual(self.parse.calls, 3)
+        self.assertEqual(len(ast_cache), 0)
+
+        ast_cache.configure(enabled=True)
+        ast_cache.get_ast('1', False, self.parse)
+        ast_cache.clear(reset_stats=True)
+        self.assertEqual(ast_cache.stats, cache.CacheStats(0, 0, 0, 0, 0))
+
+    def test_lowering_the_limits_evicts(self):
+        ast_cache = cache.AstCache()
+        for text in ('1', '2', '3'):
+            ast_cache.get_ast(text, False, self.parse)
+        ast_cache.configure(max_entries=1)
+        self.assertEqual(len(ast_cache), 1)
+        self.assertEqual(ast_cache.stats.evictions, 2)
+
+    def test_errors_are_not_cached(self):
+        ast_cache = cache.AstCache()
+        for _ in range(2):
+            self.assertRaises(exceptions.WhispyLispySyntaxError,
+                              ast_cache.get_ast, '(a', False, self.parse)
+        self.assertEqual(self.parse.calls, 2)
+        self.assertEqual(len(ast_cache), 0)
+
+
+class SkipStepsCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        cache.ast_cache.clear(reset_stats=True)
+        self.addCleanup(cache.ast_cache.clear, True)
+
+    def test_interpreting_the_same_text_uses_the_cache(self):
+        for _ in range(3):
+            self.assertEqual(skip_steps.interpret_text2('(sum 1 2 3)'),
+                             types.Int((6,)))
+        self.assertEqual(cache.ast_cache.stats.hits, 2)
+        self.assertEqual(cache.ast_cache.stats.misses, 1)
+
+
+class DiskAstCacheTestCase(unittest.TestCase):
+    SCRIPT = '(def (f a) (sum a 1))\n(f 41)'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.script = self.write_script(self.SCRIPT)
+        patcher = mock.patch.object(cache, 'disk_ast_cache',
+                                    cache.DiskAstCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_script(self, text, name='script.wl'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as script:
+            script.write(text.encode('utf-8'))
+        return path
+
+    def get_ast_counting_parses(self, non_lispy_syntax=False):
+        with mock.patch.object(lexer, 'stream_tokens',
+                               wraps=lexer.stream_tokens) as stream_tokens:
+            tree = skip_steps.get_ast_from_file2(
+                self.script, non_lispy_syntax)
+        return tree, stream_tokens.call_count
+
+    def test_tree_is_loaded_from_the_cache_file(self):
+        first, first_parses = self.get_ast_counting_parses()
+        second, second_parses = self.get_ast_counting_parses()
+
+        self.assertEqual((first_parses, second_parses), (1, 0))
+        self.assertEqual(first, second)
+        self.assertTrue(os.path.isfile(cache.disk_ast_cache.get_cache_path(
+            self.script, False)))
+        self.assertEqual(
+            os.path.dirname(cache.disk_ast_cache.get_cache_path(
+                self.script, False)),
+            os.path.join(self.directory, cache.CACHE_DIRECTORY_NAME))
+        self.assertEqual(skip_steps.interpret_file2(self.script),
+                         types.Int((42,)))
+
+    def test_changed_source_invalidates_the_cache(self):
+        self.get_ast_counting_parses()
+        self.write_script('(sum 1 2)')
+        tree, parses = self.get_ast_counting_parses()
+
+        self.assertEqual(parses, 1)
+        self.assertEqual(tree, skip_steps.parse_text2('(sum 1 2)'))
+
+    def test_other_interpreter_version_invalidates_the_cache(self):
+        self.get_ast_counting_parses()
+        with mock.patch.object(cache, 'CACHE_FORMAT_VERSION',
+                               cache.CACHE_FORMAT_VERSION + 1):
+            _, parses = self.get_ast_counting_parses()
+        self.assertEqual(parses, 1)
+
+    def test_syntax_flag_has_its_own_cache_file(self):
+        self.get_ast_counting_parses()
+        _, parses = self.get_ast_counting_parses(non_lispy_syntax=True)
+        self.assertEqual(parses, 1)
+
+    def test_corrupted_cache_file_is_ignored(self):
+        self.get_ast_counting_parses()
+        path = cache.disk_ast_cache.get_cache_path(self.script, False)
+        with open(path, 'r+b') as cache_file:
+            cache_file.seek(-5, os.SEEK_END)
+            cache_file.write(b'xxxxx')
+
+        tree, parses = self.get_ast_counting_parses()
+        self.assertEqual(parses, 1)
+        self.assertEqual(tree, skip_steps.parse_text2(self.SCRIPT))
+
+    def test_disabled_cache(self):
+        cache.disk_ast_cache.enabled = False
+        self.get_ast_counting_parses()
+        _, parses = self.get_ast_counting_parses()
+        self.assertEqual(parses, 1)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, cache.CACHE_DIRECTORY_NAME)))
+
+    def test_common_cache_directory(self):
+        cache_dir = os.path.join(self.directory, 'cache')
+        cache.disk_ast_cache.cache_dir = cache_dir
+        other_directory = os.path.join(self.directory, 'other')
+        os.mkdir(other_directory)
+        other_script = self.write_script(
+            self.SCRIPT, os.path.join('other', 'script.wl'))
+
+        self.assertNotEqual(
+            cache.disk_ast_cache.get_cache_path(self.script, False),
+            cache.disk_ast_cache.get_cache_path(other_script, False))
+        self.get_ast_counting_parses()
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+    def test_concurrent_writes(self):
+        tree = skip_steps.parse_text2(self.SCRIPT)
+        digest = cache.get_source_digest(self.SCRIPT)
+        disk_cache = cache.disk_ast_cache
+        errors = []
+
+        def write_and_read():
+            try:
+                for _ in range(20):
+                    disk_cache.store(self.script, digest, False, tree)
+                    loaded = disk_cache.load(self.script, digest, False)
+                    if loaded != tree:
+                        errors.append(loaded)
+            except Exception as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=write_and_read)
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # No temporary files are left behind
+        self.assertEqual(
+            os.listdir(os.path.dirname(
+                disk_cache.get_cache_path(self.script, False))),
+            [os.path.basename(
+                disk_cache.get_cache_path(self.script, False))])
+
+    def test_pickled_cache_files_are_not_loaded(self):
+        self.get_ast_counting_parses()
+        path = cache.disk_ast_cache.get_cache_path(self.script, False)
+        header = cache.disk_ast_cache.get_header(
+            cache.get_source_digest(self.SCRIPT))
+        with open(path, 'wb') as cache_file:
+            cache_file.write(header + pickle.dumps(
+                skip_steps.parse_text2(self.SCRIPT)))
+
+        tree, parses = self.get_ast_counting_parses()
+        self.assertEqual(parses, 1)
+        self.assertEqual(tree, skip_steps.parse_text2(self.SCRIPT))
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'No file owners')
+    def test_shared_cache_directories_are_not_used(self):
+        cache_dir = os.path.join(self.directory, 'cache')
+        os.mkdir(cache_dir)
+        os.chmod(cache_dir, 0o777)
+        cache.disk_ast_cache.cache_dir = cache_dir
+
+        self.get_ast_counting_parses()
+        _, parses = self.get_ast_counting_parses()
+
+        self.assertEqual(parses, 1)
+        self.assertEqual(os.listdir(cache_dir), [])
+
+
+class TreeSerializationTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        text = ("(def (f a) (cond ((= a 1) 1.5) (#t '(a \"s\" #f))))\n"
+                "((lambda (x) (* x 2)) 4)")
+        tree = skip_steps.parse_text2(text)
+
+        loaded = cache.load_tree(cache.dump_tree(tree))
+
+        self.assertEqual(loaded, tree)
+        self.assertEqual(loaded[0].index, tree[0].index)
+        self.assertEqual(loaded[1][1].index, tree[1][1].index)
+
+    def test_loaded_values_are_cached(self):
+        loaded = cache.load_tree(cache.dump_tree(
+            skip_steps.parse_text2('#t 7 a')))
+        self.assertIs(loaded[0][0], types.TRUE)
+        self.assertIs(loaded[1][0], types.make_int(7))
+        self.assertIs(loaded[2].symbol, types.Symbol(('a',)))
+
+    def test_deep_trees(self):
+        depth = 10000
+        tree = skip_steps.parse_text2('(' * depth + 'a' + ')' * depth)
+        loaded = cache.load_tree(cache.dump_tree(tree))
+        for _ in range(depth + 1):  # the root, then the lists
+            self.assertEqual(len(loaded.values), 1)
+            loaded = loaded[0]
+        self.assertEqual(loaded, ast.Symbol(('a',)))
+
+    def test_functions_are_not_stored(self):
+        tree = ast.RootAbstractSyntaxNode((types.Function((
+            types.String(('f',)), (), ast.Value((types.Int((1,)),)), {})),))
+        self.assertRaises(ValueError, cache.dump_tree, tree)
+
+    def test_only_known_classes_are_loaded(self):
+        data = marshal.dumps(((cache.RECORD_NODE, 'Scope', None, True, 0),))
+        self.assertRaises(KeyError, cache.load_tree, data)
+        data = marshal.dumps(((cache.RECORD_VALUE, [1]),))
+        self.assertRaises(ValueError, cache.load_tree, data)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import unittest
+
+from whispy_lispy import cst, lexer, parser2, ast
+
+cn = cst.ConcreteSyntaxNode
+
+
+class NodeKindTestCase(unittest.TestCase):
+    def test_kinds_of_leaves(self):
+        expected = [
+            ('"x"', cst.KIND_STRING),
+            (True, cst.KIND_BOOL),
+            (3, cst.KIND_INT),
+            (3.5, cst.KIND_FLOAT),
+            ('+', cst.KIND_OPERATOR),
+            ('and', cst.KIND_OPERATOR),
+            ('\'', cst.KIND_QUOTE),
+            ('def', cst.KIND_DEFINITION),
+            ('define', cst.KIND_DEFINITION),
+            ('cond', cst.KIND_CONDITION),
+            ('if', cst.KIND_CONDITION),
+            ('lambda', cst.KIND_LAMBDA),
+            ('x', cst.KIND_SYMBOL),
+        ]
+        for value, kind in expected:
+            self.assertEqual(cn((value,)).kind, kind, value)
+
+    def test_kinds_of_lists(self):
+        self.assertEqual(cn((cn(('a',)),)).kind, cst.KIND_LIST)
+        self.assertEqual(cn(()).kind, None)
+        self.assertEqual(cn((1, 2)).kind, None)
+
+    def test_mixed_values_are_rejected(self):
+        self.assertRaises(cst.CSTError, cn, (cn((1,)), 1))
+
+    def test_known_kind_skips_validation(self):
+        node = cn(('a',), cst.KIND_SYMBOL)
+        self.assertEqual(node.kind, cst.KIND_SYMBOL)
+
+    def test_classification_methods(self):
+        self.assertTrue(cn((True,)).is_bool())
+        self.assertTrue(cn((True,)).is_int())
+        self.assertTrue(cn(('"s"',)).is_string())
+        self.assertTrue(cn(('"s"',)).is_symbol())
+        self.assertTrue(cn(('def',)).is_symbol())
+        self.assertTrue(cn(('*',)).is_operator())
+        self.assertFalse(cn((1,)).is_symbol())
+        self.assertTrue(cn(()).is_leaf())
+        self.assertFalse(cn((cn((1,)),)).is_leaf())
+
+    def test_lexer_creates_nodes_with_kinds(self):
+        text = '(def (f x) (cond ((= x 1.5) "a") (#t \'x)))'
+        trees = [
+            lexer.get_concrete_syntax_tree_from_text(text),
+            lexer.get_concrete_syntax_tree(lexer.get_flat_token_list(text)),
+        ]
+        for tree in trees:
+            pending = [tree]
+            while pending:
+                node = pending.pop()
+                if not node.is_root():
+                    self.assertEqual(node.kind, cn.get_kind(node.values))
+                if node.kind == cst.KIND_LIST:
+                    pending.extend(node.values)
+
+    def test_parser_node_types_by_kind(self):
+        self.assertIs(
+            parser2.determine_operation_type(cn(('lambda',))), ast.Lambda)
+        self.assertIs(
+            parser2.determine_operation_type(cn((cn((1,)),))), ast.Apply)
+        self.assertIs(
+            parser2.determine_operation_type(cst.RootConcreteSyntaxnode(())),
+            ast.RootAbstractSyntaxNode)
+        self.assertRaises(
+            Exception, parser2.determine_operation_type, cn(()))
+
+
+class NodeIndexTestCase(unittest.TestCase):
+    TEXT = "(def x\n  '(a 1))  b"
+
+    def assert_indexes(self, cstree):
+        definition = cstree.values[0]
+        self.assertEqual(definition.index, 0)
+        self.assertEqual(
+            [node.index for node in definition.values], [1, 5, 9, 10])
+        self.assertEqual(
+            [node.index for node in definition.values[3].values], [11, 13])
+        self.assertEqual(cstree.values[1].index, 18)
+
+    def test_tree_from_text(self):
+        self.assert_indexes(lexer.get_concrete_syntax_tree_from_text(
+            self.TEXT))
+
+    def test_tree_from_tokens(self):
+        self.assert_indexes(lexer.get_concrete_syntax_tree(
+            lexer.get_flat_token_list(self.TEXT)))
+
+    def test_tree_from_compact_stream(self):
+        self.assert_indexes(lexer.get_concrete_syntax_tree(
+            lexer.get_compact_token_stream(self.TEXT)))
+
+    def test_index_is_not_part_of_the_state(self):
+        self.assertEqual(cst.ConcreteSyntaxNode((1,), index=3),
+                         cst.ConcreteSyntaxNode((1,), index=8))
+
+    def test_abstract_nodes_get_the_indexes(self):
+        tree = parser2.get_ast_from_cst(
+            lexer.get_concrete_syntax_tree_from_text(self.TEXT))
+        assign = tree.values[0]
+
+        self.assertEqual(tree.index, None)
+        self.assertEqual((assign.index, assign[0].index), (0, 5))
+        # The quote becomes (quote (a 1)), at the quoted list
+        self.assertEqual((assign[1].index, assign[1][1].index), (10, 10))
+        self.assertEqual(assign[1][1][1].index, 13)
+        self.assertEqual(tree.values[1].index, 18)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Deeply nested programs must be parsed without hitting the recursion limit
+"""
+from __future__ import absolute_import, unicode_literals
+import unittest
+
+from whispy_lispy import ast, keywords, lexer, parser2, skip_steps
+
+DEPTH = 100000
+
+
+def nesting_depth(node, node_type):
+    """How many nodes of `node_type` are nested in each other, following
+    the last child"""
+    depth = 0
+    while isinstance(node, node_type):
+        depth += 1
+        node = node.values[-1]
+    return depth
+
+
+class DeepNestingTestCase(unittest.TestCase):
+    def test_nested_lists(self):
+        text = '(' * DEPTH + 'a' + ')' * DEPTH
+        tree = skip_steps.parse_text2(text)
+
+        self.assertIsInstance(tree, ast.RootAbstractSyntaxNode)
+        self.assertEqual(nesting_depth(tree.values[0], ast.Apply), DEPTH)
+
+    def test_nested_lambdas(self):
+        text = '(lambda (x) ' * DEPTH + 'x' + ')' * DEPTH
+        tree = skip_steps.parse_text2(text)
+
+        self.assertEqual(nesting_depth(tree.values[0], ast.Lambda), DEPTH)
+
+    def test_nested_quotes(self):
+        text = "('(a " * (DEPTH // 2) + ')' * DEPTH
+        tree = parser2.get_ast_from_cst(
+            lexer.get_concrete_syntax_tree(lexer.get_flat_token_list(text)))
+
+        # ('(a ('(a ... -> ((quote (a (' (a ...
+        quote_list = tree.values[0].values[0]
+        self.assertEqual(quote_list.values[0],
+                         ast.Symbol((keywords.BUILTIN_QUOTE_FUNC,)))
+        # The quoted lists are not transformed again
+        quoted = quote_list.values[1]
+        self.assertIsInstance(quoted.values[1].values[0], ast.QuoteShorthand)
+        self.assertEqual(nesting_depth(tree.values[0], ast.Apply),
+                         DEPTH + 1)
+
+    def test_non_lispy_syntax(self):
+        text = 'f(' * DEPTH + ')' * DEPTH
+        tree = skip_steps.parse_text2(text, non_lispy_syntax=True)
+
+        self.assertEqual(nesting_depth(tree.values[0], ast.Apply), DEPTH)
@@ -3,6 +3,9 @@
 """
 from __future__ import absolute_import, unicode_literals
 
+import os
+import shutil
+import tempfile
 import unittest
 import six
 
@@ -13,7 +16,8 @@ else:
     from unittest import mock
     import io as StringIO
 
-from whispy_lispy import skip_steps, scopes2, types
+from whispy_lispy import skip_steps, scopes2, types, exceptions
+from whispy_lispy.__main__ import main
 
 
 SAMPLE_SUM_NUMBERS_AND_RETURN_VALUE = """\
@@ -44,3 +48,49 @@ class IntegrationTestCase(unittest.TestCase):
         self.assertEqual(result, types.Int((21,)))
         # Printed the result to standard output
         stdout_mock.assert_has_calls([mock.call.write(str(types.Int((7,))))])
+
+
+class ScriptFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_script(self, text):
+        path = os.path.join(self.directory, 'script.wl')
+        with open(path, 'wb') as script:
+            script.write(text.encode('utf-8'))
+        return path
+
+    def test_interpret_script_file(self):
+        path = self.write_script(SAMPLE_SUM_NUMBERS_AND_RETURN_VALUE)
+        scope = scopes2.Scope()
+
+        result = skip_steps.interpret_file2(path, scope)
+
+        self.assertEqual(result, types.Int((8,)))
+        self.assertEqual(scope[types.Symbol(('x',))], types.Int((7,)))
+
+    def test_interpret_empty_script_file(self):
+        self.assertEqual(skip_steps.interpret_file2(self.write_script('')),
+                         None)
+
+    def test_syntax_errors_in_script_files_point_at_the_line(self):
+        path = self.write_script('(def a 1)\n(def "\u0103" 2)\n(def b $)')
+        try:
+            skip_steps.interpret_file2(path)
+        except exceptions.WhispyLispySyntaxError as err:
+            self.assertIn('line 3, row 8', str(err))
+        else:
+            self.fail('Syntax error not raised')
+
+    @mock.patch('sys.stdout')
+    def test_main_runs_script_files(self, stdout_mock):
+        path = self.write_script('(print (sum 2 3))')
+        self.assertEqual(main(['whispy_lispy', path]), 0)
+        stdout_mock.assert_has_calls([mock.call.write(str(types.Int((5,))))])
+
+    def test_script_files_with_unicode_whitespace(self):
+        text = '(def\u00a0x 2)\u2003(sum x\u00a0 3)'
+        self.assertEqual(
+            skip_steps.interpret_file2(self.write_script(text)),
+            skip_steps.interpret_text2(text))
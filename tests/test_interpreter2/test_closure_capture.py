@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import gc
+import unittest
+import weakref
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from whispy_lispy import skip_steps, scopes2, types
+
+# Creates 10 closures in each iteration. The closures use `n`, but not the
+# previous closure `f`, which the loop keeps in the same scope.
+CLOSURES_LOOP = """
+(def (loop n f)
+    (cond ((= n 0) (f 0))
+          (#t (loop (sub n 1)
+                    ((lambda (a b c d e g h i j k) k)
+                     (lambda (y) n) (lambda (y) n) (lambda (y) n)
+                     (lambda (y) n) (lambda (y) n) (lambda (y) n)
+                     (lambda (y) n) (lambda (y) n) (lambda (y) n)
+                     (lambda (y) n))))))
+(loop {} (lambda (y) 0))
+"""
+
+
+class ClosureCaptureTestCase(unittest.TestCase):
+    def test_closures_only_keep_the_arguments_they_use(self):
+        scope = scopes2.Scope()
+        skip_steps.interpret_text2(
+            '(def (mk x y) (lambda (z) (+ x z))) (def add1 (mk 1 2))', scope)
+
+        add1 = scope[types.Symbol(('add1',))]
+        self.assertIsInstance(add1.scope, scopes2.CapturedScope)
+        self.assertEqual(add1.scope.slots, (types.Int((1,)), None))
+        self.assertEqual(
+            skip_steps.interpret_text2('(add1 2)', scope), types.Int((3,)))
+
+    def test_closures_using_other_symbols_keep_the_whole_scope(self):
+        scope = scopes2.Scope()
+        skip_steps.interpret_text2(
+            '(def (mk x) (lambda (z) (sum x z))) (def add1 (mk 1))', scope)
+
+        add1 = scope[types.Symbol(('add1',))]
+        self.assertIsInstance(add1.scope, scopes2.FunctionScope)
+
+    def test_closures_dont_keep_the_scope_that_created_them_alive(self):
+        refs = []
+
+        def keep(interpreter, scope):
+            refs.append(weakref.ref(scope))
+
+        scope = scopes2.Scope()
+        scope[types.Symbol(('keep',))] = keep
+        skip_steps.interpret_text2(
+            '(def (mk x) ((lambda (ignored g) g) (keep) (lambda (z) x)))'
+            '(def g (mk 1))', scope)
+        gc.collect()
+
+        self.assertIsNone(refs[0]())
+        self.assertEqual(
+            skip_steps.interpret_text2('(g 0)', scope), types.Int((1,)))
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_million_closures_in_a_loop_use_bounded_memory(self):
+        tracemalloc.start()
+        try:
+            result = skip_steps.interpret_text2(
+                CLOSURES_LOOP.format(100000))
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(result, types.Int((1,)))
+        # Keeping the scopes of the iterations alive takes more than 50MB
+        self.assertLess(peak, 5 * 1024 * 1024)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Run the interpreter2 test suite against the closure compiling engine"""
+from __future__ import absolute_import, unicode_literals
+import unittest
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+from whispy_lispy import (
+    ast, types, scopes2, interpreter2, closure_compiler, skip_steps)
+from . import (
+    test_conditions, test_functions, test_lambdas, test_operations)
+from .. import test_interpreter2
+from ..constructors import *
+
+
+class ClosureCompilerEngineMixin(object):
+    """Make the tests calling `interpreter2.interpret_ast` use the closure
+    compiler instead"""
+    def setUp(self):
+        super(ClosureCompilerEngineMixin, self).setUp()
+        patcher = mock.patch.object(
+            interpreter2, 'interpret_ast', closure_compiler.interpret_ast)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ClosureInterpreterTestCase(
+        ClosureCompilerEngineMixin,
+        test_interpreter2.InterpreterTestCase):
+    pass
+
+
+class ClosureConditionEvaluationTestCase(
+        ClosureCompilerEngineMixin,
+        test_conditions.ConditionEvaluationTestCase):
+    pass
+
+
+class ClosureFunctionCreationTestCase(
+        ClosureCompilerEngineMixin,
+        test_functions.FunctionCreationTestCase):
+    pass
+
+
+class ClosureFunctionExecutionTestCase(
+        ClosureCompilerEngineMixin,
+        test_functions.FunctionExecutionTestCase):
+    pass
+
+
+class ClosureLambdasTestCase(
+        ClosureCompilerEngineMixin, test_lambdas.LambdasTestCase):
+    pass
+
+
+class ClosureOperatorsTestCase(
+        ClosureCompilerEngineMixin, test_operations.OperatorsTestCase):
+    pass
+
+
+class ClosureCompilerTestCase(unittest.TestCase):
+    def test_function_bodies_are_compiled_once(self):
+        # (def (f x) (sum x 1))
+        # (f (f 1))
+        tree = a_r(
+            a_a(a_li(a_s('f'), a_s('x')), a_li(a_s('sum'), a_s('x'), a_v(1))),
+            a_li(a_s('f'), a_li(a_s('f'), a_v(1))))
+
+        with mock.patch.object(closure_compiler, 'compile_ast',
+                               wraps=closure_compiler.compile_ast) as compile_:
+            code = closure_compiler.compile_ast(tree)
+            compile_count = compile_.call_count
+            self.assertEqual(code(scopes2.Scope()), t_i(3))
+            self.assertEqual(code(scopes2.Scope()), t_i(3))
+
+        self.assertEqual(compile_.call_count, compile_count)
+
+    def test_calls_functions_created_by_the_tree_interpreter(self):
+        scope = scopes2.Scope()
+        interpreter2.interpret_ast(
+            a_r(a_a(a_li(a_s('f'), a_s('x')),
+                    a_li(a_o('*'), a_s('x'), a_s('x'))), ), scope)
+
+        self.assertEqual(
+            closure_compiler.interpret_ast(
+                a_r(a_li(a_s('f'), a_v(7))), scope),
+            t_i(49))
+
+    def test_skip_steps_engine_selection(self):
+        text = '(def (f n) (cond ((= n 0) 0) (#t (sum n (f (sub n 1))))))' \
+               '(f 10)'
+        self.assertEqual(
+            skip_steps.interpret_text2(text, engine='closures'), t_i(55))
+        self.assertEqual(
+            skip_steps.interpret_text2(text, engine='tree'), t_i(55))
+
+    def test_unknown_engine(self):
+        self.assertRaises(
+            ValueError, skip_steps.interpret_text2, '1', engine='jit')
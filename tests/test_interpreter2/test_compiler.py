@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Run the interpreter2 test suite against the bytecode compiler and VM"""
+from __future__ import absolute_import, unicode_literals
+import unittest
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+from whispy_lispy import (
+    ast, types, scopes2, interpreter2, compiler, skip_steps, exceptions)
+from . import (
+    test_conditions, test_functions, test_lambdas, test_operations)
+from .. import test_interpreter2
+from ..constructors import *
+
+
+class BytecodeEngineMixin(object):
+    """Make the tests calling `interpreter2.interpret_ast` use the bytecode
+    VM instead"""
+    def setUp(self):
+        super(BytecodeEngineMixin, self).setUp()
+        patcher = mock.patch.object(
+            interpreter2, 'interpret_ast', compiler.interpret_ast)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class BytecodeInterpreterTestCase(
+        BytecodeEngineMixin, test_interpreter2.InterpreterTestCase):
+    pass
+
+
+class BytecodeConditionEvaluationTestCase(
+        BytecodeEngineMixin, test_conditions.ConditionEvaluationTestCase):
+    pass
+
+
+class BytecodeFunctionCreationTestCase(
+        BytecodeEngineMixin, test_functions.FunctionCreationTestCase):
+    pass
+
+
+class BytecodeFunctionExecutionTestCase(
+        BytecodeEngineMixin, test_functions.FunctionExecutionTestCase):
+    pass
+
+
+class BytecodeLambdasTestCase(
+        BytecodeEngineMixin, test_lambdas.LambdasTestCase):
+    pass
+
+
+class BytecodeOperatorsTestCase(
+        BytecodeEngineMixin, test_operations.OperatorsTestCase):
+    pass
+
+
+PROGRAMS = [
+    '',
+    '1 2.5 "three" #f',
+    '(def x 4) (def y (sum x 1 2)) y',
+    '(def (f a b) (sub a b)) (f 10 (f 4 1))',
+    '(def (fact n) (cond ((= n 1) 1) (#t (* n (fact (sub n 1)))))) (fact 20)',
+    '(cond ((= 1 2) 1) ((= 2 3) 2))',
+    '(cond (#f 1) (#t 2) (#t 3))',
+    '((lambda (x y) (+ x y)) 3 4)',
+    '(def (adder n) (lambda (x) (sum x n))) (def add3 (adder 3)) (add3 4)',
+    '(def (h) (lambda (x) 5)) ((h) 1)',
+    '(def (f a) (lambda (b) (lambda (c) (sum a b c)))) (((f 1) 2) 3)',
+    '(def (ack m n) (cond ((= m 0) (sum n 1)) ((= n 0) (ack (sub m 1) 1))'
+    ' (#t (ack (sub m 1) (ack m (sub n 1)))))) (ack 2 2)',
+    '(+ #t #f) (* 2 3.5) (= 1 1 1) (or #f #t)',
+]
+
+
+class BytecodeCompilerTestCase(unittest.TestCase):
+    def test_results_match_the_tree_interpreter(self):
+        for text in PROGRAMS:
+            tree = skip_steps.parse_text2(text)
+            self.assertEqual(
+                compiler.interpret_ast(tree, scopes2.Scope()),
+                interpreter2.interpret_ast(tree, scopes2.Scope()),
+                text)
+
+    def test_constants_and_symbols_are_pooled(self):
+        code = compiler.compile_ast(
+            skip_steps.parse_text2('(sum x 1 x 1 y)'))
+
+        self.assertEqual(
+            code.symbols,
+            [types.Symbol(('sum',)), types.Symbol(('x',)),
+             types.Symbol(('y',))])
+        self.assertEqual(code.constants, [t_i(1)])
+
+    def test_condition_compiles_to_jumps(self):
+        code = compiler.compile_ast(
+            skip_steps.parse_text2('(cond (a 1) (#t 2))'))
+        c = code.add_constant
+        s = code.add_symbol
+
+        self.assertEqual(code.instructions, [
+            compiler.LOAD_NAME, s(types.Symbol(('a',))),
+            compiler.POP_JUMP_IF_NOT_TRUE, 8,
+            compiler.LOAD_CONST, c(t_i(1)),
+            compiler.JUMP_ABSOLUTE, 18,
+            compiler.LOAD_CONST, c(t_b(True)),
+            compiler.POP_JUMP_IF_NOT_TRUE, 16,
+            compiler.LOAD_CONST, c(t_i(2)),
+            compiler.JUMP_ABSOLUTE, 18,
+            compiler.LOAD_CONST, c(None),
+            compiler.RETURN_VALUE, 0])
+
+    def test_function_calls_dont_recurse_in_python(self):
+        # Deeper than the recursion limit of python
+        text = ('(def (count n) (cond ((= n 0) 0) '
+                '(#t (sum 1 (count (sub n 1)))))) (count 5000)')
+        self.assertEqual(
+            compiler.interpret_ast(skip_steps.parse_text2(text)), t_i(5000))
+
+    def test_call_depth_is_limited(self):
+        text = '(def (f x) (f x)) (f 1)'
+        with mock.patch.object(compiler, 'MAX_CALL_DEPTH', 100):
+            self.assertRaises(
+                exceptions.RecursionDepthExceeded,
+                compiler.interpret_ast, skip_steps.parse_text2(text))
+
+    def test_malformed_nodes_fail_only_when_evaluated(self):
+        # Functions that are never called
+        for text in ['(def (f) (cond (#f))) 7', '(def (f) (5 1)) 7']:
+            tree = skip_steps.parse_text2(text)
+            self.assertEqual(
+                interpreter2.interpret_ast(tree, scopes2.Scope()), t_i(7))
+            self.assertEqual(
+                compiler.interpret_ast(tree, scopes2.Scope()), t_i(7))
+
+        for text in ['(def (f) (cond (#t))) (f)', '(cond (#f 1) (#t))']:
+            tree = skip_steps.parse_text2(text)
+            self.assertRaises(
+                IndexError, interpreter2.interpret_ast, tree)
+            self.assertRaises(IndexError, compiler.interpret_ast, tree)
+
+        tree = skip_steps.parse_text2('(print 1) (5 (print 2))')
+        with mock.patch('sys.stdout') as stdout_mock:
+            for engine in (interpreter2, compiler):
+                self.assertRaises(Exception, engine.interpret_ast, tree)
+        # The error is raised before the arguments are evaluated
+        self.assertEqual(
+            [c for c in stdout_mock.mock_calls if c != mock.call.write('\n')],
+            [mock.call.write(str(t_i(1)))] * 2)
+
+    def test_runs_functions_created_by_the_tree_interpreter(self):
+        scope = scopes2.Scope()
+        interpreter2.interpret_ast(
+            skip_steps.parse_text2('(def (f x) (* x x))'), scope)
+
+        self.assertEqual(
+            compiler.interpret_ast(skip_steps.parse_text2('(f 7)'), scope),
+            t_i(49))
+
+    def test_disassemble(self):
+        code = compiler.compile_ast(
+            skip_steps.parse_text2('(def (f x) (sum x 1)) (f 2)'))
+
+        listing = compiler.disassemble(code)
+
+        self.assertIn('MAKE_FUNCTION', listing)
+        self.assertIn('STORE_NAME            0 (f)', listing)
+        self.assertIn('CALL_FUNCTION         1', listing)
+        self.assertIn('Disassembly of <Code f at', listing)
+        self.assertIn('LOAD_NAME             1 (x)', listing)
+
+    def test_skip_steps_engine_selection(self):
+        self.assertEqual(
+            skip_steps.interpret_text2('(sum 1 2)', engine='bytecode'),
+            t_i(3))
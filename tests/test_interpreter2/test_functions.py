@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 import unittest
-from whispy_lispy import ast, types, scopes2, interpreter2
+from whispy_lispy import ast, types, scopes2, interpreter2, exceptions
 from ..constructors import *
 
 
@@ -187,16 +187,20 @@ class FunctionExecutionTestCase(unittest.TestCase):
             )
 
     def _test_unconditional_recursion_helper_because_pytest_sux(self):
-        # Not stackless yet, so raise error for infinite recursion
-        # (def (f x) (f x))
+        # The recursive call is not in tail position, so the stack grows
+        # until it overflows (tail calls would loop forever instead)
+        # (def (f x) (sum 1 (f x)))
         tree = ast.RootAbstractSyntaxNode((
             ast.Assign((
                 ast.Apply((
                     ast.Symbol(('f',)),
                     ast.Symbol(('x',)),)),
                 ast.Apply((
-                    ast.Symbol(('f',)),
-                    ast.Symbol(('x',)),)))),
+                    ast.Symbol(('sum',)),
+                    ast.Value((types.Int((1,)),)),
+                    ast.Apply((
+                        ast.Symbol(('f',)),
+                        ast.Symbol(('x',)),)))))),
             ast.Apply((
                 ast.Symbol(('f',)),
                 ast.Value((types.Int((3,)),)))),))
@@ -282,3 +286,16 @@ class FunctionExecutionTestCase(unittest.TestCase):
                 a_v(5)))
 
         self.assertEqual(interpreter2.interpret_ast(tree), t_i(120))
+
+    def test_calls_with_the_wrong_number_of_arguments_fail(self):
+        # (def (f a b) a) (f 1)
+        # (def (f a) a) (f 1 2)
+        for params, args in ((('a', 'b'), (1,)), (('a',), (1, 2))):
+            tree = a_r(
+                a_a(
+                    a_li(a_s('f'), *[a_s(param) for param in params]),
+                    a_s('a')),
+                a_li(a_s('f'), *[a_v(arg) for arg in args]))
+
+            self.assertRaises(
+                exceptions.ArityError, interpreter2.interpret_ast, tree)
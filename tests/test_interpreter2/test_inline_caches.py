@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from whispy_lispy import skip_steps, scopes2, types, interpreter2
+
+ENGINES = ('tree', 'stackless')
+
+
+class CallSiteCacheTestCase(unittest.TestCase):
+    def interpret(self, text, scope, engine):
+        return skip_steps.interpret_text2(text, scope, engine=engine)
+
+    def test_redefined_function_gets_called(self):
+        for engine in ENGINES:
+            scope = scopes2.Scope()
+            self.interpret('(def (f) 1) (def (g) (f))', scope, engine)
+            self.assertEqual(
+                self.interpret('(g)', scope, engine), types.Int((1,)))
+
+            self.interpret('(def (f) 2)', scope, engine)
+            self.assertEqual(
+                self.interpret('(g)', scope, engine), types.Int((2,)),
+                engine)
+
+    def test_same_call_site_in_different_global_scopes(self):
+        tree = skip_steps.parse_text2('(g)')
+        scope1, scope2 = scopes2.Scope(), scopes2.Scope()
+        skip_steps.interpret_text2('(def (f) 1) (def (g) (f))', scope1)
+        skip_steps.interpret_text2('(def (f) 2) (def (g) (f))', scope2)
+
+        self.assertEqual(interpreter2.interpret_ast(tree, scope1),
+                         types.Int((1,)))
+        self.assertEqual(interpreter2.interpret_ast(tree, scope2),
+                         types.Int((2,)))
+        self.assertEqual(interpreter2.interpret_ast(tree, scope1),
+                         types.Int((1,)))
+
+    def test_functions_missing_from_the_global_scope_come_from_callers(self):
+        for engine in ENGINES:
+            scope = scopes2.Scope()
+            self.interpret(
+                '(def (g) (h 0)) (def (f h) (g))', scope, engine)
+            self.assertEqual(
+                self.interpret('(f (lambda (x) 7))', scope, engine),
+                types.Int((7,)))
+
+            # The global definition wins, once there is one
+            self.interpret('(def (h x) 1)', scope, engine)
+            self.assertEqual(
+                self.interpret('(f (lambda (x) 7))', scope, engine),
+                types.Int((1,)), engine)
+
+    def test_hit_rate_counters(self):
+        interpreter2.call_site_stats.reset()
+        skip_steps.interpret_text2(
+            '(def (inc x) (+ x 1))'
+            '(def (loop n acc)'
+            ' (cond ((= n 0) acc) (#t (loop (sub n 1) (inc acc)))))'
+            '(loop 100 0)')
+
+        stats = interpreter2.call_site_stats
+        # The top level `loop`, then `loop`, `sub` and `inc` in the body miss
+        # once. The 100 iterations look up the 3 of them.
+        self.assertEqual(stats.misses, 4)
+        self.assertEqual(stats.hits, 1 + 3 * 100 - 4)
+        self.assertGreater(stats.hit_rate, 0.98)
+
+        stats.reset()
+        self.assertEqual((stats.hits, stats.misses), (0, 0))
+        self.assertEqual(stats.hit_rate, 0.0)
+
+
+class GlobalVariableCacheTestCase(unittest.TestCase):
+    def interpret(self, text, scope, engine):
+        return skip_steps.interpret_text2(text, scope, engine=engine)
+
+    def test_changed_global_gets_read(self):
+        for engine in ENGINES:
+            scope = scopes2.Scope()
+            self.interpret('(def c 1) (def (f) c)', scope, engine)
+            self.assertEqual(
+                self.interpret('(f)', scope, engine), types.Int((1,)))
+
+            self.interpret('(def c 2)', scope, engine)
+            self.assertEqual(
+                self.interpret('(f)', scope, engine), types.Int((2,)),
+                engine)
+
+    def test_global_read_from_nested_closures(self):
+        for engine in ENGINES:
+            scope = scopes2.Scope()
+            self.interpret(
+                '(def c 10) (def (mk a) (lambda (b) (+ c (+ a b))))'
+                '(def f (mk 1))', scope, engine)
+            self.assertEqual(
+                self.interpret('(f 2)', scope, engine), types.Int((13,)))
+
+            self.interpret('(def c 20)', scope, engine)
+            self.assertEqual(
+                self.interpret('(f 2)', scope, engine), types.Int((23,)),
+                engine)
+
+    def test_variables_missing_from_the_global_scope_come_from_callers(self):
+        for engine in ENGINES:
+            scope = scopes2.Scope()
+            self.interpret('(def (g) c) (def (f c) (g))', scope, engine)
+            self.assertEqual(
+                self.interpret('(f 5)', scope, engine), types.Int((5,)))
+
+            self.interpret('(def c 1)', scope, engine)
+            self.assertEqual(
+                self.interpret('(f 5)', scope, engine), types.Int((1,)),
+                engine)
+
+    def test_hit_rate_counters(self):
+        interpreter2.variable_stats.reset()
+        skip_steps.interpret_text2(
+            '(def limit 100)'
+            '(def (loop n) (cond ((= n limit) n) (#t (loop (+ n 1)))))'
+            '(loop 0)')
+
+        stats = interpreter2.variable_stats
+        # `limit` misses once, then gets read from the cache
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.hits, 100)
@@ -2,7 +2,7 @@
 from __future__ import absolute_import, unicode_literals
 import unittest
 from tests.constructors import a_r, a_la, a_li, a_v, a_s, t_s, a_a
-from whispy_lispy import interpreter2, types, scopes2
+from whispy_lispy import interpreter2, types, scopes2, exceptions
 
 
 class LambdasTestCase(unittest.TestCase):
@@ -48,17 +48,30 @@ class LambdasTestCase(unittest.TestCase):
         self.assertEqual(actual_function.code, a_v(1))
 
     def test_simple_lambda_with_parameters_execution(self):
-        # ((lambda (a b c) 1))
+        # ((lambda (a b c) 1) 4 5 6)
         tree = a_r(
             a_li(
                 a_la(
                     a_li(
                         a_s('a'), a_s('b'), a_s('c')),
-                    a_v(1))))
+                    a_v(1)),
+                a_v(4), a_v(5), a_v(6)))
         result = interpreter2.interpret_ast(tree)
 
         self.assertEqual(result, types.Int((1,)))
 
+    def test_lambda_called_with_too_few_arguments(self):
+        # ((lambda (a b c) 1))
+        tree = a_r(
+            a_li(
+                a_la(
+                    a_li(
+                        a_s('a'), a_s('b'), a_s('c')),
+                    a_v(1))))
+
+        self.assertRaises(
+            exceptions.ArityError, interpreter2.interpret_ast, tree)
+
     def test_nested_lambdas(self):
         # (
         #   (lambda (a b) (sum a b))
@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 import unittest
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
 from tests.constructors import *
-from whispy_lispy import interpreter2, exceptions
+from whispy_lispy import (
+    interpreter2, exceptions, operations, scopes2, keywords)
 
 
 class OperatorsTestCase(unittest.TestCase):
@@ -89,3 +97,115 @@ class OperatorsTestCase(unittest.TestCase):
                 a_o('+'),
                 a_v("a"), a_v("b")))
         self.assertEqual(interpreter2.interpret_ast(tree), t_str("ab"))
+
+    def test_arithmetic_operators(self):
+        cases = [
+            (('-', 10, 3, 2), t_i(5)),
+            (('-', 5), t_i(-5)),
+            (('/', 7, 2), t_f(3.5)),
+            (('/', 4), t_f(0.25)),
+            (('//', 7, 2), t_i(3)),
+            (('%', 7, 4), t_i(3)),
+            (('**', 2, 3, 2), t_i(64)),
+            (('-', 1.5, 1), t_f(0.5)),
+        ]
+        for case, expected in cases:
+            tree = a_r(a_li(a_o(case[0]), *[a_v(val) for val in case[1:]]))
+            self.assertEqual(
+                interpreter2.interpret_ast(tree), expected, case)
+
+    def test_bitwise_and_logical_operators(self):
+        cases = [
+            (('<<', 1, 4), t_i(16)),
+            (('>>', 16, 2), t_i(4)),
+            (('&', 6, 3), t_i(2)),
+            (('|', 6, 3), t_i(7)),
+            (('^', 6, 3), t_i(5)),
+            (('~', 5), t_i(-6)),
+            (('and', True, True, False), t_b(False)),
+            (('or', False, True), t_b(True)),
+            (('xor', True, True, True), t_b(True)),
+            (('not', False), t_b(True)),
+        ]
+        for case, expected in cases:
+            tree = a_r(a_li(a_o(case[0]), *[a_v(val) for val in case[1:]]))
+            self.assertEqual(
+                interpreter2.interpret_ast(tree), expected, case)
+
+    def test_chained_comparisons(self):
+        cases = [
+            (('<', 1, 2, 3), True),
+            (('<', 1, 3, 2), False),
+            (('<', 1), False),
+            (('<=', 1, 1, 2.5), True),
+            (('>', 3, 2, 2), False),
+            (('>=', 3, 3, 1), True),
+            (('=', 2, 2, 2), True),
+            (('==', 2, 2.0), True),
+            (('=', 1, True), False),
+            (('!=', 1, 2, 1), True),
+            (('eqv', 1, 1.0), False),
+            (('eqv', 'a', 'a'), True),
+            (('<', 'a', 'b'), True),
+        ]
+        for case, expected in cases:
+            tree = a_r(a_li(a_o(case[0]), *[a_v(val) for val in case[1:]]))
+            self.assertEqual(
+                interpreter2.interpret_ast(tree), t_b(expected), case)
+
+    def test_operators_check_the_types(self):
+        cases = [
+            ('-', 'a', 'b'),
+            ('<', 1, 'a'),
+            ('and', 1, 2),
+            ('<<', 1.0, 2),
+            ('&', 1, True),
+            ('not', 1),
+            ('~', 1, 2),
+            ('/', 1, 0),
+        ]
+        for case in cases:
+            tree = a_r(a_li(a_o(case[0]), *[a_v(val) for val in case[1:]]))
+            self.assertRaises(
+                exceptions.EvaluationError,
+                interpreter2.interpret_ast, tree)
+
+
+class BuiltinCallingConventionTestCase(unittest.TestCase):
+    def test_builtins_dont_evaluate_the_values_again(self):
+        interpreter = mock.Mock(side_effect=AssertionError)
+        scope = scopes2.Scope()
+        values = t_i(3), t_i(2), t_f(1.5)
+
+        self.assertEqual(
+            operations.OPERATIONS['+'](interpreter, scope, *values), t_f(6.5))
+        self.assertEqual(
+            operations.OPERATIONS['*'](interpreter, scope, *values), t_f(9.0))
+        self.assertEqual(
+            operations.OPERATIONS['='](interpreter, scope, *values),
+            t_b(False))
+        self.assertEqual(
+            operations.internal_sum(interpreter, scope, *values), t_f(6.5))
+        self.assertEqual(
+            operations.internal_sub(interpreter, scope, *values), t_f(-0.5))
+        self.assertFalse(interpreter.called)
+
+    def test_fallbacks_get_the_same_values(self):
+        interpreter = mock.Mock(side_effect=AssertionError)
+        self.assertEqual(
+            operations.OPERATIONS['+'](
+                interpreter, scopes2.Scope(), t_b(False), t_b(True)),
+            t_b(True))
+
+    def test_every_operator_is_implemented(self):
+        for operator in keywords.OPERATORS:
+            self.assertTrue(callable(operations.OPERATIONS[operator]))
+
+    def test_comparisons_stop_at_the_first_false_pair(self):
+        compare = mock.Mock(side_effect=[True, False])
+        comparison = operations.Comparison(compare)
+
+        self.assertEqual(
+            comparison(None, scopes2.Scope(), t_i(1), t_i(2), t_i(0), t_i(3)),
+            t_b(False))
+        self.assertEqual(compare.call_count, 2)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Run the interpreter2 test suite against the python code backend"""
+from __future__ import absolute_import, unicode_literals
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+import unittest
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+from whispy_lispy import (
+    ast, types, scopes2, interpreter2, pycompiler, skip_steps, exceptions)
+from . import (
+    test_conditions, test_functions, test_lambdas, test_operations,
+    test_compiler)
+from .. import test_interpreter2
+from ..constructors import *
+
+
+class PythonEngineMixin(object):
+    """Make the tests calling `interpreter2.interpret_ast` compile the trees
+    to python code instead"""
+    def setUp(self):
+        super(PythonEngineMixin, self).setUp()
+        patcher = mock.patch.object(
+            interpreter2, 'interpret_ast', pycompiler.interpret_ast)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class PythonInterpreterTestCase(
+        PythonEngineMixin, test_interpreter2.InterpreterTestCase):
+    pass
+
+
+class PythonConditionEvaluationTestCase(
+        PythonEngineMixin, test_conditions.ConditionEvaluationTestCase):
+    pass
+
+
+class PythonFunctionCreationTestCase(
+        PythonEngineMixin, test_functions.FunctionCreationTestCase):
+    pass
+
+
+class PythonFunctionExecutionTestCase(
+        PythonEngineMixin, test_functions.FunctionExecutionTestCase):
+    pass
+
+
+class PythonLambdasTestCase(PythonEngineMixin, test_lambdas.LambdasTestCase):
+    pass
+
+
+class PythonOperatorsTestCase(
+        PythonEngineMixin, test_operations.OperatorsTestCase):
+    pass
+
+
+class PythonCompilerTestCase(unittest.TestCase):
+    def test_results_match_the_tree_interpreter(self):
+        for text in test_compiler.PROGRAMS:
+            tree = skip_steps.parse_text2(text)
+            self.assertEqual(
+                pycompiler.interpret_ast(tree, scopes2.Scope(), text),
+                interpreter2.interpret_ast(tree, scopes2.Scope()),
+                text)
+
+    def test_whispy_functions_become_python_functions(self):
+        scope = scopes2.Scope()
+        pycompiler.interpret_ast(
+            skip_steps.parse_text2('(def (square x) (* x x))'), scope)
+
+        function = scope[types.Symbol(('square',))]
+        self.assertEqual(function.python_function.__name__, '_square_0')
+        self.assertEqual(
+            function.python_function(scopes2.FunctionScope(
+                param_names=function.params, arguments=(t_i(3),))),
+            t_i(9))
+
+    def test_runs_functions_created_by_the_tree_interpreter(self):
+        scope = scopes2.Scope()
+        interpreter2.interpret_ast(
+            skip_steps.parse_text2('(def (f x) (* x x))'), scope)
+
+        self.assertEqual(
+            pycompiler.interpret_ast(skip_steps.parse_text2('(f 7)'), scope),
+            t_i(49))
+
+    def test_errors_point_at_the_whispy_line(self):
+        text = '(def (f a)\n  (sum a\n     y))\n\n(f 4)'
+        try:
+            skip_steps.interpret_text2(text, engine='python')
+        except exceptions.UnboundSymbol as err:
+            self.assertEqual(err.lineno, 3)
+            self.assertIn('(file "<whispy>", line 3)', str(err))
+            whispy_frames = [
+                (frame[0], frame[1]) for frame in
+                traceback.extract_tb(sys.exc_info()[2])
+                if frame[0] == '<whispy>']
+            self.assertEqual(whispy_frames, [('<whispy>', 5), ('<whispy>', 3)])
+        else:
+            self.fail('UnboundSymbol not raised')
+
+    def test_errors_in_script_files_point_at_the_script_line(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'script.wl')
+        with open(path, 'wb') as script:
+            script.write('(def s "ă")\n(def x 1)\n(sum x z)'.encode(
+                'utf-8'))
+
+        try:
+            skip_steps.interpret_file2(path, engine='python')
+        except exceptions.UnboundSymbol as err:
+            self.assertEqual((err.filename, err.lineno), (path, 3))
+        else:
+            self.fail('UnboundSymbol not raised')
+
+    def test_malformed_nodes_fail_only_when_evaluated(self):
+        for text in ['(def (f) (cond (#f))) 7', '(def (f) (5 1)) 7',
+                     '(def (f) (def)) 7']:
+            self.assertEqual(
+                pycompiler.interpret_ast(skip_steps.parse_text2(text)),
+                t_i(7))
+
+        for text, error in [('(def (f) (cond (#t))) (f)', IndexError),
+                            ('(cond (#f 1) (#t))', IndexError),
+                            ('(def x 1) (def)', IndexError),
+                            ('(5 1)', Exception)]:
+            tree = skip_steps.parse_text2(text)
+            self.assertRaises(error, interpreter2.interpret_ast, tree)
+            self.assertRaises(error, pycompiler.interpret_ast, tree)
+
+    def test_python_module(self):
+        text = '(def x 1)\n(print x)'
+        module = pycompiler.get_python_module(
+            skip_steps.parse_text2(text), text)
+        self.assertEqual(
+            [function.name for function in module.body], ['_whispy_module'])
+        self.assertEqual(
+            [statement.lineno for statement in module.body[0].body], [1, 2])
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Run the interpreter2 test suite against the explicit stack engine"""
+from __future__ import absolute_import, unicode_literals
+import sys
+import unittest
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+from whispy_lispy import (
+    interpreter2, stackless, skip_steps, exceptions)
+from . import (
+    test_conditions, test_functions, test_lambdas, test_operations)
+from .. import test_interpreter2
+from ..constructors import *
+
+# (f n) is n, computed without tail calls
+NON_TAIL_RECURSION = (
+    '(def (f n) (cond ((= n 0) 0) (#t (sum 1 (f (sub n 1))))))'
+    '(f {})')
+
+
+class StacklessEngineMixin(object):
+    """Make the tests calling `interpreter2.interpret_ast` use the explicit
+    stack engine instead"""
+    def setUp(self):
+        super(StacklessEngineMixin, self).setUp()
+        patcher = mock.patch.object(
+            interpreter2, 'interpret_ast', stackless.interpret_ast)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class StacklessInterpreterTestCase(
+        StacklessEngineMixin,
+        test_interpreter2.InterpreterTestCase):
+    pass
+
+
+class StacklessConditionEvaluationTestCase(
+        StacklessEngineMixin,
+        test_conditions.ConditionEvaluationTestCase):
+    pass
+
+
+class StacklessFunctionCreationTestCase(
+        StacklessEngineMixin,
+        test_functions.FunctionCreationTestCase):
+    pass
+
+
+class StacklessFunctionExecutionTestCase(
+        StacklessEngineMixin,
+        test_functions.FunctionExecutionTestCase):
+    pass
+
+
+class StacklessLambdasTestCase(
+        StacklessEngineMixin, test_lambdas.LambdasTestCase):
+    pass
+
+
+class StacklessOperatorsTestCase(
+        StacklessEngineMixin, test_operations.OperatorsTestCase):
+    pass
+
+
+class StacklessTestCase(unittest.TestCase):
+    def test_deep_recursion_doesnt_use_the_python_stack(self):
+        depth = sys.getrecursionlimit() * 20
+        self.assertEqual(
+            skip_steps.interpret_text2(
+                NON_TAIL_RECURSION.format(depth), engine='stackless'),
+            t_i(depth))
+
+    def test_deeply_nested_expressions(self):
+        depth = sys.getrecursionlimit() * 2
+        node = a_v(0)
+        for _ in range(depth):
+            node = a_li(a_s('sum'), a_v(1), node)
+
+        self.assertEqual(stackless.interpret_ast(a_r(node)), t_i(depth))
+
+    def test_tail_calls_run_in_constant_space(self):
+        text = ('(def (loop n) (cond ((= n 0) 0) (#t (loop (sub n 1)))))'
+                '(loop 1000)')
+        self.assertEqual(
+            stackless.interpret_ast(
+                skip_steps.get_ast_from_text2(text), max_depth=5),
+            t_i(0))
+
+    def test_configurable_max_depth(self):
+        tree = skip_steps.get_ast_from_text2(NON_TAIL_RECURSION.format(100))
+
+        self.assertEqual(
+            stackless.interpret_ast(tree, max_depth=1000), t_i(100))
+        with self.assertRaises(exceptions.RecursionDepthExceeded) as ctx:
+            stackless.interpret_ast(tree, max_depth=50)
+        self.assertIsInstance(
+            ctx.exception, exceptions.BaseWhispyLispyError)
+
+    def test_callee_sees_the_parameters_of_the_caller(self):
+        self.assertEqual(
+            skip_steps.interpret_text2(
+                '(def (g) y) (def (f y) (g)) (f 5)', engine='stackless'),
+            t_i(5))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from whispy_lispy import skip_steps, scopes2, types
+
+
+def scope_depth(interpreter, scope):
+    """Builtin returning the length of the parent chain of the caller"""
+    depth = 0
+    while isinstance(scope, scopes2.Scope):
+        depth += 1
+        scope = scope.parent
+    return types.Int((depth,))
+
+
+class TailCallTestCase(unittest.TestCase):
+    def test_tail_recursive_loop_runs_in_constant_stack(self):
+        result = skip_steps.interpret_text2(
+            '(def (loop n) (cond ((= n 0) 0) (#t (loop (sub n 1)))))'
+            '(loop 1000000)')
+        self.assertEqual(result, types.Int((0,)))
+
+    def test_mutual_recursion_runs_in_constant_stack(self):
+        result = skip_steps.interpret_text2(
+            '(def (ev n) (cond ((= n 0) #t) (#t (od (sub n 1)))))'
+            '(def (od n) (cond ((= n 0) #f) (#t (ev (sub n 1)))))'
+            '(ev 1000001)')
+        self.assertEqual(result, types.Bool((False,)))
+
+    def test_tail_calls_reuse_the_place_of_the_caller_in_the_scope_chain(self):
+        scope = scopes2.Scope()
+        scope[types.Symbol(('depth',))] = scope_depth
+        result = skip_steps.interpret_text2(
+            '(def (loop n) (cond ((= n 0) (depth)) (#t (loop (sub n 1)))))'
+            '(loop 100)', scope)
+        self.assertEqual(result, types.Int((2,)))
+
+    def test_callee_sees_the_parameters_of_the_caller(self):
+        # Scoping is dynamic: the caller isn't dropped from the scope chain
+        result = skip_steps.interpret_text2(
+            '(def (g) y) (def (f y) (g)) (f 5)')
+        self.assertEqual(result, types.Int((5,)))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import unittest
+
+from whispy_lispy import lexer, cst, exceptions
+
+SOURCE = '''(def (f a b)
+   (cond ((= a 12.5) "a \\" b")
+         (#t (sum a b 1234))))
+'x (f 12 2.25) #f'''
+
+
+class CompactTokenStreamTestCase(unittest.TestCase):
+    def test_same_tokens_as_the_token_list(self):
+        stream = lexer.get_compact_token_stream(SOURCE)
+        tokens = lexer.get_flat_token_list(SOURCE)
+
+        self.assertEqual(len(stream), len(tokens))
+        self.assertEqual(list(stream), tokens)
+        self.assertEqual([token.index for token in stream],
+                         [token.index for token in tokens])
+        self.assertEqual([type(token) for token in stream],
+                         [type(token) for token in tokens])
+
+    def test_values_are_decoded_lazily(self):
+        stream = lexer.get_compact_token_stream('(a 12.5 "x" #t)')
+        self.assertEqual(stream.text(2), '12.5')
+        self.assertEqual(stream.value(2), 12.5)
+        self.assertEqual(stream.value(3), '"x"')
+        self.assertIs(stream.value(4), True)
+        self.assertEqual(stream[1], cst.Token('a'))
+
+    def test_concrete_syntax_tree_from_the_stream(self):
+        self.assertEqual(
+            lexer.get_concrete_syntax_tree(
+                lexer.get_compact_token_stream(SOURCE)),
+            lexer.get_concrete_syntax_tree(
+                lexer.get_flat_token_list(SOURCE)))
+
+    def test_empty_stream(self):
+        stream = lexer.get_compact_token_stream('  ')
+        self.assertEqual(len(stream), 0)
+        self.assertEqual(lexer.get_concrete_syntax_tree(stream),
+                         cst.RootConcreteSyntaxnode(()))
+
+    def test_parentheses_mismatch(self):
+        for text in ('(a))', '((a)'):
+            self.assertRaises(
+                exceptions.WhispyLispySyntaxError,
+                lexer.get_concrete_syntax_tree,
+                lexer.get_compact_token_stream(text))
+
+    def test_closing_parenthesis_error_has_the_offset(self):
+        try:
+            lexer.get_concrete_syntax_tree(
+                lexer.get_compact_token_stream('(a)\n b)'))
+        except exceptions.WhispyLispySyntaxError as err:
+            self.assertEqual(err.index, 6)
+        else:
+            self.fail('Syntax error not raised')
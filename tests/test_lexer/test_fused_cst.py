@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import unittest
+
+from whispy_lispy import lexer, cst, exceptions
+
+SOURCES = [
+    '',
+    '  \n ',
+    'a',
+    '(a)',
+    '()',
+    '(((1)))',
+    '''(def (f a b)
+   (cond ((= a 12.5) "a \\" b")
+         (#t (sum a b 1234))))
+'x (f 12 2.25) #f''',
+    "(def x '(a 1 2)) (x) 4 (lambda (y) (+ y 1))",
+]
+
+
+class FusedConcreteSyntaxTreeTestCase(unittest.TestCase):
+    def test_same_tree_as_the_token_pipeline(self):
+        for text in SOURCES:
+            self.assertEqual(
+                lexer.get_concrete_syntax_tree_from_text(text),
+                lexer.get_concrete_syntax_tree(
+                    lexer.get_flat_token_list(text)),
+                text)
+
+    def test_produces_root_node(self):
+        self.assertIsInstance(
+            lexer.get_concrete_syntax_tree_from_text('1 2'),
+            cst.RootConcreteSyntaxnode)
+
+    def assertSyntaxErrorAt(self, text, index):
+        try:
+            lexer.get_concrete_syntax_tree_from_text(text)
+        except exceptions.WhispyLispySyntaxError as err:
+            self.assertEqual(err.index, index)
+        else:
+            self.fail('Syntax error not raised for {}'.format(text))
+
+    def test_too_many_closing_parentheses(self):
+        self.assertSyntaxErrorAt('(a b))', 5)
+        self.assertSyntaxErrorAt(')', 0)
+
+    def test_too_many_opening_parentheses_points_at_the_unclosed_one(self):
+        self.assertSyntaxErrorAt('(a (b c)', 0)
+        self.assertSyntaxErrorAt('(a)\n(b (c)) (d', 12)
+
+    def test_unknown_characters(self):
+        self.assertSyntaxErrorAt('(a $)', 3)
@@ -23,3 +23,59 @@ class NonLispySyntaxTestCase(unittest.TestCase):
         expected_tokens = lexer.get_flat_token_list('(sum 1 2 (sum 3 4))')
 
         self.assertEqual(actual_tokens, expected_tokens)
+
+    def test_repeated_equal_tokens_are_kept(self):
+        # f(1 1 a a) -> (f 1 1 a a)
+        self.assertEqual(
+            lexer.make_parentheses_lispy(
+                lexer.get_flat_token_list('f(1 1 a a) g(1 1)')),
+            lexer.get_flat_token_list('(f 1 1 a a) (g 1 1)'))
+
+    def test_parentheses_without_function_are_kept(self):
+        self.assertEqual(
+            lexer.make_parentheses_lispy(
+                lexer.get_flat_token_list('((1) (2)) f() 3')),
+            lexer.get_flat_token_list('((1) (2)) (f) 3'))
+
+    def test_empty_token_list(self):
+        self.assertEqual(lexer.make_parentheses_lispy([]), [])
+
+    def test_conversion_is_lazy(self):
+        tokens = lexer.iter_parentheses_lispy(lexer.iter_tokens('f(1) $'))
+        self.assertEqual(
+            [next(tokens) for _ in range(4)],
+            lexer.get_flat_token_list('(f 1)'))
+
+
+class NonLispySyntaxScalingTestCase(unittest.TestCase):
+    # sum(1 a) - 5 tokens
+    TOKENS = lexer.get_flat_token_list('sum(1 a)')
+    EXPECTED = lexer.get_flat_token_list('(sum 1 a)')
+
+    def test_looks_ahead_one_token_at_most(self):
+        # Every token is handled as soon as the next one is pulled, so the
+        # conversion is linear (see benchmarks/bench_non_lispy_syntax.py)
+        pulled = []
+
+        def source():
+            for token in self.TOKENS * 2000:
+                pulled.append(token)
+                yield token
+
+        yielded = 0
+        for _ in lexer.iter_parentheses_lispy(source()):
+            yielded += 1
+            self.assertLessEqual(len(pulled) - yielded, 1)
+        self.assertEqual(yielded, 10000)
+
+    def test_every_token_is_pulled_once(self):
+        pulled = []
+
+        def source():
+            for token in self.TOKENS * 2000:
+                pulled.append(token)
+                yield token
+
+        result = list(lexer.iter_parentheses_lispy(source()))
+        self.assertEqual(len(pulled), 10000)
+        self.assertEqual(result, self.EXPECTED * 2000)
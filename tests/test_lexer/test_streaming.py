@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+from whispy_lispy import lexer, exceptions
+
+SOURCE = '''(def (f a b)
+   (cond ((= a 12.5) "a \\" b")
+         (#t (sum a b 1234))))
+'x  (f   12 2.25)   '''
+
+
+def values_and_indexes(tokens):
+    return [(type(token), token.value, token.index) for token in tokens]
+
+
+class CountingReader(object):
+    """A file-like object that records how much was read from it"""
+    def __init__(self, text):
+        self.stream = io.StringIO(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return self.stream.read(size)
+
+
+class StreamTokensTestCase(unittest.TestCase):
+    def test_text_stream_gives_the_same_tokens_for_any_chunk_size(self):
+        expected = values_and_indexes(lexer.get_flat_token_list(SOURCE))
+        for chunk_size in (1, 2, 3, 7, 64, 4096):
+            actual = values_and_indexes(lexer.stream_tokens(
+                io.StringIO(SOURCE), chunk_size=chunk_size))
+            self.assertEqual(actual, expected, chunk_size)
+
+    def test_binary_stream_gives_the_same_tokens(self):
+        expected = values_and_indexes(lexer.get_flat_token_list(SOURCE))
+        for chunk_size in (1, 5, 4096):
+            actual = values_and_indexes(lexer.stream_tokens(
+                io.BytesIO(SOURCE.encode('utf-8')), chunk_size=chunk_size))
+            self.assertEqual(actual, expected, chunk_size)
+
+    def test_binary_stream_skips_unicode_whitespace(self):
+        text = '(sum\u00a01\u2003 2)\u3000\u00a0x'
+        expected = [
+            token.value for token in lexer.get_flat_token_list(text)]
+        for chunk_size in (1, 2, 4096):
+            actual = [token.value for token in lexer.stream_tokens(
+                io.BytesIO(text.encode('utf-8')), chunk_size=chunk_size)]
+            self.assertEqual(actual, expected, chunk_size)
+        self.assertEqual(len(expected), 6)
+
+    def test_memory_mapped_file(self):
+        handle, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'wb') as source_file:
+            source_file.write(SOURCE.encode('utf-8'))
+
+        with io.open(path, 'rb') as source_file:
+            source = mmap.mmap(
+                source_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                actual = values_and_indexes(lexer.stream_tokens(source))
+            finally:
+                source.close()
+
+        self.assertEqual(
+            actual, values_and_indexes(lexer.get_flat_token_list(SOURCE)))
+
+    def test_tokens_are_read_lazily(self):
+        reader = CountingReader('a ' * 1000)
+        tokens = lexer.stream_tokens(reader, chunk_size=10)
+        next(tokens)
+        self.assertEqual(reader.reads, 1)
+        self.assertEqual(len(list(tokens)), 999)
+        self.assertTrue(reader.reads > 100)
+
+    def test_syntax_error_has_the_absolute_offset(self):
+        tokens = lexer.stream_tokens(io.StringIO('a ' * 50 + '$'),
+                                     chunk_size=8)
+        try:
+            list(tokens)
+        except exceptions.WhispyLispySyntaxError as err:
+            self.assertEqual(err.index, 100)
+        else:
+            self.fail('Syntax error not raised')
+
+    def test_empty_stream(self):
+        self.assertEqual(list(lexer.stream_tokens(io.StringIO(''))), [])
+        self.assertEqual(list(lexer.stream_tokens(io.StringIO('  \n'))), [])
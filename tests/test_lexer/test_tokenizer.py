@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import unittest
+
+from whispy_lispy import lexer, cst, exceptions
+
+
+class OffsetTokenizerTestCase(unittest.TestCase):
+    def test_tokens_know_their_offsets(self):
+        text = '(a a)\n  "a" a'
+        self.assertEqual(
+            [token.index for token in lexer.get_flat_token_list(text)],
+            [0, 1, 3, 4, 8, 12])
+
+    def test_syntax_error_points_at_the_unknown_character(self):
+        try:
+            lexer.get_flat_token_list('a a (b $)')
+        except exceptions.WhispyLispySyntaxError as err:
+            self.assertIn('row 8', str(err))
+        else:
+            self.fail('Syntax error not raised')
+
+    def test_tokens_are_generated_lazily(self):
+        tokens = lexer.iter_tokens('a b $')
+        self.assertEqual(next(tokens), cst.Token('a'))
+        self.assertEqual(next(tokens), cst.Token('b'))
+        self.assertRaises(exceptions.WhispyLispySyntaxError, next, tokens)
+
+    def test_patterns_keep_their_priority(self):
+        # Floats before ints, bools before anything else, `**` before `*`
+        self.assertEqual(
+            lexer.get_flat_token_list('1.5 15 #t ** * <= <'),
+            [cst.Token(1.5), cst.Token(15), cst.Token(True), cst.Token('**'),
+             cst.Token('*'), cst.Token('<='), cst.Token('<')])
+
+    def test_shift_operators_are_single_tokens(self):
+        self.assertEqual(
+            lexer.get_flat_token_list('<< >> < >'),
+            [cst.Token('<<'), cst.Token('>>'), cst.Token('<'),
+             cst.Token('>')])
+
+    def test_large_input(self):
+        text = '(def x (sum 1 2.5 "s"))\n' * 20000
+        tokens = lexer.get_flat_token_list(text)
+        self.assertEqual(len(tokens), 10 * 20000)
+        self.assertEqual(tokens[-1].index, len(text) - 2)
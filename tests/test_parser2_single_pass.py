@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""The single pass transformation must produce the same trees as the
+multi pass one"""
+from __future__ import absolute_import, unicode_literals
+import random
+import unittest
+
+from whispy_lispy import parser2, lexer, ast
+
+PROGRAMS = [
+    '',
+    'a',
+    '1 2.5 "s" #t #f',
+    '(a)',
+    '(def x 1)',
+    '(def (f a b) (sum a b)) (f 1 2)',
+    '(define (fact n) (cond ((= n 1) 1) (#t (* n (fact (sub n 1))))))',
+    '(if (#f 1) (#t (cond (#f 2))))',
+    '(lambda (x) (+ x 1))',
+    '((lambda (x) (+ x 1)) 3)',
+    "'a",
+    "'a 1 'b",
+    "''a",
+    "(def x '(a 'b (def y 1)))",
+    "(' def x)",
+    "(quote a)",
+    # The head of a container is checked after each pass, so these get
+    # pulled up more than once
+    '(def cond 5)',
+    '(def lambda 1)',
+    '(cond lambda x)',
+    '(def cond lambda 2)',
+    '(def def 1)',
+    '((cond (a b)) c)',
+    '((def x 1) 2)',
+    # Top level keywords pull the root itself up
+    'def x 1',
+    'cond (#t 1)',
+    'lambda (x) x',
+]
+
+ATOMS = ['a', 'b', '1', '2.5', '#t', '"s"', '+', 'and', 'def', 'define',
+         'cond', 'if', 'lambda', "'"]
+
+
+def random_program(rand, depth=0):
+    parts = []
+    for _ in range(rand.randint(1, 5)):
+        if depth < 4 and rand.random() < 0.4:
+            parts.append('(' + random_program(rand, depth + 1) + ')')
+        else:
+            parts.append(rand.choice(ATOMS))
+    return ' '.join(parts)
+
+
+def structure(node):
+    """Nested tuples with the class names and values of the nodes"""
+    if not isinstance(node, ast.AbstractSyntaxNode):
+        return node
+    return (type(node).__name__,) + tuple(
+        structure(value) for value in node.values)
+
+
+def transform_both(text):
+    """Return what each transformation returns or raises"""
+    results = []
+    for transform in (parser2.get_ast_from_cst_multipass,
+                      parser2.transform_cst_to_ast):
+        try:
+            results.append(
+                transform(lexer.get_concrete_syntax_tree_from_text(text)))
+        except Exception as err:
+            results.append(type(err))
+    return results
+
+
+class SinglePassEquivalenceTestCase(unittest.TestCase):
+    def assertSameTransformation(self, text):
+        multipass, single_pass = transform_both(text)
+        self.assertEqual(single_pass, multipass, text)
+        self.assertEqual(structure(single_pass), structure(multipass), text)
+
+    def test_known_programs(self):
+        for text in PROGRAMS:
+            self.assertSameTransformation(text)
+
+    def test_random_programs(self):
+        rand = random.Random(1234)
+        for _ in range(3000):
+            self.assertSameTransformation(random_program(rand))
+
+    def test_same_errors(self):
+        for text in ["(a ')", "'", '()', '(a ())']:
+            multipass, single_pass = transform_both(text)
+            self.assertIs(single_pass, multipass, text)
+            self.assertTrue(issubclass(single_pass, Exception))
+
+    def test_get_ast_from_cst_uses_a_single_pass(self):
+        cstree = lexer.get_concrete_syntax_tree_from_text(PROGRAMS[6])
+        self.assertEqual(parser2.get_ast_from_cst(cstree),
+                         parser2.transform_cst_to_ast(cstree))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import six
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+from whispy_lispy import skip_steps, resolver, ast, types
+
+
+def find_symbols(astree, name):
+    """All the ast.Symbol nodes with the given name, in depth first order"""
+    found = []
+    nodes = [astree]
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, ast.Symbol):
+            if node.values == (name,):
+                found.append(node)
+        elif isinstance(node, ast.AbstractSyntaxNode):
+            nodes[0:0] = node.values
+    return found
+
+
+class ResolveFunctionTestCase(unittest.TestCase):
+    def resolve(self, text):
+        tree = skip_steps.get_ast_from_text2(text)
+        resolver.resolve_function(tree[0])
+        return tree
+
+    def test_parameters_get_their_slots(self):
+        tree = self.resolve('(def (f a b) (+ b a))')
+        self.assertEqual(find_symbols(tree[0][1], 'a')[0].address, (0, 0))
+        self.assertEqual(find_symbols(tree[0][1], 'b')[0].address, (0, 1))
+
+    def test_other_symbols_have_no_address(self):
+        tree = self.resolve('(def (f a) (g a))')
+        self.assertIsNone(find_symbols(tree[0][1], 'g')[0].address)
+
+    def test_parameters_of_enclosing_functions_get_their_depth(self):
+        tree = self.resolve('(def (f a b) (lambda (c) (+ b c)))')
+        self.assertEqual(find_symbols(tree[0][1], 'b')[0].address, (1, 1))
+        self.assertEqual(find_symbols(tree[0][1], 'c')[-1].address, (0, 0))
+
+    def test_the_innermost_parameter_wins(self):
+        tree = self.resolve('(def (f a) (lambda (a) a))')
+        self.assertEqual(find_symbols(tree[0][1], 'a')[-1].address, (0, 0))
+
+    def test_the_last_duplicate_parameter_wins(self):
+        tree = self.resolve('(def (f a a) a)')
+        self.assertEqual(find_symbols(tree[0][1], 'a')[0].address, (0, 1))
+
+    def test_captured_slots_of_the_enclosing_functions(self):
+        tree = self.resolve(
+            '(def (f a b) (lambda (c d) (lambda (e) (+ b (+ c e)))))')
+        outer = tree[0][1]
+        inner = outer[1]
+
+        self.assertEqual(tree[0].captured_slots, ())
+        self.assertEqual(outer.captured_slots, (frozenset([1]),))
+        self.assertEqual(
+            inner.captured_slots, (frozenset([0]), frozenset([1])))
+
+    def test_functions_using_other_symbols_capture_everything(self):
+        for text in ('(def (f a) (lambda (b) (g b)))',
+                     '(def (f a) (lambda (b) (a b)))',
+                     '(def (f a) (lambda (b) ((a) b)))'):
+            tree = self.resolve(text)
+            self.assertIsNone(tree[0][1].captured_slots, text)
+
+    def test_nested_functions_get_marked_as_resolved(self):
+        tree = self.resolve('(def (f a) (def (g b) a))')
+        self.assertTrue(tree[0].resolved)
+        self.assertTrue(tree[0][1].resolved)
+
+
+class ResolverEquivalenceTestCase(unittest.TestCase):
+    """The lookups by address give the same values as the lookups by name
+    through the scope chain
+    """
+    programs = [
+        # nested lambdas
+        ('(def (adder n) (lambda (x) (+ x n))) ((adder 3) 4)', 7),
+        ('(def (f a) (lambda (b) (lambda (c) (+ a (+ b c)))))'
+         '(((f 1) 10) 100)', 111),
+        # shadowing
+        ('(def (f x) ((lambda (x) x) 2)) (f 1)', 2),
+        ('(def x 3) (def (f y) x) (f 1)', 3),
+        # dynamic scoping: the callee sees the parameters of the caller
+        ('(def (g) y) (def (f y) (g)) (f 5)', 5),
+        # but the closure parameters still win over the caller
+        ('(def (mk x) (lambda (z) x)) (def (call g x) (g 0))'
+         '(call (mk 1) 2)', 1),
+        # duplicate parameters
+        ('(def (f x x) x) (f 1 2)', 2),
+        # definitions in the function body don't hide the parameters
+        ('(def (f x) (cond ((def x 5) 0) (#t x))) (f 1)', 1),
+        # closures keeping only some of the arguments
+        ('(def (f a b) ((lambda (c) (lambda (d) (+ a d))) 0)) ((f 1 2) 3)',
+         4),
+        ('(def (f a b) (lambda (c) (lambda (d) (+ b (+ c d)))))'
+         '(((f 1 2) 3) 4)', 9),
+        # recursion
+        ('(def (fact n) (cond ((= n 0) 1) (#t (* n (fact (- n 1))))))'
+         '(fact 10)', 3628800),
+    ]
+
+    def assert_equivalent(self, engine):
+        for text, expected in self.programs:
+            with mock.patch.object(resolver, 'resolve_function'):
+                by_name = skip_steps.interpret_text2(text, engine=engine)
+            by_address = skip_steps.interpret_text2(text, engine=engine)
+
+            self.assertEqual(by_name, types.Int((expected,)), text)
+            self.assertEqual(by_address, by_name, text)
+
+    def test_tree_interpreter(self):
+        self.assert_equivalent('tree')
+
+    def test_closure_compiler(self):
+        self.assert_equivalent('closures')
+
+    def test_stackless_interpreter(self):
+        self.assert_equivalent('stackless')
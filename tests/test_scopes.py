@@ -2,7 +2,7 @@
 from __future__ import unicode_literals
 
 import unittest
-from whispy_lispy import scopes2
+from whispy_lispy import scopes2, types, exceptions
 
 
 class ScopeTestCase(unittest.TestCase):
@@ -39,3 +39,57 @@ class ScopeTestCase(unittest.TestCase):
         self.assertTrue(2 in fs3)
         self.assertTrue(1 in fs3)
 
+
+    def test_function_scope_is_shadowed_by_one_with_same_names(self):
+        closure = scopes2.Scope()
+        fs1 = scopes2.FunctionScope(
+            param_names=('a',), arguments=(1,), closure_scope=closure)
+
+        self.assertTrue(fs1.is_shadowed_by(('a', 'b'), closure))
+        self.assertFalse(fs1.is_shadowed_by(('b',), closure))
+        self.assertFalse(fs1.is_shadowed_by(('a',), scopes2.Scope()))
+
+        fs1['c'] = 3
+        self.assertFalse(fs1.is_shadowed_by(('a', 'b'), closure))
+
+    def test_lookup_by_address_follows_the_closure_scopes(self):
+        fs1 = scopes2.FunctionScope(param_names=('a', 'b'), arguments=(1, 2))
+        fs2 = scopes2.FunctionScope(
+            param_names=('c',), arguments=(3,), closure_scope=fs1)
+
+        self.assertEqual(scopes2.lookup_address(fs2, (0, 0), 'c'), 3)
+        self.assertEqual(scopes2.lookup_address(fs2, (1, 1), 'b'), 2)
+
+    def test_lookup_by_address_falls_back_to_the_name(self):
+        s1 = scopes2.Scope()
+        s1['b'] = 'b'
+        fs1 = scopes2.FunctionScope(closure_scope=s1)
+
+        self.assertEqual(scopes2.lookup_address(fs1, (1, 0), 'b'), 'b')
+
+    def test_function_scope_needs_an_argument_for_every_parameter(self):
+        self.assertRaises(
+            exceptions.ArityError, scopes2.FunctionScope,
+            param_names=('a', 'b'), arguments=(1,))
+        self.assertRaises(
+            exceptions.ArityError, scopes2.FunctionScope,
+            param_names=('a',), arguments=(1, 2))
+
+    def test_function_scope_uses_the_layout_of_the_descriptor(self):
+        descriptor = types.CallDescriptor('f', ('a', 'b', 'a'))
+        fs1 = scopes2.FunctionScope(arguments=(1, 2, 3), descriptor=descriptor)
+
+        self.assertEqual(fs1['a'], 3)
+        self.assertEqual(fs1['b'], 2)
+        self.assertEqual(fs1.slots, (1, 2, 3))
+
+    def test_every_scope_counts_its_modifications(self):
+        s1 = scopes2.Scope()
+        s1['a'] = 1
+        s1['a'] = 2
+        fs1 = scopes2.FunctionScope(parent=s1)
+        fs1['b'] = 3
+
+        self.assertEqual(s1.version, 2)
+        self.assertEqual(fs1.version, 1)
+        self.assertEqual(scopes2.Scope().version, 0)
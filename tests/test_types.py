@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import unittest
+from whispy_lispy import types, skip_steps
+
+
+class ScalarTypesTestCase(unittest.TestCase):
+    def test_the_values_api_still_works(self):
+        for cls, value in ((types.Int, 3), (types.Float, 1.5),
+                           (types.Bool, True), (types.String, 'abc')):
+            wrapped = cls((value,))
+            self.assertEqual(wrapped.value, value)
+            self.assertEqual(wrapped.values, (value,))
+            self.assertEqual(wrapped.values[0], value)
+            self.assertEqual(wrapped, cls((value,)))
+            self.assertEqual(hash(wrapped), hash(cls((value,))))
+
+    def test_scalars_have_no_attribute_dict(self):
+        self.assertRaises(AttributeError, getattr, types.Int((3,)), '__dict__')
+
+    def test_equality_depends_on_the_type(self):
+        self.assertNotEqual(types.Int((1,)), types.Float((1.0,)))
+        self.assertNotEqual(types.Int((1,)), types.Bool((True,)))
+        self.assertNotEqual(types.String(('a',)), types.Symbol(('a',)))
+
+    def test_other_types_still_use_the_values_tuple(self):
+        symbol = types.Symbol(('a',))
+        self.assertEqual(symbol.value, 'a')
+        self.assertEqual(symbol.values, ('a',))
+
+
+class ValueCacheTestCase(unittest.TestCase):
+    def test_booleans_are_singletons(self):
+        self.assertIs(types.make_bool(True), types.TRUE)
+        self.assertIs(types.make_bool(False), types.FALSE)
+        self.assertEqual(types.TRUE, types.Bool((True,)))
+
+    def test_small_integers_are_cached(self):
+        self.assertIs(types.make_int(5), types.make_int(5))
+        self.assertIs(types.make_int(types.SMALL_INT_MIN),
+                      types.make_int(types.SMALL_INT_MIN))
+        big = types.SMALL_INT_MAX + 1
+        self.assertIsNot(types.make_int(big), types.make_int(big))
+        self.assertEqual(types.make_int(big), types.Int((big,)))
+
+    def test_truthiness(self):
+        self.assertTrue(types.is_true(types.TRUE))
+        self.assertTrue(types.is_true(types.Bool((True,))))
+        self.assertFalse(types.is_true(types.FALSE))
+        self.assertFalse(types.is_true(types.Bool((False,))))
+        self.assertFalse(types.is_true(types.Int((1,))))
+        self.assertFalse(types.is_true(None))
+
+    def test_parsed_and_computed_values_are_cached(self):
+        tree = skip_steps.parse_text2('#t 7')
+        self.assertIs(tree[0][0], types.TRUE)
+        self.assertIs(tree[1][0], types.make_int(7))
+        self.assertIs(skip_steps.interpret_text2('(< 1 2)'), types.TRUE)
+        self.assertIs(skip_steps.interpret_text2('(+ 3 4)'),
+                      types.make_int(7))
+
+
+class SymbolTestCase(unittest.TestCase):
+    def test_symbols_are_interned(self):
+        symbol = types.Symbol(('a',))
+        self.assertIs(types.Symbol(('a',)), symbol)
+        self.assertIs(types.Symbol(['a']), symbol)
+        self.assertEqual(types.Symbol(('a',)), symbol)
+        self.assertNotEqual(types.Symbol(('b',)), symbol)
+        self.assertEqual(symbol.values, ('a',))
+
+    def test_symbols_are_scope_keys(self):
+        scope = {types.Symbol(('a',)): 1}
+        self.assertEqual(scope[types.Symbol(('a',))], 1)
+        self.assertNotIn(types.Symbol(('b',)), scope)
+
+    def test_syntax_nodes_hold_the_interned_symbol(self):
+        tree = skip_steps.parse_text2('(f a)')
+        self.assertIs(tree[0][0].symbol, types.Symbol(('f',)))
+        self.assertIs(tree[0][1].symbol, types.Symbol(('a',)))